@@ -0,0 +1,8 @@
+# tools/ bukan package: script-nya saling import sebagai modul top-level
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: workbook sintetis besar (lewati dengan -m 'not slow')")
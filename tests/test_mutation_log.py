@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""append_events lewat OutputTxn.open_append: cuma event baru yang ditulis."""
+
+import pytest
+
+import mutation_log
+from atomic_output import OutputTxn
+from mutation_log import EVENT_HEADER, Event, append_events, read_events
+
+def events(*nobtg):
+    return [Event("2026-01-01T07:00:00+08:00", n, "baru", "", "TPK 42", "", "MR", "1.2") for n in nobtg]
+
+def test_header_once_then_appends(tmp_path):
+    p = str(tmp_path / "ev.csv")
+    with OutputTxn() as txn:
+        assert append_events(txn, p, events("A1", "A2")) == 2
+    with OutputTxn() as txn:
+        assert append_events(txn, p, events("A3")) == 1
+    lines = open(p, encoding="utf-8").read().splitlines()
+    assert lines[0] == ",".join(EVENT_HEADER)
+    assert [e.noBtg for e in read_events(p)] == ["A1", "A2", "A3"]
+    assert txn.changed[p] is True
+
+def test_no_events_leaves_file_alone(tmp_path):
+    p = tmp_path / "ev.csv"
+    with OutputTxn() as txn:
+        assert append_events(txn, str(p), []) == 0
+    assert not p.exists()
+
+def test_existing_content_is_not_rewritten(tmp_path, monkeypatch):
+    p = str(tmp_path / "ev.csv")
+    with OutputTxn() as txn:
+        append_events(txn, p, events("A1"))
+    real_open = open
+
+    def guarded_open(path, mode="r", *a, **kw):
+        # isi lama tidak boleh dibaca / ditulis ulang (trim_torn_tail pakai "rb+")
+        assert not (str(path) == p and mode in ("r", "w")), mode
+        return real_open(path, mode, *a, **kw)
+
+    monkeypatch.setattr("builtins.open", guarded_open)
+    with OutputTxn() as txn:
+        append_events(txn, p, events("A2"))
+    monkeypatch.undo()
+    assert [e.noBtg for e in read_events(p)] == ["A1", "A2"]
+
+def test_failed_txn_appends_nothing(tmp_path):
+    p = str(tmp_path / "ev.csv")
+    with OutputTxn() as txn:
+        append_events(txn, p, events("A1"))
+    before = open(p, "rb").read()
+    with pytest.raises(RuntimeError):
+        with OutputTxn() as txn:
+            append_events(txn, p, events("A2"))
+            raise RuntimeError("export gagal")
+    assert open(p, "rb").read() == before
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["ev.csv"]
+
+def test_torn_tail_from_killed_run_is_dropped(tmp_path):
+    p = str(tmp_path / "ev.csv")
+    with OutputTxn() as txn:
+        append_events(txn, p, events("A1"))
+    with open(p, "a", encoding="utf-8") as f:
+        f.write("2026-01-01T08:00:00+08:00,A9,ba")   # proses mati di tengah baris
+    mutation_log.trim_torn_tail(p)
+    with OutputTxn() as txn:
+        append_events(txn, p, events("A2"))
+    assert [e.noBtg for e in read_events(p)] == ["A1", "A2"]
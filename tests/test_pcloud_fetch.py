@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""pcloud_fetch dengan folder lokal sebagai remote (LocalRemote), tanpa rclone."""
+
+import asyncio
+import os
+
+import pytest
+
+import pcloud_fetch
+from pcloud_fetch import FetchError, LocalRemote, fetch_all
+
+@pytest.fixture
+def setup(tmp_path):
+    remote = tmp_path / "remote"
+    remote.mkdir()
+    src = remote / "BOOK.xlsx"
+    src.write_bytes(b"isi workbook " * 1000)
+    work = tmp_path / "work"
+    work.mkdir()
+    return src, work / "BOOK.xlsx", tmp_path / "mirror"
+
+def run(src, dest, mirror, attempts=3):
+    (res,) = asyncio.run(fetch_all([(str(src), str(dest))], mirror, attempts=attempts, sleep=0))
+    return res
+
+def count_fetch(monkeypatch, fail_first=0, partial=False):
+    """Bungkus LocalRemote.fetch: hitung panggilan, gagal `fail_first` kali pertama."""
+    calls = []
+    real = LocalRemote.fetch
+
+    async def fetch(self, src, dest):
+        calls.append(dest)
+        if len(calls) <= fail_first:
+            if partial:
+                with open(dest, "wb") as f:
+                    f.write(b"setengah")
+            raise FetchError("koneksi putus")
+        await real(self, src, dest)
+
+    monkeypatch.setattr(LocalRemote, "fetch", fetch)
+    return calls
+
+def test_unchanged_metadata_skips_download(setup, monkeypatch):
+    src, dest, mirror = setup
+    calls = count_fetch(monkeypatch)
+    assert run(src, dest, mirror)[1] == "downloaded"
+    assert run(src, dest, mirror)[1] == "unchanged"
+    assert len(calls) == 1
+    assert dest.read_bytes() == src.read_bytes()
+
+def test_changed_source_downloads_again(setup, monkeypatch):
+    src, dest, mirror = setup
+    calls = count_fetch(monkeypatch)
+    run(src, dest, mirror)
+    src.write_bytes(b"isi baru")
+    assert run(src, dest, mirror)[1] == "downloaded"
+    assert len(calls) == 2
+    assert dest.read_bytes() == b"isi baru"
+
+def test_missing_dest_restored_from_mirror_by_hardlink(setup, monkeypatch):
+    src, dest, mirror = setup
+    calls = count_fetch(monkeypatch)
+    run(src, dest, mirror)
+    dest.unlink()
+    assert run(src, dest, mirror)[1] == "unchanged"
+    assert len(calls) == 1
+    assert os.path.samefile(dest, mirror / "BOOK.xlsx")
+    assert dest.read_bytes() == src.read_bytes()
+
+def test_failing_copy_is_retried(setup, monkeypatch):
+    src, dest, mirror = setup
+    calls = count_fetch(monkeypatch, fail_first=2)
+    assert run(src, dest, mirror, attempts=3)[1] == "downloaded"
+    assert len(calls) == 3
+    assert dest.read_bytes() == src.read_bytes()
+
+def test_failed_download_leaves_no_part_file(setup, monkeypatch):
+    src, dest, mirror = setup
+    calls = count_fetch(monkeypatch, fail_first=99, partial=True)
+    name, status, err = run(src, dest, mirror, attempts=2)
+    assert status == "failed" and isinstance(err, FetchError)
+    assert len(calls) == 2
+    assert not (mirror / "BOOK.xlsx.part").exists()
+    assert not (mirror / "BOOK.xlsx").exists()
+    assert not dest.exists()
+    assert name not in pcloud_fetch.load_index(mirror)
+
+def test_size_mismatch_counts_as_failed_attempt(setup, monkeypatch):
+    src, dest, mirror = setup
+
+    async def short_copy(self, s, d):
+        with open(d, "wb") as f:
+            f.write(b"kependekan")
+
+    monkeypatch.setattr(LocalRemote, "fetch", short_copy)
+    _name, status, err = run(src, dest, mirror, attempts=2)
+    assert status == "failed" and "size tidak cocok" in str(err)
+    assert not (mirror / "BOOK.xlsx.part").exists()
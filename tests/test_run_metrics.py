@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""run_metrics.append_run: satu baris di-append per run, pangkas hanya lewat KEEP x TRIM_FACTOR."""
+
+import json
+
+import run_metrics
+
+def lines(path):
+    return [json.loads(ln) for ln in open(path, encoding="utf-8")]
+
+def test_append_does_not_rewrite_until_past_trim_factor(tmp_path):
+    p = str(tmp_path / "m.jsonl")
+    for i in range(12):
+        run_metrics.append_run({"tool": "t", "i": i, "total_s": 1.0}, p, keep=10)
+    # 12 <= 10 x 1.2: belum dipangkas
+    assert [r["i"] for r in lines(p)] == list(range(12))
+    run_metrics.append_run({"tool": "t", "i": 12, "total_s": 1.0}, p, keep=10)
+    assert [r["i"] for r in lines(p)] == list(range(3, 13))
+
+def test_torn_last_line_is_dropped(tmp_path):
+    p = tmp_path / "m.jsonl"
+    run_metrics.append_run({"tool": "t", "i": 0, "total_s": 1.0}, str(p))
+    with open(p, "a", encoding="utf-8") as f:
+        f.write('{"tool": "t", "i"')
+    run_metrics.append_run({"tool": "t", "i": 1, "total_s": 1.0}, str(p))
+    assert [r["i"] for r in lines(p)] == [0, 1]
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""xlsx_stream: hasil harus sama dengan openpyxl read_only (values_only, data_only)."""
+
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from export_range_to_csv import is_invalid_nobtg as block_invalid
+from stock_rows import is_invalid_nobtg as stock_invalid
+from bench import STREAM_CHILD, write_synth_xlsx
+from xlsx_stream import SPILL_STRINGS, SpilledStrings, XlsxReader, iter_columns, open_sheet
+
+SHEET = "POSISI TERAKHIR"
+B, H, S, AH, AI = 2, 8, 19, 34, 35
+COLS = [B, H, S, AH, AI]                  # kolom stock + awal blok (seperti loglist1)
+SKIP_BOTH = {B: stock_invalid, AH: block_invalid}
+
+# (noBtg kolom B, noBtg blok AH); None = sel tidak ditulis sama sekali
+PREFILTER_ROWS = [
+    ("A1", "A1"),        # dua-duanya valid
+    ("A2", None),        # AH tidak ada, B valid -> tetap keluar (file antara butuh)
+    (None, "A3"),        # B tidak ada, AH valid -> tetap keluar
+    (None, None),        # dua-duanya tidak ada -> pred(None) -> dibuang
+    ("0", "0"),
+    (0, 0),
+    ("-", 0),            # "-" tidak valid untuk stock, blok: 0 tidak valid -> dibuang
+    ("-", "-"),          # "-" VALID untuk predikat blok -> tetap keluar
+    ("0.0", "  "),
+    ("", "A9"),          # B kosong, AH valid -> tetap keluar (sel lain dikonversi)
+]
+
+@pytest.fixture(scope="module")
+def prefilter_xlsx(tmp_path_factory):
+    path = tmp_path_factory.mktemp("xlsx") / "prefilter.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = SHEET
+    for k, (b, ah) in enumerate(PREFILTER_ROWS, start=1):
+        if b is not None:
+            ws.cell(k, B, b)
+        ws.cell(k, H, f"jenis{k}")
+        ws.cell(k, S, datetime(2026, 1, k)).number_format = "dd/mm/yyyy"
+        if ah is not None:
+            ws.cell(k, AH, ah)
+        ws.cell(k, AI, k * 1.5)
+    wb.save(path)
+    return str(path)
+
+def read(path, stream, skip_if=None, columns=COLS):
+    ws = open_sheet(path, SHEET, stream=stream)
+    return list(iter_columns(ws, columns, 1, len(PREFILTER_ROWS), skip_if=skip_if))
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_row_rejected_only_when_all_keys_invalid(prefilter_xlsx, stream):
+    full = read(prefilter_xlsx, stream)
+    got = read(prefilter_xlsx, stream, SKIP_BOTH)
+    assert len(got) == len(full) == len(PREFILTER_ROWS)
+    kept = []
+    for k, (row, ref) in enumerate(zip(got, full), start=1):
+        if stock_invalid(ref[0]) and block_invalid(ref[3]):
+            assert row == (None,) * len(COLS), k
+        else:
+            assert row == ref, k
+            kept.append(k)
+    assert kept == [1, 2, 3, 8, 10]
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_missing_key_cell_counts_as_none(prefilter_xlsx, stream):
+    got = read(prefilter_xlsx, stream, {AH: block_invalid})
+    # baris 2 dan 4: sel AH tidak ada -> block_invalid(None) -> dibuang
+    assert got[1] == got[3] == (None,) * len(COLS)
+    assert got[2][3] == "A3"
+
+def test_stream_matches_openpyxl_with_prefilter(prefilter_xlsx):
+    for skip_if in (None, SKIP_BOTH, {B: stock_invalid}, {AH: block_invalid}):
+        assert read(prefilter_xlsx, True, skip_if) == read(prefilter_xlsx, False, skip_if)
+
+def test_kept_row_converts_deferred_cells(prefilter_xlsx):
+    # baris 10: B kosong, jadi H/S ditahan mentah sampai AH valid -> tetap dikonversi
+    row = read(prefilter_xlsx, True, SKIP_BOTH)[9]
+    assert row[1:] == ("jenis10", datetime(2026, 1, 10), "A9", 15.0)
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_skip_if_column_must_be_read(prefilter_xlsx, stream):
+    with pytest.raises(ValueError):
+        read(prefilter_xlsx, stream, {AH: block_invalid}, columns=[B, H])
+
+# ---------- workbook sintetis besar ----------
+BIG_ROWS = 1_000_000        # shared strings > SPILL_STRINGS -> jalur spill ke disk
+PARITY_ROWS = 200_000       # openpyxl lambat (~2 menit per sejuta baris), cukup di atas SPILL_STRINGS
+RSS_BUDGET_MB = 160         # sama dengan default bench.py stream --rss-mb
+
+def synth(tmp_path_factory, n):
+    path = tmp_path_factory.mktemp("synth") / f"synth_{n}.xlsx"
+    write_synth_xlsx(path, n, invalid_pct=5, mixed=True)
+    reader = XlsxReader(str(path))
+    assert isinstance(reader.shared_strings, SpilledStrings)
+    return str(path)
+
+@pytest.mark.slow
+def test_stream_maxrss_1m_rows(tmp_path_factory):
+    path = synth(tmp_path_factory, BIG_ROWS)
+    tools = Path(__file__).resolve().parent.parent / "tools"
+    r = subprocess.run([sys.executable, "-c", STREAM_CHILD, str(tools), path, "1"],
+                       capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr[-2000:]
+    n, _vol, _dt, rss = r.stdout.split()
+    assert int(n) > 0
+    assert int(rss) <= RSS_BUDGET_MB, f"maxrss {rss} MB > {RSS_BUDGET_MB} MB"
+
+@pytest.mark.slow
+@pytest.mark.filterwarnings("ignore:Workbook contains no default style")
+def test_stream_rows_match_openpyxl(tmp_path_factory):
+    assert PARITY_ROWS > SPILL_STRINGS
+    path = synth(tmp_path_factory, PARITY_ROWS)
+    got = open_sheet(path, SHEET, stream=True).iter_rows(min_row=1, values_only=True)
+    ref = open_sheet(path, SHEET, stream=False).iter_rows(min_row=1, values_only=True)
+    n = gaps = timed = 0
+    for n, (row, want) in enumerate(zip(got, ref, strict=True), start=1):
+        assert row == want, n
+        gaps += not any(want)
+        timed += isinstance(want[18], datetime) and want[18].hour != 0
+    # baris 1 kosong + satu nomor baris bolong tiap 10 baris data
+    assert n == PARITY_ROWS + 2 + (PARITY_ROWS - 1) // 10
+    assert gaps == 1 + (PARITY_ROWS - 1) // 10
+    assert timed > 0
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifest angkutan dari loglist: kayu dikelompokkan per prefix idBarcode
+(perusahaan pencetak barcode) x jenis, satu file CSV per batch.
+
+- prefix = awalan idBarcode yang terdaftar di valid_barcode_turunan.csv
+  (mis. 1702A10WIKI); kalau tidak terdaftar dipakai PREFIX_LEN karakter
+  pertama dan ditandai terdaftar=0; idBarcode kosong -> NO_BARCODE;
+- nama perusahaan diambil dari PREFIX_COMPANY_CSV (prefix,perusahaan) kalau
+  ada, dicek ke daftar_perusahaan_cetak_barcode.csv;
+- batch dipecah per MAX_BTG batang (None = satu batch per prefix x jenis).
+
+Satu kali sort (prefix, jenis, noBtg) lalu groupby, jadi cukup cepat untuk
+tiap sync jam-jaman. File batch yang isinya sama tidak ditulis ulang
+(OutputTxn), file batch lama yang sudah tidak ada dihapus.
+
+  OUT_DIR/index.csv            batch,prefix,perusahaan,terdaftar,jenis,btg,volume_m3,file
+  OUT_DIR/<prefix>_<jenis>.csv baris loglist apa adanya (header sama)
+
+Selama PREFIX_COMPANY_CSV belum ada, workflow loglist1 tidak meng-commit
+manifest/ (di .gitignore), hanya mengunggahnya sebagai artifact.
+
+Pemakaian:
+  python tools/angkutan_manifest.py
+  python tools/angkutan_manifest.py loglist_ibs.csv --out manifest_ibs --max-btg 40
+"""
+
+import argparse
+import csv
+import os
+import re
+from itertools import groupby
+
+from atomic_output import OutputTxn
+from stock_rows import safe_float
+
+LOGLIST_CSV = "loglist1.csv"
+PREFIX_CSV = "valid_barcode_turunan.csv"           # prefix idBarcode terdaftar
+COMPANY_CSV = "daftar_perusahaan_cetak_barcode.csv"
+PREFIX_COMPANY_CSV = None   # opsional: CSV prefix,perusahaan
+PREFIX_LEN = 11             # panjang prefix kalau tidak terdaftar
+NO_BARCODE = "TANPA-BARCODE"
+OUT_DIR = "manifest"
+INDEX_CSV = "index.csv"
+MAX_BTG = None
+
+INDEX_HEADER = ["batch", "prefix", "perusahaan", "terdaftar", "jenis", "btg", "volume_m3", "file"]
+
+_unsafe = re.compile(r"[^0-9A-Za-z-]+")
+
+def read_lines(path):
+    """Isi CSV satu kolom (baris kosong dibuang), None kalau file tidak ada."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return [row[0].strip() for row in csv.reader(f) if row and row[0].strip()]
+
+def read_prefix_company(path, companies):
+    if not path:
+        return {}
+    out = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[0].strip():
+                out[row[0].strip()] = row[1].strip()
+    if companies is not None:
+        known = {c.upper() for c in companies}
+        unknown = sorted({c for c in out.values() if c.upper() not in known})
+        if unknown:
+            print(f"Warning: perusahaan tidak ada di {COMPANY_CSV}: {', '.join(unknown)}")
+    return out
+
+class PrefixMatcher:
+    """idBarcode -> (prefix, terdaftar); cek awalan terpanjang dulu."""
+
+    def __init__(self, prefixes, fallback_len=PREFIX_LEN):
+        self.by_len = {}
+        for p in prefixes or ():
+            self.by_len.setdefault(len(p), set()).add(p.upper())
+        self.lengths = sorted(self.by_len, reverse=True)
+        self.fallback_len = fallback_len
+
+    def __call__(self, barcode):
+        b = barcode.strip().upper()
+        if not b:
+            return NO_BARCODE, ""
+        for n in self.lengths:
+            if b[:n] in self.by_len[n]:
+                return b[:n], "1"
+        return b[:self.fallback_len], "0"
+
+def batch_file(prefix, jenis, part, nparts):
+    name = f"{_unsafe.sub('_', prefix)}_{_unsafe.sub('_', jenis) or 'TANPA-JENIS'}"
+    if nparts > 1:
+        name += f"_{part:02d}"
+    return name + ".csv"
+
+def build_batches(header, rows, match, max_btg=None):
+    """
+    rows: list baris loglist (list str). Return list
+    (prefix, terdaftar, jenis, file, baris) urut prefix, jenis, noBtg.
+    """
+    i_nobtg = header.index("noBtg")
+    i_bc = header.index("idBarcode")
+    i_jenis = header.index("jenis")
+
+    keyed = []
+    for r in rows:
+        prefix, reg = match(r[i_bc])
+        keyed.append((prefix, r[i_jenis].strip(), r[i_nobtg].strip(), reg, r))
+    keyed.sort(key=lambda t: t[:3])
+
+    batches = []
+    for (prefix, jenis), grp in groupby(keyed, key=lambda t: t[:2]):
+        grp = list(grp)
+        size = max_btg or len(grp)
+        chunks = [grp[k:k + size] for k in range(0, len(grp), size)]
+        for part, chunk in enumerate(chunks, start=1):
+            batches.append((prefix, chunk[0][3], jenis, batch_file(prefix, jenis, part, len(chunks)),
+                            [t[4] for t in chunk]))
+    return batches
+
+def read_index_files(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {row["file"] for row in csv.DictReader(f) if row.get("file")}
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Manifest angkutan per prefix idBarcode x jenis")
+    ap.add_argument("loglist_csv", nargs="?", default=LOGLIST_CSV)
+    ap.add_argument("--out", default=OUT_DIR, help=f"folder output (default {OUT_DIR})")
+    ap.add_argument("--max-btg", type=int, default=MAX_BTG, help="maks batang per batch")
+    ap.add_argument("--prefix-company", default=PREFIX_COMPANY_CSV,
+                    help="CSV prefix,perusahaan (opsional)")
+    args = ap.parse_args(argv)
+
+    with open(args.loglist_csv, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader, [])]
+        rows = [r for r in reader if r and any(c.strip() for c in r)]
+    for col in ("noBtg", "idBarcode", "jenis", "volume"):
+        if col not in header:
+            raise SystemExit(f"{args.loglist_csv}: kolom '{col}' tidak ada (header: {header})")
+    width = len(header)
+    rows = [r + [""] * (width - len(r)) if len(r) < width else r for r in rows]
+
+    prefixes = read_lines(PREFIX_CSV)
+    if prefixes is None:
+        print(f"Warning: {PREFIX_CSV} tidak ada, semua prefix dianggap tidak terdaftar")
+    companies = read_lines(COMPANY_CSV)
+    company_of = read_prefix_company(args.prefix_company, companies)
+
+    batches = build_batches(header, rows, PrefixMatcher(prefixes), args.max_btg)
+    i_vol = header.index("volume")
+
+    os.makedirs(args.out, exist_ok=True)
+    index_path = os.path.join(args.out, INDEX_CSV)
+    old_files = read_index_files(index_path)
+
+    txn = OutputTxn()
+    with txn:
+        index = csv.writer(txn.open_text(index_path))
+        index.writerow(INDEX_HEADER)
+        total_btg, total_vol = 0, 0.0
+        for n, (prefix, reg, jenis, fn, batch) in enumerate(batches, start=1):
+            w = csv.writer(txn.open_text(os.path.join(args.out, fn)))
+            w.writerow(header)
+            w.writerows(batch)
+            vol = sum(safe_float(r[i_vol]) for r in batch)
+            index.writerow([n, prefix, company_of.get(prefix, ""), reg, jenis,
+                            len(batch), round(vol, 3), fn])
+            total_btg += len(batch)
+            total_vol += vol
+        index.writerow(["TOTAL", "", "", "", "", total_btg, round(total_vol, 3), ""])
+
+    new_files = {b[3] for b in batches}
+    for fn in sorted(old_files - new_files):
+        p = os.path.join(args.out, fn)
+        if os.path.exists(p):
+            os.remove(p)
+
+    changed = sum(1 for p, c in txn.changed.items() if c and p != index_path)
+    print(f"Manifest done -> {args.out}/ ({len(batches)} batch, {total_btg} btg, "
+          f"{round(total_vol, 2)} m3; {changed} file berubah, "
+          f"{len(old_files - new_files)} file lama dihapus)")
+
+if __name__ == "__main__":
+    main()
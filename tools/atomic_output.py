@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Penulis output yang aman dipakai exporter.
+
+- tulis dulu ke file temp di folder yang sama (buffer besar)
+- hash sha256 dihitung sambil menulis
+- kalau hash sama dengan file lama -> file lama TIDAK disentuh
+- kalau beda -> fsync lalu os.replace (atomic), folder ikut di-fsync
+- file state (.sync_state_*.json) ikut transaksi yang sama, di-commit paling akhir
+- open_append: isi baru ditampung di temp, saat commit di-append ke akhir
+  file (log yang terus bertambah, tanpa menulis ulang isi lama); gagal di
+  tengah append -> file dipotong lagi ke ukuran semula
+
+Contoh:
+    with OutputTxn() as txn:
+        f = txn.open_text("stock.csv")
+        csv.writer(f).writerow([...])
+        txn.write_json(".sync_state_stock.json", st)
+    print(txn.changed)   # {"stock.csv": True, ".sync_state_stock.json": False}
+
+Kalau ada exception di dalam blok `with`, semua file temp dibuang dan
+output lama tetap utuh (tidak ada CSV setengah jadi yang ikut ter-commit).
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+BUFFER_SIZE = 1024 * 1024
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _target_mode(path):
+    # mkstemp selalu 0600; samakan dengan file lama / umask biasa
+    try:
+        return os.stat(path).st_mode & 0o777
+    except OSError:
+        mask = os.umask(0)
+        os.umask(mask)
+        return 0o666 & ~mask
+
+def fsync_dir(path):
+    d = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(d, os.O_RDONLY)
+    except OSError:
+        return  # contoh: Windows tidak bisa open folder
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def trim_torn_tail(path):
+    """
+    Buang baris terakhir yang terpotong (tanpa newline), sisa proses yang mati
+    saat append. Panggil sebelum open_append untuk file teks per baris.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return
+        f.seek(max(0, size - 65536))
+        tail = f.read()
+        if tail.endswith(b"\n"):
+            return
+        cut = tail.rfind(b"\n")
+        if cut < 0 and len(tail) < size:
+            return   # baris > 64 KB: bukan sisa append kita, biarkan
+        f.truncate(size - len(tail) + cut + 1)
+
+class _HashingRaw(io.RawIOBase):
+    """Raw writer ke fd yang sekaligus update hash."""
+
+    def __init__(self, fd):
+        self._fd = fd
+        self.hash = hashlib.sha256()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        n = os.write(self._fd, b)
+        self.hash.update(memoryview(b)[:n])
+        return n
+
+    def fileno(self):
+        return self._fd
+
+class _Staged:
+    def __init__(self, target, binary=False, encoding="utf-8", newline=""):
+        self.target = target
+        d = os.path.dirname(os.path.abspath(target))
+        fd, self.tmp = tempfile.mkstemp(
+            prefix="." + os.path.basename(target) + ".", suffix=".tmp", dir=d
+        )
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, _target_mode(target))
+        self.raw = _HashingRaw(fd)
+        self.buf = io.BufferedWriter(self.raw, buffer_size=BUFFER_SIZE)
+        if binary:
+            self.file = self.buf
+        else:
+            self.file = io.TextIOWrapper(self.buf, encoding=encoding, newline=newline)
+        self.closed = False
+
+    def finish(self):
+        """flush + fsync + close; return sha256 hex isi file."""
+        self.file.flush()
+        os.fsync(self.raw.fileno())
+        self.file.close()
+        self.closed = True
+        return self.raw.hash.hexdigest()
+
+    def discard(self):
+        if not self.closed:
+            try:
+                self.file.close()
+            except (OSError, ValueError):
+                pass
+            self.closed = True
+        if os.path.exists(self.tmp):
+            os.unlink(self.tmp)
+
+class _Appended(_Staged):
+    """Isi yang akan ditambahkan di akhir target (bukan mengganti target)."""
+
+    def apply(self):
+        """Append isi temp ke target. Return True kalau ada yang ditambahkan."""
+        if os.path.getsize(self.tmp) == 0:
+            os.unlink(self.tmp)
+            return False
+        fd = os.open(self.target, os.O_WRONLY | os.O_APPEND | os.O_CREAT, _target_mode(self.target))
+        start = os.fstat(fd).st_size
+        try:
+            with open(self.tmp, "rb") as src:
+                for chunk in iter(lambda: src.read(BUFFER_SIZE), b""):
+                    view = memoryview(chunk)
+                    while view:
+                        view = view[os.write(fd, view):]
+            os.fsync(fd)
+        except BaseException:
+            os.ftruncate(fd, start)
+            raise
+        finally:
+            os.close(fd)
+        os.unlink(self.tmp)
+        if start == 0:
+            fsync_dir(self.target)
+        return True
+
+class OutputTxn:
+    def __init__(self):
+        self._staged = []
+        self.changed = {}
+        self.hashes = {}
+
+    def open_text(self, path, encoding="utf-8", newline=""):
+        s = _Staged(path, encoding=encoding, newline=newline)
+        self._staged.append(s)
+        return s.file
+
+    def open_binary(self, path):
+        s = _Staged(path, binary=True)
+        self._staged.append(s)
+        return s.file
+
+    def open_append(self, path, encoding="utf-8", newline=""):
+        """Teks yang ditulis ke sini di-append ke `path` saat commit (isi lama tidak dibaca)."""
+        s = _Appended(path, encoding=encoding, newline=newline)
+        self._staged.append(s)
+        return s.file
+
+    def digest(self, path):
+        """sha256 isi yang sudah ditulis ke `path` sejauh ini (flush dulu, file tetap terbuka)."""
+        for s in self._staged:
+            if s.target == path:
+                s.file.flush()
+                return s.raw.hash.hexdigest()
+        raise KeyError(path)
+
+    def write_json(self, path, obj):
+        """Format sama dengan save_state lama (indent=2, ensure_ascii=False)."""
+        f = self.open_text(path)
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+    def commit(self):
+        # urutan = urutan open; state ditulis exporter paling akhir,
+        # jadi kalau crash di tengah, state lama memaksa export ulang.
+        done = []
+        try:
+            for s in self._staged:
+                self.hashes[s.target] = s.finish()
+            for s in self._staged:
+                if isinstance(s, _Appended):
+                    self.changed[s.target] = s.apply()
+                    done.append(s)
+                    continue
+                new_hash = self.hashes[s.target]
+                if os.path.exists(s.target) and sha256_file(s.target) == new_hash:
+                    os.unlink(s.tmp)
+                    self.changed[s.target] = False
+                else:
+                    os.replace(s.tmp, s.target)
+                    fsync_dir(s.target)
+                    self.changed[s.target] = True
+                done.append(s)
+        except BaseException:
+            for s in self._staged:
+                if s not in done:
+                    s.discard()
+            raise
+        finally:
+            self._staged = []
+        return self.changed
+
+    def abort(self):
+        for s in self._staged:
+            s.discard()
+        self._staged = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark kecil untuk tools/ (jalankan dari root repo).
+
+Pemakaian:
+  python tools/bench.py                 # semua case
+  python tools/bench.py csv_batch       # satu case
+  python tools/bench.py csv_batch --rows 100000 --repeat 5
+  python tools/bench.py stream --rows 1000000   # 1 juta baris, cek batas memori
+  python tools/bench.py sqlite                  # load + query sqlite_sink.py
+  python tools/bench.py prefilter --invalid-pct 60   # filter noBtg di parser xlsx_stream
+"""
+
+import argparse
+import csv
+import io
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# ---------- helpers ----------
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None or dt < best else best
+    return best
+
+def typed(v):
+    # kira-kira seperti nilai dari openpyxl (int / float / str / None)
+    if v == "":
+        return None
+    try:
+        return int(v)
+    except ValueError:
+        pass
+    try:
+        return float(v)
+    except ValueError:
+        return v
+
+def load_loglist_rows(name="loglist1.csv"):
+    with (ROOT / name).open("r", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    header = rows[0]
+    data = [tuple(typed(v) if j else v for j, v in enumerate(r)) for r in rows[1:]]
+    return header, data
+
+def synth_rows(base, n):
+    out = []
+    k = len(base)
+    for i in range(n):
+        r = list(base[i % k])
+        r[0] = f"S{i}"
+        out.append(tuple(r))
+    return out
+
+def report(case, label, rows, dt, base=None):
+    extra = f"  x{base / dt:.2f}" if base else ""
+    print(f"{case:<12} {label:<22} {rows:>8} rows  {dt * 1000:9.2f} ms{extra}")
+
+# ---------- cases ----------
+def bench_csv_batch(args):
+    from csv_batch import BatchCsvWriter, cell_str
+
+    header, data = load_loglist_rows()
+    cases = [("loglist1", data), (f"synthetic {args.rows // 1000}k", synth_rows(data, args.rows))]
+
+    for label, rows in cases:
+        def per_row():
+            f = io.StringIO(newline="")
+            w = csv.writer(f)
+            w.writerow([cell_str(v) for v in header])
+            for r in rows:
+                w.writerow([cell_str(v) for v in r])
+            return f.getvalue()
+
+        def batched():
+            f = io.StringIO(newline="")
+            w = BatchCsvWriter(f)
+            w.write_header(header)
+            for r in rows:
+                w.add(r)
+            w.close()
+            return f.getvalue()
+
+        if per_row() != batched():
+            raise SystemExit(f"csv_batch: output beda untuk {label}")
+
+        t_old = best_of(per_row, args.repeat)
+        t_new = best_of(batched, args.repeat)
+        report("csv_batch", f"{label} per-row", len(rows), t_old)
+        report("csv_batch", f"{label} batch", len(rows), t_new, t_old)
+
+def bench_volume_check(args):
+    from loglist_schema import compile_schema
+    from loglist_volume import check_typed_rows
+
+    header, data = load_loglist_rows()
+    schema = compile_schema(header)
+    for label, rows in [("loglist1", data), (f"synthetic {args.rows // 1000}k", synth_rows(data, args.rows))]:
+        typed = [schema.coerce(r, i)[0] for i, r in enumerate(rows, start=2)]
+        rownums = list(range(2, len(typed) + 2))
+        t_coerce = best_of(lambda: [schema.coerce(r, 0) for r in rows], args.repeat)
+        t_check = best_of(lambda: check_typed_rows(schema, typed, rownums), args.repeat)
+        report("volume", f"{label} coerce", len(rows), t_coerce)
+        report("volume", f"{label} check", len(rows), t_check)
+
+def bench_query_server(args):
+    import http.client
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from query_server import make_server
+
+    srv = make_server(str(ROOT), port=0)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    port = srv.server_address[1]
+
+    _, data = load_loglist_rows()
+    paths = ["/stock?posisi=TPK%2042", "/stock?posisi=BLOK&jenis=Keruing", "/sources"]
+    paths += [f"/loglist?noBtg={r[0]}" for r in data[:200]]
+    n_req = max(2000, args.rows // 50)
+    workers = 8
+
+    def worker(k):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        lat = []
+        etags = {}
+        for j in range(k, n_req, workers):
+            p = paths[j % len(paths)]
+            hdr = {"If-None-Match": etags[p]} if p in etags and j % 2 else {}
+            t0 = time.perf_counter()
+            conn.request("GET", p, headers=hdr)
+            resp = conn.getresponse()
+            resp.read()
+            lat.append(time.perf_counter() - t0)
+            if resp.status == 200:
+                etags[p] = resp.getheader("ETag")
+            elif resp.status != 304:
+                raise SystemExit(f"query_server: {p} -> {resp.status}")
+        conn.close()
+        return lat
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(workers) as ex:
+        lats = sorted(x for part in ex.map(worker, range(workers)) for x in part)
+    dt = time.perf_counter() - t0
+    srv.shutdown()
+    srv.server_close()
+
+    p50 = lats[len(lats) // 2] * 1000
+    p95 = lats[int(len(lats) * 0.95)] * 1000
+    print(f"{'query':<12} {workers} clients, {len(lats)} req  {len(lats) / dt:8.0f} req/s"
+          f"  p50 {p50:.2f} ms  p95 {p95:.2f} ms")
+
+def parse_importtime(stderr):
+    """Ringkas output `python -X importtime`: total us + modul top-level terberat."""
+    top = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        # modul top-level tidak di-indent ("| json"), import turunan di-indent ("|   json.decoder")
+        if not name[1:].startswith(" "):
+            top.append((int(cum), name.strip()))
+    return sum(c for c, _ in top), sorted(top, reverse=True)[:3]
+
+def seed_cache_hit(tmp, name, outputs):
+    """
+    State "Excel tidak berubah" untuk exporter `name` di folder tmp: xlsx dummy,
+    output dummy, lalu cache_key + hash output diisi lewat JobCache.record
+    (key dihitung sama persis dengan exporter) -> lookup() = "current".
+    """
+    import importlib
+    import os
+
+    import stock_rows
+    from atomic_output import OutputTxn
+    from job_cache import JobCache, job_config
+
+    mod = importlib.import_module(name)
+    outs = [getattr(mod, a) for a in outputs]
+    cwd = os.getcwd()
+    os.chdir(tmp)   # path di key/state relatif, sama seperti saat exporter jalan
+    try:
+        Path(mod.XLSX).write_bytes(b"dummy " + mod.XLSX.encode())
+        job = JobCache(os.path.splitext(mod.OUT_CSV)[0], [mod.XLSX], mod.__file__,
+                       job_config(vars(mod)), outs, mod.STATE)
+        st = {"xlsx_sha256": job.input_hashes[mod.XLSX]}
+        with OutputTxn() as txn:
+            for p in job.outputs:
+                w = csv.writer(txn.open_text(p))
+                w.writerow(stock_rows.ROWS_HEADER if p == getattr(mod, "ROWS_CSV", None) else ["noBtg"])
+            job.record(st, txn)
+            txn.write_json(mod.STATE, st)
+    finally:
+        os.chdir(cwd)
+
+def bench_startup(args):
+    import subprocess
+    import tempfile
+
+    tools = Path(__file__).resolve().parent
+    # (script, atribut output yang masuk JobCache di script itu)
+    scripts = [
+        ("export_range_to_csv", ["OUT_CSV", "ROWS_CSV"]),
+        ("export_csv_loglist2", ["OUT_CSV"]),
+        ("export_range_to_csv_loglist_ibs", ["OUT_CSV", "ROWS_CSV"]),
+        ("export_stock_csv", ["OUT_CSV", "AGING_CSV"]),
+        ("export_stock_internal_csv", ["OUT_CSV"]),
+        ("export_stock_external_csv", ["OUT_CSV"]),
+        ("export_stock_ibs_csv", ["OUT_CSV"]),
+        ("stock_to_message", None),
+        ("stock_internal_to_message", None),
+        ("stock_external_to_message", None),
+        ("stock_ibs_to_message", None),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, outputs in scripts:
+            # folder sendiri per script: output dummy exporter stock tidak boleh
+            # menimpa stock*.csv asli yang dibaca script pesan
+            work = Path(tmp) / name
+            work.mkdir()
+            if outputs:
+                seed_cache_hit(work, name, outputs)
+            else:
+                for fn in ("stock.csv", "stock_internal.csv", "stock_external.csv", "stock_ibs.csv"):
+                    (work / fn).write_bytes((ROOT / fn).read_bytes())
+            cmd = [sys.executable, "-X", "importtime", str(tools / f"{name}.py")]
+            best, res = None, None
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                r = subprocess.run(cmd, cwd=work, capture_output=True, text=True)
+                dt = time.perf_counter() - t0
+                if r.returncode != 0:
+                    raise SystemExit(f"startup: {name} gagal\n{r.stderr[-2000:]}")
+                if best is None or dt < best:
+                    best, res = dt, r
+            total_us, heavy = parse_importtime(res.stderr)
+            heavy_mods = [m for m in ("openpyxl", "numpy") if re.search(rf"\|\s+{m}$", res.stderr, re.M)]
+            loaded = " + ".join(heavy_mods) + " dimuat" if heavy_mods else "tanpa openpyxl/numpy"
+            print(f"{'startup':<12} {name:<34} {best * 1000:7.1f} ms  import {total_us / 1000:6.1f} ms  ({loaded})")
+            for cum, mod in heavy:
+                print(f"{'':<12}   {mod:<32} {cum / 1000:7.1f} ms")
+
+def bench_csv_columns(args):
+    import tempfile
+    from csv_columns import read_columns
+
+    names = ["posisi", "jenis", "btg", "volume_m3", "mutasi_terakhir_posisi", "mutasi_terakhir_global"]
+    src = (ROOT / "stock.csv").read_bytes()
+    header, _, body = src.partition(b"\n")
+    reps = max(1, args.rows // max(1, body.count(b"\n")))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, data in [("stock.csv", src), (f"stock x{reps}", header + b"\n" + body * reps)]:
+            path = Path(tmp) / "stock.csv"
+            path.write_bytes(data)
+
+            def dictreader():
+                with path.open("r", encoding="utf-8", newline="") as f:
+                    return [tuple(r.get(n) or "" for n in names) for r in csv.DictReader(f)]
+
+            def mmapped():
+                return [tuple(v or "" for v in r) for r in read_columns(path, names)]
+
+            if dictreader() != mmapped():
+                raise SystemExit(f"csv_columns: hasil beda untuk {label}")
+            n = data.count(b"\n")
+            t_old = best_of(dictreader, args.repeat)
+            t_new = best_of(lambda: read_columns(path, names), args.repeat)
+            report("csv_columns", f"{label} DictReader", n, t_old)
+            report("csv_columns", f"{label} mmap", n, t_new, t_old)
+
+def bench_ntfy_pack(args):
+    from stock_render import compile_template, load_view, pack_messages, split_chunks
+
+    send_sleep = 1.0   # jeda antar POST di workflow
+    for name in ["stock.csv", "stock_ibs.csv"]:
+        rendered = compile_template("ntfy").render(load_view(ROOT / name))
+        for label, msgs in [("per posisi", split_chunks(rendered)),
+                            ("pack 4000 B", pack_messages(rendered, 4000))]:
+            sizes = [len(m.encode("utf-8")) for m in msgs]
+            est = len(msgs) * send_sleep
+            print(f"{'ntfy_pack':<12} {name:<14} {label:<12} {len(msgs):>3} pesan"
+                  f"  max {max(sizes):>5} B  total {sum(sizes):>6} B  ~{est:.0f} s kirim")
+
+def bench_kelas_bins(args):
+    import numpy as np
+    from kelas_bins import assign, parse_scheme
+
+    scheme = parse_scheme("ibs")
+    vals = np.random.default_rng(0).integers(15, 120, args.rows).astype(float)
+    lst = vals.tolist()
+
+    def per_value():
+        out = []
+        for v in lst:
+            label = ""
+            if v < scheme.lower[0]:
+                label = f"<{scheme.lower[0]:g}"
+            for lab, lo, hi in zip(scheme.labels, scheme.lower, scheme.upper):
+                if lo <= v < hi + 1:
+                    label = lab
+                    break
+            out.append(label)
+        return out
+
+    if per_value() != assign(vals, scheme):
+        raise SystemExit("kelas_bins: hasil beda")
+    t_old = best_of(per_value, args.repeat)
+    t_new = best_of(lambda: assign(vals, scheme), args.repeat)
+    report("kelas_bins", "per nilai", len(lst), t_old)
+    report("kelas_bins", "searchsorted", len(lst), t_new, t_old)
+
+def bench_sqlite(args):
+    import random
+    import sqlite3
+    import tempfile
+    import sqlite_sink
+    from csv_columns import read_columns
+
+    header, data = load_loglist_rows()
+    rows = [["" if v is None else str(v) for v in r] for r in synth_rows(data, args.rows)]
+    with tempfile.TemporaryDirectory() as d:
+        src = Path(d) / "loglist_synth.csv"
+        with src.open("w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            w.writerows(rows)
+        db = str(Path(d) / "bench.sqlite")
+
+        t_load = best_of(lambda: sqlite_sink.sync_csvs(db, [str(src)], force=True), args.repeat)
+        report("sqlite", "load (csv -> tabel)", len(rows), t_load)
+        print(f"{'sqlite':<12} {'insert throughput':<22} {len(rows) / t_load:8.0f} rows/s")
+
+        keys = [r[0] for r in random.Random(1).sample(rows, min(500, len(rows)))]
+        con = sqlite3.connect(db)
+        table = sqlite_sink.table_name(src)
+
+        def lookup_sql():
+            for k in keys:
+                con.execute(f'SELECT * FROM "{table}" WHERE noBtg = ?', (k,)).fetchall()
+
+        def group_sql():
+            con.execute(f'SELECT jenis, COUNT(*), SUM(volume) FROM "{table}" GROUP BY jenis').fetchall()
+
+        def lookup_csv():
+            # tanpa index: satu lookup = satu scan file
+            return [r for r in read_columns(src, ["noBtg", "jenis", "volume"]) if r[0] == keys[0]]
+
+        t_sql = best_of(lookup_sql, args.repeat) / len(keys)
+        t_csv = best_of(lookup_csv, args.repeat)
+        report("sqlite", "noBtg lookup (index)", len(rows), t_sql)
+        report("sqlite", "noBtg lookup (scan csv)", len(rows), t_csv)
+        report("sqlite", "group by jenis", len(rows), best_of(group_sql, args.repeat))
+        con.close()
+
+def write_synth_xlsx(path, n, invalid_pct=0, mixed=False):
+    """
+    Workbook sintetis mirip POSISI TERAKHIR: n baris data, noBtg unik (shared string).
+    invalid_pct: persen baris yang noBtg-nya 0 (hasil rumus) tapi kolom lain tetap terisi.
+    mixed: variasi yang biasa muncul di file asli -- tiap 10 baris ada nomor baris
+    yang bolong, kelas kadang inlineStr, tgl kadang numFmt tanggal custom.
+    """
+    import zipfile
+
+    ns = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    rel_ns = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    pkg = "http://schemas.openxmlformats.org/package/2006/relationships"
+    doc = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    jenis = ["Meranti", "Keruing", "Benuas", "MB", "MRS"]
+    kelas = ["40-49", "50-59", "60-UP"]
+    posisi = ["BLOK", "TPK 42", "LP LUWE", "DKDS", "MILIR 1-1-2026"]
+    fixed = ["noBtg", "jenis", "volume", "kelas", "tgl", "posisi"] + jenis + kelas + posisi
+    idx = {s: i for i, s in enumerate(fixed)}
+    base = len(fixed)
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            '</Types>')
+        zf.writestr("_rels/.rels", f'<?xml version="1.0" encoding="UTF-8"?><Relationships xmlns="{pkg}">'
+            f'<Relationship Id="rId1" Type="{doc}/officeDocument" Target="xl/workbook.xml"/></Relationships>')
+        zf.writestr("xl/workbook.xml", f'<?xml version="1.0" encoding="UTF-8"?><workbook {ns} {rel_ns}>'
+            '<sheets><sheet name="POSISI TERAKHIR" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        zf.writestr("xl/_rels/workbook.xml.rels", f'<?xml version="1.0" encoding="UTF-8"?><Relationships xmlns="{pkg}">'
+            f'<Relationship Id="rId1" Type="{doc}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{doc}/styles" Target="styles.xml"/>'
+            f'<Relationship Id="rId3" Type="{doc}/sharedStrings" Target="sharedStrings.xml"/></Relationships>')
+        zf.writestr("xl/styles.xml", f'<?xml version="1.0" encoding="UTF-8"?><styleSheet {ns}>'
+            '<numFmts count="1"><numFmt numFmtId="164" formatCode="dd/mm/yyyy hh:mm"/></numFmts>'
+            '<fonts count="1"><font/></fonts><fills count="1"><fill><patternFill patternType="none"/></fill></fills><borders count="1"><border/></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0"/></cellStyleXfs>'
+            '<cellXfs count="3"><xf numFmtId="0" xfId="0"/><xf numFmtId="14" xfId="0" applyNumberFormat="1"/>'
+            '<xf numFmtId="164" xfId="0" applyNumberFormat="1"/></cellXfs>'
+            '</styleSheet>')
+
+        with zf.open("xl/sharedStrings.xml", "w") as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?><sst {ns} count="{base + n}" uniqueCount="{base + n}">'.encode())
+            f.write("".join(f"<si><t>{s}</t></si>" for s in fixed).encode())
+            for i in range(0, n, 10000):
+                f.write("".join(f"<si><t>S{k:07d}</t></si>" for k in range(i, min(n, i + 10000))).encode())
+            f.write(b"</sst>")
+
+        with zf.open("xl/worksheets/sheet1.xml", "w") as f:
+            row_no = (lambda k: k + 3 + k // 10) if mixed else (lambda k: k + 3)
+            last = row_no(n - 1) if n else 2
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?><worksheet {ns}><dimension ref="A1:T{last}"/><sheetData>'.encode())
+            head = "".join(f'<c r="{c}2" t="s"><v>{idx[h]}</v></c>' for c, h in
+                           zip("BHMRST", ["noBtg", "jenis", "volume", "kelas", "tgl", "posisi"]))
+            f.write(f'<row r="1"/><row r="2">{head}</row>'.encode())
+            buf = []
+            for k in range(n):
+                r = row_no(k)
+                nobtg = '><v>0</v>' if k % 100 < invalid_pct else f' t="s"><v>{base + k}</v>'
+                if mixed and k % 7 == 0:
+                    kls = f' t="inlineStr"><is><t>{kelas[k % 3]}</t></is>'
+                else:
+                    kls = f' t="s"><v>{idx[kelas[k % 3]]}</v>'
+                tgl = f's="2"><v>{46200 + k % 60 + 0.25}</v>' if mixed and k % 2 else f's="1"><v>{46200 + k % 60}</v>'
+                buf.append(
+                    f'<row r="{r}"><c r="B{r}"{nobtg}</c>'
+                    f'<c r="H{r}" t="s"><v>{idx[jenis[k % 5]]}</v></c>'
+                    f'<c r="M{r}"><v>{1 + (k % 97) / 10}</v></c>'
+                    f'<c r="R{r}"{kls}</c>'
+                    f'<c r="S{r}" {tgl}</c>'
+                    f'<c r="T{r}" t="s"><v>{idx[posisi[k % 5]]}</v></c></row>')
+                if len(buf) == 10000:
+                    f.write("".join(buf).encode())
+                    buf = []
+            f.write(("".join(buf) + "</sheetData></worksheet>").encode())
+
+STREAM_CHILD = """
+import resource, sys, time
+sys.path.insert(0, sys.argv[1])
+from xlsx_stream import open_sheet
+from stock_aging import AgingCollector
+from stock_rows import add_record, is_invalid_nobtg, norm_str, parse_date, safe_float, should_skip_posisi
+t0 = time.perf_counter()
+ws = open_sheet(sys.argv[2], "POSISI TERAKHIR", stream=sys.argv[3] == "1")
+agg, aging, n = {}, AgingCollector(), 0
+for row in ws.iter_rows(min_row=3, values_only=True):
+    if is_invalid_nobtg(row[1]):
+        continue
+    posisi = norm_str(row[19])
+    if should_skip_posisi(posisi):
+        continue
+    jenis, vol, tgl = norm_str(row[7]), safe_float(row[12]), parse_date(row[18])
+    add_record(agg, posisi, norm_str(row[17]), jenis, vol, tgl)
+    aging.add(posisi, jenis, vol, tgl)
+    n += 1
+aging.compute()
+print(n, round(sum(r["vol"] for r in agg.values()), 3), time.perf_counter() - t0,
+      resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)
+"""
+
+def bench_stream(args):
+    import subprocess
+    import tempfile
+
+    tools = Path(__file__).resolve().parent
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synth.xlsx"
+        t0 = time.perf_counter()
+        write_synth_xlsx(path, args.rows)
+        print(f"{'stream':<12} tulis workbook sintetis {args.rows:>8} rows  "
+              f"{(time.perf_counter() - t0) * 1000:9.2f} ms  {path.stat().st_size / 1e6:.1f} MB")
+
+        modes = [("xlsx_stream", "1")]
+        if args.rows <= 200_000:
+            modes.append(("openpyxl read_only", "0"))
+        results = {}
+        for label, flag in modes:
+            r = subprocess.run([sys.executable, "-c", STREAM_CHILD, str(tools), str(path), flag],
+                               capture_output=True, text=True)
+            if r.returncode != 0:
+                raise SystemExit(f"stream: {label} gagal\n{r.stderr[-2000:]}")
+            n, vol, dt, rss = r.stdout.split()
+            results[label] = (n, vol)
+            print(f"{'stream':<12} {label:<22} {args.rows:>8} rows  {float(dt) * 1000:9.2f} ms"
+                  f"  maxrss {int(rss):>5} MB")
+            if flag == "1" and int(rss) > args.rss_mb:
+                raise SystemExit(f"stream: maxrss {rss} MB > batas {args.rss_mb} MB")
+        if len(set(results.values())) > 1:
+            raise SystemExit(f"stream: hasil beda {results}")
+
+def bench_prefilter(args):
+    """iter_columns tanpa / dengan skip_if (filter noBtg di parser), hasil harus sama."""
+    import tempfile
+
+    from stock_rows import is_invalid_nobtg, norm_str, safe_float
+    from xlsx_stream import open_sheet, iter_columns
+
+    cols = [2, 8, 13, 18, 19, 20]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synth.xlsx"
+        write_synth_xlsx(path, args.rows, args.invalid_pct)
+        ws = open_sheet(str(path), "POSISI TERAKHIR", stream=True)
+        ws.reader.shared_strings
+
+        def consume(skip_if):
+            n, vol = 0, 0.0
+            for row in iter_columns(ws, cols, 3, None, skip_if=skip_if):
+                if is_invalid_nobtg(row[0]):
+                    continue
+                norm_str(row[1]), norm_str(row[3]), norm_str(row[5])
+                vol += safe_float(row[2])
+                n += 1
+            return n, round(vol, 3)
+
+        results = {}
+        base = None
+        for label, skip_if in [("tanpa skip_if", None), ("skip_if noBtg", {2: is_invalid_nobtg})]:
+            dt = best_of(lambda: results.__setitem__(label, consume(skip_if)), args.repeat)
+            report("prefilter", f"{label} ({args.invalid_pct}%)", args.rows, dt, base)
+            base = base or dt
+        ws.reader.close()
+        if len(set(results.values())) > 1:
+            raise SystemExit(f"prefilter: hasil beda {results}")
+
+CASES = {
+    "csv_batch": bench_csv_batch,
+    "volume": bench_volume_check,
+    "csv_columns": bench_csv_columns,
+    "kelas_bins": bench_kelas_bins,
+    "ntfy_pack": bench_ntfy_pack,
+    "query": bench_query_server,
+    "startup": bench_startup,
+    "stream": bench_stream,
+    "sqlite": bench_sqlite,
+    "prefilter": bench_prefilter,
+}
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark tools/")
+    ap.add_argument("cases", nargs="*", help=f"pilihan: {', '.join(CASES)}")
+    ap.add_argument("--rows", type=int, default=100_000, help="jumlah baris data sintetis")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--rss-mb", type=int, default=160,
+                    help="stream: batas maxrss (MB) mode xlsx_stream, lewat = gagal")
+    ap.add_argument("--invalid-pct", type=int, default=50,
+                    help="prefilter: persen baris dengan noBtg tidak valid")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    names = args.cases or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise SystemExit(f"Case tidak dikenal: {', '.join(unknown)}")
+
+    for n in names:
+        CASES[n](args)
+
+if __name__ == "__main__":
+    main()
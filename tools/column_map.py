@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Posisi kolom dari nama header, bukan angka mati.
+
+Dulu exporter pakai COL_NOBTG = 2, COL_VOL = 13, OUT_MIN_COL = 34 ...; satu
+kolom disisipkan di Excel dan semua output geser tanpa ketahuan. Sekarang
+angka itu cuma DEFAULT: baris header (1..header_rows) dibaca sekali, tiap
+field dicari lewat nama / alias (FIELD_ALIASES), dan blok output loglist
+dicari sebagai deretan header persis (mis. noBtg, idBarcode, jenis, ...).
+
+- nama dibandingkan setelah dinormalisasi: huruf kecil, spasi/tanda baca
+  dibuang ("NO BTG" == "noBtg"), '%' tetap ("gr%");
+- kalau nama muncul lebih dari sekali (noBtg ada di B, AH, AS), yang dipakai
+  yang paling dekat dengan kolom default, maksimal MAX_SHIFT kolom;
+- tidak ketemu -> kolom default + warning (strict=True -> berhenti).
+
+Hasil disimpan per hash workbook di CACHE_PATH, jadi exporter lain yang baca
+workbook + sheet yang sama tidak perlu mencocokkan header lagi.
+
+    cmap = resolve(ws, XLSX, SHEET, xhash, {"noBtg": 2, "posisi": 20},
+                   block=(OUT_FIELDS, OUT_MIN_COL), header_rows=MIN_ROW)
+    cmap["posisi"]        # nomor kolom (1-based)
+    cmap.block            # list nomor kolom blok output
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from loglist_schema import col_letter   # bukan openpyxl.utils: import openpyxl ~200 ms di run yang skip
+
+CACHE_PATH = os.path.join(".job_cache", "column_map.json")
+CACHE_KEEP = 32     # entry cache yang disimpan
+MAX_SHIFT = 8       # kolom boleh geser sejauh ini dari default
+
+FIELD_ALIASES = {
+    "noBtg": ("noBtg", "no btg", "no batang", "nomor batang"),
+    "jenis": ("jenis", "jenis kayu"),
+    "volume": ("volume", "vol", "volume m3", "vol m3"),
+    "volume_ext": ("vol ext", "volume ext", "volume external", "vol external"),
+    "kelas": ("kelas", "kelas diameter", "kelas_diameter"),
+    "tgl": ("tgl", "tanggal", "tgl mutasi", "tanggal mutasi"),
+    "posisi": ("posisi", "posisi terakhir"),
+}
+
+_norm_re = re.compile(r"[^0-9a-z%]+")
+
+def norm_header(v):
+    if v is None:
+        return ""
+    return _norm_re.sub("", str(v).strip().lower())
+
+class ColumnMap:
+    def __init__(self, fields, block=None, missing=()):
+        self.fields = fields          # nama -> kolom (1-based)
+        self.block = block or []      # kolom blok output, urut
+        self.missing = list(missing)  # field/blok yang pakai default
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def describe(self):
+        parts = [f"{k}={col_letter(c)}" for k, c in self.fields.items()]
+        if self.block:
+            parts.append(f"blok={col_letter(self.block[0])}..{col_letter(self.block[-1])}")
+        return ", ".join(parts)
+
+    def to_json(self):
+        return {"fields": self.fields, "block": self.block, "missing": self.missing}
+
+def header_cells(header_rows):
+    """list tuple baris header -> dict nama_normal -> [kolom, ...] (kolom 1-based)."""
+    found = {}
+    for row in header_rows:
+        for j, v in enumerate(row, start=1):
+            k = norm_header(v)
+            if k:
+                cols = found.setdefault(k, [])
+                if j not in cols:
+                    cols.append(j)
+    return found
+
+def nearest(cols, default):
+    ok = [c for c in cols if abs(c - default) <= MAX_SHIFT]
+    return min(ok, key=lambda c: (abs(c - default), c)) if ok else None
+
+def find_field(found, name, default):
+    cols = []
+    for alias in FIELD_ALIASES.get(name, (name,)):
+        cols.extend(found.get(norm_header(alias), ()))
+    return nearest(cols, default)
+
+def find_block(header_rows, names, default_start):
+    """Kolom awal deretan header == names (urut, bersebelahan) terdekat dari default."""
+    want = [norm_header(n) for n in names]
+    starts = []
+    for row in header_rows:
+        keys = [norm_header(v) for v in row]
+        for j in range(len(keys) - len(want) + 1):
+            if keys[j:j + len(want)] == want:
+                starts.append(j + 1)
+    return nearest(starts, default_start)
+
+def match(header_rows, fields, block=None):
+    """fields: dict nama -> kolom default; block: (names, default_start) atau None."""
+    found = header_cells(header_rows)
+    resolved, missing = {}, []
+    for name, default in fields.items():
+        col = find_field(found, name, default)
+        if col is None:
+            missing.append(name)
+            col = default
+        resolved[name] = col
+    cols = []
+    if block is not None:
+        names, default_start = block
+        start = find_block(header_rows, names, default_start)
+        if start is None:
+            missing.append("blok " + ",".join(names))
+            start = default_start
+        cols = list(range(start, start + len(names)))
+    return ColumnMap(resolved, cols, missing)
+
+# ---------- cache ----------
+def cache_key(xhash, sheet, fields, block, header_rows):
+    spec = json.dumps([sheet, fields, block, header_rows, FIELD_ALIASES, MAX_SHIFT],
+                      sort_keys=True, ensure_ascii=False)
+    return xhash + ":" + hashlib.sha256(spec.encode("utf-8")).hexdigest()[:16]
+
+def load_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(path, cache):
+    from atomic_output import OutputTxn
+
+    keys = list(cache)
+    for k in keys[:-CACHE_KEEP]:
+        del cache[k]
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with OutputTxn() as txn:
+            txn.write_json(path, cache)
+    except OSError as e:
+        print(f"Warning: gagal simpan cache kolom: {e}")
+
+# ---------- main ----------
+def resolve(ws, xlsx, sheet, xhash, fields, block=None, header_rows=3, strict=False,
+            cache_path=CACHE_PATH):
+    """
+    ws: worksheet (openpyxl / xlsx_stream.StreamSheet), hanya dibaca kalau
+    cache belum ada. Return ColumnMap.
+    """
+    blk = [list(block[0]), block[1]] if block else None
+    key = cache_key(xhash, sheet, fields, blk, header_rows)
+    cache = load_cache(cache_path) if cache_path else {}
+    hit = cache.get(key)
+    if hit is not None:
+        cmap = ColumnMap(hit["fields"], hit["block"], hit["missing"])
+    else:
+        rows = list(ws.iter_rows(min_row=1, max_row=header_rows, values_only=True))
+        cmap = match(rows, fields, block)
+        if cache_path:
+            cache.pop(key, None)
+            cache[key] = cmap.to_json()
+            save_cache(cache_path, cache)
+
+    if cmap.missing:
+        msg = (f"{xlsx} [{sheet}]: header tidak ketemu untuk {', '.join(cmap.missing)}; "
+               f"pakai kolom default ({cmap.describe()})")
+        if strict:
+            raise SystemExit(msg)
+        print("Warning: " + msg)
+    moved = [f"{k} {col_letter(fields[k])}->{col_letter(c)}"
+             for k, c in cmap.fields.items() if c != fields[k]]
+    if block and cmap.block and cmap.block[0] != block[1]:
+        moved.append(f"blok {col_letter(block[1])}->{col_letter(cmap.block[0])}")
+    if moved:
+        print(f"Kolom bergeser menurut header: {', '.join(moved)}")
+    return cmap
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Writer CSV per batch untuk range exporter (loglist1 / loglist2 / loglist_ibs).
+
+Dulu: cell_str() dipanggil per cell + w.writerow() per baris.
+Sekarang: baris ditampung per BATCH_ROWS, dikonversi per KOLOM sekaligus
+(pakai converter yang dipilih sekali dari tipe cell yang terlihat di batch
+pertama), lalu ditulis dengan writerows().
+
+Hasil harus byte-identik dengan jalur lama (cell_str per cell).
+"""
+
+import csv
+
+BATCH_ROWS = 4096
+
+def cell_str(v):
+    if v is None:
+        return ""
+    if isinstance(v, str):
+        s = v.strip()
+        if s == "=":
+            return ""
+        return s
+    return str(v)
+
+# ---------- converter per kolom ----------
+def _col_any(col):
+    return list(map(cell_str, col))
+
+def _col_str(col):
+    return ["" if s == "=" else s for s in map(str.strip, col)]
+
+def _col_num(col):
+    # int/float: str() sama persis dengan cell_str()
+    return list(map(str, col))
+
+# (nama, fungsi, tipe yang boleh masuk jalur cepat)
+CONV_ANY = ("any", _col_any, None)
+CONV_STR = ("str", _col_str, frozenset((str,)))
+CONV_NUM = ("num", _col_num, frozenset((int, float)))
+
+def pick_converter(col):
+    types = set(map(type, col))
+    if types == {str}:
+        return CONV_STR
+    if types and types <= CONV_NUM[2]:
+        return CONV_NUM
+    return CONV_ANY
+
+def pick_converters(rows):
+    return [pick_converter(col) for col in zip(*rows)]
+
+def convert_batch(rows, convs, check=True):
+    """
+    Konversi satu batch (list of tuple, lebar sama) -> iterator baris string.
+    Kalau satu kolom di batch ini ada tipe di luar dugaan, kolom itu saja
+    yang jatuh ke cell_str biasa (hasil tetap sama).
+    """
+    out_cols = []
+    for (_name, fn, allowed), col in zip(convs, zip(*rows)):
+        if check and allowed is not None and not set(map(type, col)) <= allowed:
+            fn = _col_any
+        out_cols.append(fn(col))
+    return zip(*out_cols)
+
+class BatchCsvWriter:
+    def __init__(self, f, batch_rows=BATCH_ROWS):
+        self.writer = csv.writer(f)
+        self.batch_rows = batch_rows
+        self.batch = []
+        self.convs = None
+        self.width = None
+        self.rows_written = 0
+
+    def write_header(self, row):
+        # header selalu string, jangan ikut dipakai untuk memilih converter
+        self.writer.writerow([cell_str(v) for v in row])
+
+    def add(self, row):
+        self.batch.append(row)
+        if len(self.batch) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        batch = self.batch
+        if not batch:
+            return
+        widths = set(map(len, batch))
+        if len(widths) != 1:
+            # lebar baris beda-beda (jarang) -> jalur lama per baris
+            self.writer.writerows([cell_str(v) for v in row] for row in batch)
+        else:
+            width = widths.pop()
+            if width == 0:
+                self.writer.writerows([()] * len(batch))
+                self.rows_written += len(batch)
+                self.batch = []
+                return
+            check = True
+            if self.convs is None or self.width != width:
+                self.convs = pick_converters(batch)
+                self.width = width
+                check = False  # baru dipilih dari batch ini, pasti cocok
+            self.writer.writerows(convert_batch(batch, self.convs, check))
+        self.rows_written += len(batch)
+        self.batch = []
+
+    def close(self):
+        self.flush()
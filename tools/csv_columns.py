@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Baca beberapa kolom saja dari CSV (stock.csv, loglist*.csv) lewat mmap.
+
+Posisi kolom dicari sekali dari header (toleran beda kapital/spasi, sama
+seperti getcol lama). Isi file di-decode sekali jalan, lalu tiap baris cukup
+di-split per koma dan kolom yang diminta diambil pakai itemgetter (tanpa
+dict per baris). Baris yang ada tanda kutip (isi berisi koma / kutip) jatuh
+ke csv.reader supaya hasilnya tetap sama.
+
+Contoh:
+    rows = read_columns("stock.csv", ["posisi", "jenis", "btg", "volume_m3"],
+                        required=["posisi", "jenis"])
+    for posisi, jenis, btg, vol in rows:
+        ...
+
+Nilai kolom yang tidak ada di header -> None, sel kosong / baris pendek -> "".
+Baris kosong dilewati (sama dengan csv.DictReader).
+"""
+
+import csv
+import mmap
+import os
+from operator import itemgetter
+from pathlib import Path
+
+BOM = b"\xef\xbb\xbf"
+
+def resolve_columns(header, names):
+    """Return index kolom untuk tiap nama (None kalau tidak ada)."""
+    fields = {}
+    for i, c in enumerate(header):
+        fields[c.strip()] = i   # nama dobel: yang terakhir menang (seperti DictReader)
+    lower = {}
+    for k, i in fields.items():
+        lower.setdefault(k.lower(), i)
+    out = []
+    for n in names:
+        if n in fields:
+            out.append(fields[n])
+        else:
+            out.append(lower.get(n.lower()))
+    return out
+
+def _split_slow(line):
+    return next(csv.reader([line]))
+
+def read_columns(path, names, required=()):
+    """
+    Return list tuple (satu per baris data) berisi nilai kolom `names` (str).
+    SystemExit kalau file kosong atau kolom `required` tidak ada.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise SystemExit(f"{path.name} kosong / tidak ada header")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # header dulu (baris pertama saja), sisanya di-decode sekaligus
+            nl = mm.find(b"\n")
+            end = len(mm) if nl < 0 else nl
+            header = mm[:end].rstrip(b"\r")
+            if header.startswith(BOM):
+                header = header[len(BOM):]
+            header = header.decode("utf-8")
+            if not header:
+                raise SystemExit(f"{path.name} kosong / tidak ada header")
+            body = mm[end + 1:].decode("utf-8") if nl >= 0 else ""
+
+    split = _split_slow if '"' in header else (lambda s: s.split(","))
+    idx = resolve_columns(split(header), names)
+    missing = [n for n, i in zip(names, idx) if i is None and n in required]
+    if missing:
+        raise SystemExit(f"Kolom wajib tidak ada di {path.name}: {', '.join(missing)}")
+
+    # kolom yang tidak ada diisi None, yang ada diambil per index
+    present = [i for i in idx if i is not None]
+    width = max(present, default=-1) + 1
+    if len(present) > 1:
+        get = itemgetter(*present)
+    else:
+        get = lambda parts: tuple(parts[i] for i in present)
+
+    def pad(vals):
+        it = iter(vals)
+        return tuple(next(it) if i is not None else None for i in idx)
+
+    full = len(present) == len(names)
+    out = []
+    append = out.append
+    for line in body.split("\n"):
+        if line.endswith("\r"):
+            line = line[:-1]
+        if not line:
+            continue
+        parts = _split_slow(line) if '"' in line else line.split(",")
+        if len(parts) < width:
+            parts = parts + [""] * (width - len(parts))
+        vals = get(parts)
+        append(vals if full else pad(vals))
+    return out
@@ -1,51 +1,48 @@
-import csv, json, hashlib, os
-from openpyxl import load_workbook
+import loglist_export
+import run_metrics
 
 # INPUT
 XLSX = "INPUT_ANGKUTAN_STOCK_NEW.xlsx"
 SHEET = "POSISI TERAKHIR"
-
-# OUTPUT RANGE (tetap yang kamu mau): Y..AH
+# True = baca pakai xlsx_stream.py (memori terbatas, shared strings besar
+# disimpan di disk); False = openpyxl read_only
+STREAM = True          # False -> openpyxl read_only (parse semua kolom lo..hi per baris)
+STREAM_CHUNK = 50000   # mode stream: cek volume per sekian baris, bukan sekaligus
+
+# OUTPUT: blok kolom yang header-nya persis OUT_FIELDS (dicari di baris
+# 1..MIN_ROW, lihat column_map.py). OUT_MIN_COL = awal blok kalau tidak ketemu.
+OUT_FIELDS = ["noBtg", "jenis", "panjang", "pangkal", "ujung",
+              "rata2", "volume", "grCm", "grPersen"]
 OUT_MIN_COL = 45  # AS
-OUT_MAX_COL = 53  # BA
 
-# READ RANGE (tambahkan kolom T untuk filter): T..AH
-READ_MIN_COL = 20  # T (posisi terakhir)
-READ_MAX_COL = 53  # BA
+# Kolom posisi terakhir untuk filter (dicari dari header, angka = default)
+COL_POSISI = 20  # T
+HEADER_STRICT = False  # True = berhenti kalau ada kolom yang tidak ketemu di header
 
 # ROWS
 MIN_ROW = 3        # pastikan ini baris header kamu (kalau header di row 2)
 MAX_ROW = 10000
 
+# Validasi tipe per kolom (lihat loglist_schema.py)
+VALIDATE_SCHEMA = True
+SCHEMA_STRICT = False   # True = baris yang gagal validasi tidak ikut ditulis
+MAX_SCHEMA_ERRORS_PRINT = 20
+# Hitung ulang rata2/gr%/volume dan tandai yang tidak cocok (butuh VALIDATE_SCHEMA)
+CHECK_VOLUME = True
+
 OUT_CSV = "loglist2.csv"
 STATE = ".sync_state_loglist2.json"
-
-def cell_str(v):
-    if v is None:
-        return ""
-    if isinstance(v, str):
-        s = v.strip()
-        if s == "=":
-            return ""
-        return s
-    return str(v)
-
-def sha256_file(path):
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-def load_state():
-    if not os.path.exists(STATE):
-        return {}
-    with open(STATE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def save_state(st):
-    with open(STATE, "w", encoding="utf-8") as f:
-        json.dump(st, f, ensure_ascii=False, indent=2)
+# Salinan output di SQLite (lihat sqlite_sink.py). None = tidak dipakai;
+# contoh: "data_apk.sqlite"
+SQLITE_DB = None
+# Shard per posisi (kolom T) / awalan noBtg + manifest hash per shard,
+# lihat shard_output.py. None = tidak di-shard; "posisi" atau "prefix".
+# Catatan: baris shard ditampung di memori sampai akhir export.
+SHARD_BY = None
+SHARD_DIR = "shards/loglist2"
+# Snapshot gzip + patch per noBtg untuk klien (lihat publish_delta.py).
+# None = tidak dipublish; contoh: "publish/loglist2"
+PUBLISH_DIR = None
 
 def is_invalid_nobtg(x) -> bool:
     if x is None:
@@ -71,60 +68,8 @@ def should_skip_posisi(posisi_raw) -> bool:
     return False
 
 def main():
-    # skip kalau Excel tidak berubah
-    xhash = sha256_file(XLSX)
-    st = load_state()
-    if st.get("xlsx_sha256") == xhash:
-        print("Excel unchanged; skip export.")
-        return
-
-    wb = load_workbook(XLSX, read_only=True, data_only=True)
-    if SHEET not in wb.sheetnames:
-        raise SystemExit(f"Sheet '{SHEET}' tidak ditemukan. Ada: {wb.sheetnames}")
-    ws = wb[SHEET]
-
-    out_start = OUT_MIN_COL - READ_MIN_COL
-    out_end = out_start + (OUT_MAX_COL - OUT_MIN_COL + 1)
-
-    wrote_any = False
-    with open(OUT_CSV, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-
-        for i, row in enumerate(ws.iter_rows(
-            min_row=MIN_ROW,
-            max_row=MAX_ROW,
-            min_col=READ_MIN_COL,
-            max_col=READ_MAX_COL,
-            values_only=True
-        ), start=MIN_ROW):
-
-            posisi_raw = row[0]  # kolom T
-            out_row = row[out_start:out_end]  # Y..AH
-
-            # header wajib ikut (baris pertama di range)
-            if i == MIN_ROW:
-                w.writerow([cell_str(v) for v in out_row])
-                wrote_any = True
-                continue
-
-            nobtg_raw = out_row[0]  # kolom Y = noBtg (sesuai output kamu)
-
-            # filter baris:
-            if is_invalid_nobtg(nobtg_raw):
-                continue
-
-            # skip kalau posisi DKDS / MILIR
-            if should_skip_posisi(posisi_raw):
-                continue
-
-            w.writerow([cell_str(v) for v in out_row])
-            wrote_any = True
-
-    if not wrote_any:
-        print("Warning: tidak ada baris data yang lolos filter.")
-    st["xlsx_sha256"] = xhash
-    save_state(st)
-    print(f"Export done -> {OUT_CSV}")
+    # job cache, column_map, CSV/ROWS_CSV/shard/sqlite/publish: lihat loglist_export.py
+    loglist_export.run(globals())
 
 if __name__ == "__main__":
-    main()
+    run_metrics.run(main)
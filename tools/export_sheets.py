@@ -0,0 +1,125 @@
+import json, os, time
+from concurrent.futures import ThreadPoolExecutor
+
+from atomic_output import OutputTxn
+from job_cache import JobCache, job_config
+import run_metrics
+from csv_batch import BatchCsvWriter
+
+# Export beberapa sheet dari SATU workbook sekaligus (selain POSISI TERAKHIR
+# yang sudah dipegang exporter lain). Zip dibuka sekali, shared strings
+# dimuat sekali, lalu tiap sheet (member XML sendiri di zip) diparse di
+# thread sendiri dan ditulis ke CSV-nya sendiri, semua dalam satu transaksi.
+
+# INPUT
+XLSX = "INPUT_ANGKUTAN_STOCK_NEW.xlsx"
+
+# (sheet, output csv, min_row, max_row); max_row None = sampai akhir sheet.
+# Baris min_row ikut ditulis apa adanya (biasanya header). Nama sheet harus
+# persis sama dengan di workbook (sheet yang tidak ada -> SystemExit), jadi
+# kosong dulu sampai dicek ke file aslinya. Contoh:
+#   ("ANGKUTAN", "angkutan.csv", 1, None),
+#   ("POSISI TERAKHIR", "posisi_terakhir_raw.csv", 3, 10000),
+SHEET_JOBS = []
+WORKERS = 4   # thread paralel (maks = jumlah sheet)
+
+STATE = ".sync_state_sheets.json"
+# Salinan output di SQLite (lihat sqlite_sink.py). None = tidak dipakai;
+# contoh: "data_apk.sqlite"
+SQLITE_DB = None
+
+def load_state():
+    if not os.path.exists(STATE):
+        return {}
+    with open(STATE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(txn, st):
+    # state ikut transaksi output, ditulis setelah CSV
+    txn.write_json(STATE, st)
+
+def is_empty_row(row):
+    return all(v is None or (isinstance(v, str) and not v.strip()) for v in row)
+
+def extract_sheet(reader, sheet, f, min_row, max_row):
+    """Satu sheet -> CSV (baris kosong dibuang). Jalan di thread worker."""
+    t0 = time.perf_counter()
+    w = BatchCsvWriter(f)
+    header_done = False
+    for row in reader.iter_rows(sheet, min_row, max_row):
+        if not header_done:
+            w.write_header(row)
+            header_done = True
+            continue
+        if is_empty_row(row):
+            continue
+        w.add(row)
+    w.close()
+    return w.rows_written, time.perf_counter() - t0
+
+def main():
+    m = run_metrics.current()
+    if not SHEET_JOBS:
+        m.status = "skip"
+        print("SHEET_JOBS kosong; tidak ada sheet yang di-export.")
+        return
+    outputs = [out for _sheet, out, _lo, _hi in SHEET_JOBS]
+    if len(set(outputs)) != len(outputs):
+        raise SystemExit(f"SHEET_JOBS: output dobel {outputs}")
+
+    # skip kalau Excel, kode tool dan config tidak berubah (lihat job_cache.py)
+    job = JobCache("sheets", [XLSX], __file__, job_config(globals()), outputs, STATE)
+    st = load_state()
+    hit = job.lookup(st)
+    m.lap("cache")
+    if hit == "current":
+        m.status = "skip"
+        print("Excel unchanged; skip export.")
+        return
+    if hit == "restored":
+        m.status = "restored"
+        print(f"Output dipulihkan dari cache ({job.entry_dir}); skip export.")
+        if SQLITE_DB:
+            import sqlite_sink
+            sqlite_sink.sink(SQLITE_DB, job.outputs)
+        return
+
+    from xlsx_stream import XlsxReader  # import berat, baru saat perlu
+
+    t0 = time.perf_counter()
+    with XlsxReader(XLSX) as reader:
+        missing = [s for s, *_ in SHEET_JOBS if s not in reader.sheets]
+        if missing:
+            raise SystemExit(f"Sheet {missing} tidak ditemukan. Ada: {reader.sheetnames}")
+        reader.shared_strings   # dimuat sekali di sini, dipakai semua thread
+
+        txn = OutputTxn()
+        with txn:
+            # file dibuka di thread utama (OutputTxn tidak thread-safe),
+            # worker cuma menulis ke file miliknya sendiri
+            files = [txn.open_text(out) for out in outputs]
+            workers = max(1, min(WORKERS, len(SHEET_JOBS)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(extract_sheet, reader, sheet, f, lo, hi)
+                           for (sheet, _out, lo, hi), f in zip(SHEET_JOBS, files)]
+                results = [fut.result() for fut in futures]
+            m.lap("extract")
+            m.set("sheets", len(results))
+            m.set("rows_written", sum(n for n, _secs in results))
+            st["xlsx_sha256"] = job.input_hashes[XLSX]
+            job.record(st, txn)
+            save_state(txn, st)
+
+    job.store()
+    m.lap("write")
+    if SQLITE_DB:
+        import sqlite_sink
+        sqlite_sink.sink(SQLITE_DB, job.outputs)
+
+    for (sheet, out, _lo, _hi), (n, secs) in zip(SHEET_JOBS, results):
+        note = "" if txn.changed[out] else " (isi sama, file tidak ditulis ulang)"
+        print(f"[{sheet}] {n} baris -> {out} ({secs:.2f}s){note}")
+    print(f"Export {len(SHEET_JOBS)} sheet, {workers} thread, {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    run_metrics.run(main)
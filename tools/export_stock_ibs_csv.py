@@ -1,26 +1,40 @@
 import csv, json, hashlib, os
-from datetime import datetime, date
-from openpyxl import load_workbook
+
+from atomic_output import OutputTxn
+from job_cache import JobCache, job_config
+import run_metrics
+from stock_rows import (
+    norm_str, is_invalid_nobtg, safe_float, parse_date,
+    add_record, write_stock_csv,
+)
 
 # ========= INPUT =========
 XLSX  = "UKUR_MUTASI_LOG_IBS.xlsx"
 SHEET = "POSISI TERAKHIR"
+# True = baca pakai xlsx_stream.py (memori terbatas, shared strings besar
+# disimpan di disk); False = openpyxl read_only
+STREAM = True          # False -> openpyxl read_only (parse semua kolom lo..hi per baris)
 
 # baris data dimulai dari row 3 (sesuaikan kalau header kamu di row 3)
 MIN_ROW = 3
 MAX_ROW = 10000
 
-# Kolom (1-based)
+# Kolom (1-based): dicari dari nama header (lihat column_map.py),
+# angka di bawah = default kalau header tidak ketemu
 COL_NOBTG  = 2   # B
-COL_JENIS  = 7   # H
-COL_VOL    = 32  # AB
+COL_JENIS  = 7   # G
+COL_VOL    = 32  # AF
 COL_KELAS  = 18  # R
 COL_TGL    = 19  # S
 COL_POSISI = 20  # T
+HEADER_STRICT = False  # True = berhenti kalau ada kolom yang tidak ketemu di header
 
 # ========= OUTPUT =========
 OUT_CSV = "stock_ibs.csv"
 STATE   = ".sync_state_stock_ibs.json"
+# Salinan output di SQLite (lihat sqlite_sink.py). None = tidak dipakai;
+# contoh: "data_apk.sqlite"
+SQLITE_DB = None
 
 # Stop baca kalau ketemu baris kosong berturut-turut (biar cepat)
 MAX_EMPTY_STREAK = 250
@@ -38,67 +52,9 @@ def load_state():
     with open(STATE, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def save_state(st):
-    with open(STATE, "w", encoding="utf-8") as f:
-        json.dump(st, f, ensure_ascii=False, indent=2)
-
-def norm_str(v):
-    """CATATAN: tidak mengubah '=' jadi kosong (sesuai permintaan)."""
-    if v is None:
-        return ""
-    return str(v).strip()
-
-def is_invalid_nobtg(v) -> bool:
-    """
-    Patokan baris kosong:
-    - noBtg kosong
-    - "0", "0.0"
-    - "-"
-    (TIDAK memasukkan "=")
-    """
-    if v is None:
-        return True
-    if isinstance(v, (int, float)):
-        return float(v) == 0.0
-    s = str(v).strip()
-    if s == "":
-        return True
-    if s == "-":
-        return True
-    # handle string angka
-    if s == "0" or s == "0.0":
-        return True
-    return False
-
-def safe_float(v):
-    try:
-        if v is None:
-            return 0.0
-        if isinstance(v, (int, float)):
-            return float(v)
-        s = norm_str(v).replace(",", ".")
-        return float(s) if s else 0.0
-    except:
-        return 0.0
-
-def parse_date(v):
-    # Openpyxl bisa return datetime/date kalau cell type date
-    if isinstance(v, datetime):
-        return v.date()
-    if isinstance(v, date):
-        return v
-
-    s = norm_str(v)
-    if not s:
-        return None
-
-    # coba beberapa format umum
-    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
-        try:
-            return datetime.strptime(s, fmt).date()
-        except:
-            pass
-    return None
+def save_state(txn, st):
+    # state ikut transaksi output, ditulis setelah CSV
+    txn.write_json(STATE, st)
 
 def should_skip_posisi(posisi_raw) -> bool:
     """
@@ -116,17 +72,35 @@ def should_skip_posisi(posisi_raw) -> bool:
     return False
 
 def main():
-    # skip kalau Excel tidak berubah
-    xhash = sha256_file(XLSX)
+    m = run_metrics.current()
+    # skip kalau Excel, kode tool dan config tidak berubah (lihat job_cache.py)
+    job = JobCache(os.path.splitext(OUT_CSV)[0], [XLSX], __file__, job_config(globals()),
+                   [OUT_CSV], STATE)
+    xhash = job.input_hashes[XLSX]
     st = load_state()
-    if st.get("xlsx_sha256") == xhash:
+    hit = job.lookup(st)
+    m.lap("cache")
+    if hit == "current":
+        m.status = "skip"
         print("Excel unchanged; skip export.")
-        #return
-
-    wb = load_workbook(XLSX, read_only=True, data_only=True)
-    if SHEET not in wb.sheetnames:
-        raise SystemExit(f"Sheet '{SHEET}' tidak ditemukan. Ada: {wb.sheetnames}")
-    ws = wb[SHEET]
+        return
+    if hit == "restored":
+        m.status = "restored"
+        print(f"Output dipulihkan dari cache ({job.entry_dir}); skip export.")
+        if SQLITE_DB:
+            import sqlite_sink
+            sqlite_sink.sink(SQLITE_DB, job.outputs)
+        return
+
+    from xlsx_stream import open_sheet, iter_columns  # import berat, baru saat perlu
+    import column_map
+    ws = open_sheet(XLSX, SHEET, stream=STREAM)
+    cmap = column_map.resolve(ws, XLSX, SHEET, xhash, {
+        "noBtg": COL_NOBTG, "jenis": COL_JENIS, "volume": COL_VOL,
+        "kelas": COL_KELAS, "tgl": COL_TGL, "posisi": COL_POSISI,
+    }, header_rows=MIN_ROW, strict=HEADER_STRICT)
+    # baca sempit (STREAM): 6 kolom ini saja; openpyxl tetap lo..hi
+    cols = [cmap[k] for k in ("noBtg", "jenis", "volume", "kelas", "tgl", "posisi")]
 
     # detail group: (posisi, kelas, jenis) -> btg, vol, last_date
     agg = {}
@@ -135,10 +109,12 @@ def main():
     empty_streak = 0
     processed_rows = 0
 
-    for row in ws.iter_rows(min_row=MIN_ROW, max_row=MAX_ROW, values_only=True):
+    # baris noBtg tidak valid sudah dibuang di parser (sel lain tidak dikonversi),
+    # tetap keluar sebagai tuple None supaya empty_streak sama
+    for row in iter_columns(ws, cols, MIN_ROW, MAX_ROW, skip_if={cols[0]: is_invalid_nobtg}):
         processed_rows += 1
 
-        nobtg_raw = row[COL_NOBTG - 1]
+        nobtg_raw = row[0]
 
         # Filter cepat dulu berdasarkan noBtg
         if is_invalid_nobtg(nobtg_raw):
@@ -151,92 +127,43 @@ def main():
             empty_streak = 0
 
         # Baru baca kolom lain kalau noBtg valid
-        jenis  = norm_str(row[COL_JENIS  - 1])
-        vol    = safe_float(row[COL_VOL  - 1])
-        kelas  = norm_str(row[COL_KELAS  - 1])
-        tgl    = parse_date(row[COL_TGL  - 1])
-        posisi = norm_str(row[COL_POSISI - 1])
+        jenis  = norm_str(row[1])
+        vol    = safe_float(row[2])
+        kelas  = norm_str(row[3])
+        tgl    = parse_date(row[4])
+        posisi = norm_str(row[5])
 
         if should_skip_posisi(posisi):
             continue
 
-        key = (posisi, kelas, jenis)
-        rec = agg.get(key)
-        if rec is None:
-            rec = {"btg": 0, "vol": 0.0, "last": None}
-            agg[key] = rec
-
-        rec["btg"] += 1
-        rec["vol"] += vol
-
-        if tgl:
-            if rec["last"] is None or tgl > rec["last"]:
-                rec["last"] = tgl
-            if last_global is None or tgl > last_global:
-                last_global = tgl
-
-    # total per posisi + total global
-    pos_tot = {}
-    glob_btg = 0
-    glob_vol = 0.0
-
-    for (posisi, _kelas, _jenis), rec in agg.items():
-        pt = pos_tot.get(posisi)
-        if pt is None:
-            pt = {"btg": 0, "vol": 0.0, "last": None}
-            pos_tot[posisi] = pt
-
-        pt["btg"] += rec["btg"]
-        pt["vol"] += rec["vol"]
-        if rec["last"]:
-            if pt["last"] is None or rec["last"] > pt["last"]:
-                pt["last"] = rec["last"]
-
-        glob_btg += rec["btg"]
-        glob_vol += rec["vol"]
-
-    last_g_str = last_global.strftime("%d-%m-%Y") if last_global else ""
-
-    # tulis CSV
-    with open(OUT_CSV, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow([
-            "posisi", "kelas_diameter", "jenis",
-            "btg", "volume_m3",
-            "mutasi_terakhir_posisi",
-            "mutasi_terakhir_global"
-        ])
-
-        # urutkan detail
-        items = sorted(agg.items(), key=lambda x: (x[0][0], x[0][1], x[0][2]))
-
-        current_pos = None
-        for (posisi, kelas, jenis), rec in items:
-            # kalau pindah posisi, tulis TOTAL posisi sebelumnya
-            if current_pos is not None and posisi != current_pos:
-                pt = pos_tot[current_pos]
-                pt_last = pt["last"].strftime("%d-%m-%Y") if pt["last"] else ""
-                w.writerow([current_pos, "TOTAL", "", pt["btg"], round(pt["vol"], 3), pt_last, last_g_str])
-                w.writerow([])  # pemisah
-
-            current_pos = posisi
-            last_pos = rec["last"].strftime("%d-%m-%Y") if rec["last"] else ""
-            w.writerow([posisi, kelas, jenis, rec["btg"], round(rec["vol"], 3), last_pos, last_g_str])
-
-        # TOTAL posisi terakhir
-        if current_pos is not None:
-            pt = pos_tot[current_pos]
-            pt_last = pt["last"].strftime("%d-%m-%Y") if pt["last"] else ""
-            w.writerow([current_pos, "TOTAL", "", pt["btg"], round(pt["vol"], 3), pt_last, last_g_str])
-            w.writerow([])
-
-        # TOTAL GLOBAL
-        w.writerow(["GLOBAL", "TOTAL", "", glob_btg, round(glob_vol, 3), last_g_str, last_g_str])
-
-    st["xlsx_sha256"] = xhash
-    save_state(st)
-    print(f"Export done -> {OUT_CSV}")
+        add_record(agg, posisi, kelas, jenis, vol, tgl)
+        if tgl and (last_global is None or tgl > last_global):
+            last_global = tgl
+
+    # tulis CSV (temp + rename, state ikut di transaksi yang sama)
+    m.lap("read")
+    m.set("rows_read", processed_rows)
+    m.set("groups", len(agg))
+    txn = OutputTxn()
+    with txn:
+        f = txn.open_text(OUT_CSV)
+        write_stock_csv(csv.writer(f), agg, last_global)
+
+        st["xlsx_sha256"] = xhash
+        job.record(st, txn)
+        save_state(txn, st)
+
+    job.store()
+    m.lap("write")
+    if SQLITE_DB:
+        import sqlite_sink
+        sqlite_sink.sink(SQLITE_DB, job.outputs)
+
+    if txn.changed[OUT_CSV]:
+        print(f"Export done -> {OUT_CSV}")
+    else:
+        print(f"Export done -> {OUT_CSV} (isi sama, file tidak ditulis ulang)")
     print(f"Processed rows (iter): {processed_rows}, groups: {len(agg)}")
 
 if __name__ == "__main__":
-    main()
+    run_metrics.run(main)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Cache hasil export: key = hash input (xlsx) + hash source tool + config.
+
+Dulu skip cuma lihat xlsx_sha256, jadi kalau kode exporter berubah output
+lama tetap dipakai (makanya export_stock_csv.py sempat mematikan early
+return). Sekarang key ikut berubah kalau file tool (atau modul tools/ yang
+di-import-nya) atau konstanta config berubah.
+
+Alur di exporter:
+    job = JobCache("stock", [XLSX], __file__, job_config(globals()), [OUT_CSV], STATE)
+    hit = job.lookup(st)
+    if hit:                     # "current" = output di repo sudah cocok,
+        ...skip...              # "restored" = output (+ state) disalin dari .job_cache/
+    ...export...
+    with txn:
+        ...tulis output...
+        job.record(st, txn)     # cache_key + sha256 output masuk state
+        save_state(txn, st)
+    job.store()                 # simpan salinan output ke .job_cache/<job>/<key>/
+
+Folder cache boleh hilang (mis. runner baru): state + output yang sudah
+di-commit tetap dianggap hit selama hash-nya cocok.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+
+from atomic_output import OutputTxn, sha256_file
+
+CACHE_DIR = ".job_cache"
+KEEP_ENTRIES = 5   # entry cache per job yang disimpan
+
+def job_config(namespace):
+    """Konstanta config modul (NAMA_BESAR, nilai sederhana) -> dict untuk key."""
+    simple = (str, int, float, bool, type(None), tuple, list)
+    return {k: v for k, v in sorted(namespace.items())
+            if k.isupper() and not k.startswith("_") and isinstance(v, simple)}
+
+def local_imports(path, tools_dir):
+    """Modul tools/ yang di-import file `path` (termasuk import di dalam fungsi)."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return sorted(p for p in (os.path.join(tools_dir, n + ".py") for n in names) if os.path.exists(p))
+
+def source_hash(script):
+    """sha256 gabungan script + semua modul tools/ yang di-import (rekursif)."""
+    script = os.path.abspath(script)
+    tools_dir = os.path.dirname(script)
+    seen, todo = set(), [script]
+    while todo:
+        p = todo.pop()
+        if p in seen:
+            continue
+        seen.add(p)
+        todo.extend(local_imports(p, tools_dir))
+    h = hashlib.sha256()
+    for p in sorted(seen):
+        h.update(os.path.basename(p).encode("utf-8") + b"\0")
+        h.update(sha256_file(p).encode("ascii"))
+    return h.hexdigest()
+
+class JobCache:
+    def __init__(self, name, inputs, script, config=None, outputs=(), state=None, cache_dir=CACHE_DIR):
+        self.name = name
+        self.state = state
+        self.outputs = [o for o in outputs if o]
+        self.cache_dir = cache_dir
+        self.input_hashes = {p: sha256_file(p) for p in inputs}
+        self.parts = {
+            "inputs": self.input_hashes,
+            "source": source_hash(script),
+            "config": config or {},
+        }
+        blob = json.dumps(self.parts, sort_keys=True, ensure_ascii=False, default=str)
+        self.key = hashlib.sha256(blob.encode("utf-8")).hexdigest()
+        self.output_hashes = {}
+
+    @property
+    def entry_dir(self):
+        return os.path.join(self.cache_dir, self.name, self.key[:20])
+
+    def _outputs_match(self, hashes):
+        return (set(hashes) == set(self.outputs)
+                and all(os.path.exists(p) and sha256_file(p) == h for p, h in hashes.items()))
+
+    def lookup(self, st):
+        """Return "current", "restored" atau None (miss, harus export)."""
+        if st.get("cache_key") == self.key and self._outputs_match(st.get("outputs", {})):
+            return "current"
+
+        meta_path = os.path.join(self.entry_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        hashes = meta.get("outputs", {})
+        if set(hashes) != set(self.outputs):
+            return None
+        for p, h in hashes.items():
+            if sha256_file(os.path.join(self.entry_dir, os.path.basename(p))) != h:
+                return None   # entry rusak, export ulang
+
+        # output + state dipulihkan dalam satu transaksi
+        with OutputTxn() as txn:
+            for p in self.outputs:
+                with open(os.path.join(self.entry_dir, os.path.basename(p)), "rb") as src:
+                    shutil.copyfileobj(src, txn.open_binary(p))
+            self.output_hashes = dict(hashes)
+            st["cache_key"] = self.key
+            st["outputs"] = self.output_hashes
+            if self.state:
+                txn.write_json(self.state, st)
+        return "restored"
+
+    def record(self, st, txn):
+        """Isi cache_key + hash output ke state (panggil di dalam txn, setelah output ditulis)."""
+        self.output_hashes = {p: txn.digest(p) for p in self.outputs}
+        st["cache_key"] = self.key
+        st["outputs"] = self.output_hashes
+
+    def store(self):
+        """Simpan salinan output ke folder cache (gagal di sini tidak fatal)."""
+        try:
+            d = self.entry_dir
+            os.makedirs(d, exist_ok=True)
+            for p in self.outputs:
+                shutil.copyfile(p, os.path.join(d, os.path.basename(p)))
+            with open(os.path.join(d, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"key": self.key, "outputs": self.output_hashes, **self.parts},
+                          f, ensure_ascii=False, indent=2, default=str)
+            self._prune()
+        except OSError as e:
+            print(f"Warning: gagal simpan cache {self.name}: {e}")
+
+    def _prune(self):
+        root = os.path.join(self.cache_dir, self.name)
+        entries = sorted((os.path.join(root, e) for e in os.listdir(root)),
+                         key=os.path.getmtime, reverse=True)
+        for e in entries[KEEP_ENTRIES:]:
+            shutil.rmtree(e, ignore_errors=True)
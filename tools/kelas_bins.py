@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kelas diameter dihitung dari rata2 (cm), bukan dari teks kolom R di workbook.
+
+Skema bin ditulis seperti label kelasnya: "40-49,50-59,60-UP"
+  - "a-b"  : a <= rata2 <= b   (rata2 bulat, jadi sama dengan a <= x < b+1)
+  - "a-UP" : rata2 >= a
+Nilai di bawah bin pertama -> "<a", di sela bin / kosong -> "" (tidak masuk kelas).
+
+Bin dicari sekaligus untuk satu kolom (np.searchsorted, gaya np.digitize).
+Stock bisa dihitung ulang dengan skema apa saja dari file antara
+(loglist1_rows.csv / loglist_ibs_rows.csv, ada kolom rata2) tanpa baca workbook:
+
+  python tools/kelas_bins.py loglist1_rows.csv stock_bins.csv --scheme main
+  python tools/kelas_bins.py loglist_ibs_rows.csv stock_ibs_bins.csv --scheme ibs --profile ibs
+  python tools/kelas_bins.py loglist1_rows.csv out.csv --bins "20-39,40-59,60-UP"
+"""
+
+import argparse
+import csv
+from collections import namedtuple
+
+import numpy as np
+
+import stock_rows
+
+SCHEMES = {
+    "main": "40-49,50-59,60-UP",
+    "ibs": "20-39,40-49,50-59,60-UP",
+}
+
+BinScheme = namedtuple("BinScheme", "labels lower upper")
+
+def parse_scheme(spec):
+    """'40-49,50-59,60-UP' (atau nama di SCHEMES) -> BinScheme."""
+    spec = SCHEMES.get(spec, spec)
+    labels, lower, upper = [], [], []
+    for part in spec.split(","):
+        label = part.strip()
+        lo, sep, hi = label.partition("-")
+        try:
+            lo = float(lo)
+            hi = np.inf if hi.strip().upper() == "UP" else float(hi)
+        except ValueError:
+            raise SystemExit(f"Bin tidak valid: '{label}' (contoh: 40-49 atau 60-UP)")
+        if not sep or hi < lo:
+            raise SystemExit(f"Bin tidak valid: '{label}' (contoh: 40-49 atau 60-UP)")
+        if lower and lo <= upper[-1]:
+            raise SystemExit(f"Bin harus urut dan tidak tumpang tindih: '{label}'")
+        labels.append(label)
+        lower.append(lo)
+        upper.append(hi)
+    if not labels:
+        raise SystemExit("Skema bin kosong")
+    return BinScheme(labels, np.array(lower), np.array(upper))
+
+def bin_index(values, scheme):
+    """
+    values: array rata2 (NaN = kosong). Return array int:
+    0..n-1 = index bin, -1 = di bawah bin pertama, -2 = di sela bin / kosong.
+    """
+    v = np.asarray(values, dtype=float)
+    idx = np.searchsorted(scheme.lower, v, side="right") - 1
+    below = idx < 0
+    safe = np.where(below, 0, idx)
+    # (b+1) supaya rata2 pecahan di antara b dan b+1 tetap masuk bin a-b
+    outside = ~below & (v >= scheme.upper[safe] + 1)
+    idx = np.where(outside | np.isnan(v), -2, idx)
+    return np.where(below & ~np.isnan(v), -1, idx)
+
+def assign(values, scheme):
+    """Return list label kelas untuk tiap nilai rata2."""
+    labels = list(scheme.labels) + ["", f"<{scheme.lower[0]:g}"]   # index -2 -> "", -1 -> "<a"
+    return [labels[i] for i in bin_index(values, scheme).tolist()]
+
+def rebin_rows(rows, scheme, keep_missing=True):
+    """
+    StockRow -> StockRow dengan kelas dari rata2.
+    Baris tanpa rata2: kelas lama dipakai (keep_missing) atau dikosongkan.
+    """
+    rows = list(rows)
+    vals = [np.nan if r.rata2 is None else r.rata2 for r in rows]
+    out = []
+    for r, kelas in zip(rows, assign(vals, scheme)):
+        if r.rata2 is None and keep_missing:
+            kelas = r.kelas
+        out.append(r._replace(kelas=kelas))
+    return out
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Hitung ulang stock dengan kelas dari rata2")
+    ap.add_argument("rows_csv", help="file antara (loglist1_rows.csv / loglist_ibs_rows.csv)")
+    ap.add_argument("out_csv")
+    g = ap.add_mutually_exclusive_group()
+    g.add_argument("--scheme", choices=sorted(SCHEMES), default="main")
+    g.add_argument("--bins", help='skema sendiri, mis. "20-39,40-59,60-UP"')
+    ap.add_argument("--profile", choices=sorted(stock_rows.SKIP_RULES), default="main",
+                    help="aturan skip posisi (lihat stock_rows.py)")
+    args = ap.parse_args(argv)
+
+    scheme = parse_scheme(args.bins or args.scheme)
+    rows = rebin_rows(stock_rows.read_rows(args.rows_csv), scheme)
+    agg, last_global = stock_rows.aggregate(rows, stock_rows.SKIP_RULES[args.profile])
+
+    from atomic_output import OutputTxn
+    with OutputTxn() as txn:
+        stock_rows.write_stock_csv(csv.writer(txn.open_text(args.out_csv)), agg, last_global)
+
+    counts = {}
+    for r in rows:
+        counts[r.kelas] = counts.get(r.kelas, 0) + 1
+    summary = ", ".join(f"{k or '(kosong)'}={n}" for k, n in sorted(counts.items()))
+    print(f"Build done -> {args.out_csv} (bins: {','.join(scheme.labels)}; {summary})")
+
+if __name__ == "__main__":
+    main()
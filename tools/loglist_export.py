@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline export range loglist yang dipakai bersama oleh:
+
+- export_range_to_csv.py             -> loglist1.csv (+ loglist1_rows.csv, events)
+- export_range_to_csv_loglist_ibs.py -> loglist_ibs.csv (+ rows, events)
+- export_csv_loglist2.py             -> loglist2.csv
+
+Script exporter cukup berisi konstanta config (XLSX, SHEET, OUT_FIELDS, ...),
+is_invalid_nobtg() dan should_skip_posisi(), lalu:
+
+    def main():
+        loglist_export.run(globals())
+
+Urutan di run(): job cache (skip / restore) -> column_map -> baca sempit +
+filter noBtg di parser -> CSV utama, ROWS_CSV, schema, cek volume, shard ->
+commit satu OutputTxn -> mutation log, sqlite, publish, metrik.
+
+Config opsional (boleh tidak ada di script): ROWS_CSV / EVENTS_CSV (tanpa itu
+cuma kolom posisi yang dibaca dari luar blok output), COL_NOBTG..COL_TGL
+(wajib kalau ROWS_CSV dipakai), SQLITE_DB, SHARD_BY, PUBLISH_DIR.
+"""
+
+import json
+import os
+from types import SimpleNamespace
+
+from atomic_output import OutputTxn
+from job_cache import JobCache, job_config
+import run_metrics
+from csv_batch import BatchCsvWriter
+from loglist_schema import compile_schema
+import stock_rows
+import mutation_log
+import column_map
+import shard_output
+
+STOCK_FIELDS = ("noBtg", "jenis", "volume", "kelas", "tgl", "posisi")
+OPTIONAL = {"ROWS_CSV": None, "EVENTS_CSV": None, "SQLITE_DB": None,
+            "SHARD_BY": None, "SHARD_DIR": None, "PUBLISH_DIR": None}
+
+# ---------- helpers ----------
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(txn, path, st):
+    # state ikut transaksi output, ditulis setelah CSV
+    txn.write_json(path, st)
+
+def publish_output(c):
+    """
+    Dipanggil di semua jalur (skip, restored, export): publish_delta sendiri
+    tidak menambah versi kalau sha CSV sama dengan snapshot terakhir, jadi
+    folder publish yang kosong / ketinggalan tetap terisi.
+    """
+    if not c.PUBLISH_DIR:
+        return
+    import publish_delta
+    v = publish_delta.publish(c.OUT_CSV, c.PUBLISH_DIR)
+    if v is not None:
+        print(f"Publish v{v} -> {c.PUBLISH_DIR}")
+
+def sink_sqlite(c, job):
+    if c.SQLITE_DB:
+        import sqlite_sink
+        sqlite_sink.sink(c.SQLITE_DB, job.outputs)
+
+# ---------- main ----------
+def run(namespace):
+    """namespace = globals() script exporter (config + predikat noBtg / posisi)."""
+    c = SimpleNamespace(**{**OPTIONAL, **namespace})
+    m = run_metrics.current()
+    # skip kalau Excel, kode tool dan config tidak berubah (lihat job_cache.py);
+    # source hash ikut modul ini karena script exporter meng-import-nya
+    job = JobCache(os.path.splitext(c.OUT_CSV)[0], [c.XLSX], c.__file__, job_config(namespace),
+                   [c.OUT_CSV, c.ROWS_CSV], c.STATE)
+    xhash = job.input_hashes[c.XLSX]
+    st = load_state(c.STATE)
+    # snapshot run sebelumnya, dibaca sebelum ROWS_CSV ditimpa
+    prev = mutation_log.load_snapshot(c.ROWS_CSV) if c.EVENTS_CSV and c.ROWS_CSV else None
+    hit = job.lookup(st)
+    m.lap("cache")
+    if hit and c.SHARD_BY and not shard_output.manifest_matches(c.SHARD_DIR, c.OUT_CSV, c.SHARD_BY):
+        print(f"Shard di {c.SHARD_DIR} tidak cocok dengan {c.OUT_CSV}; export ulang.")
+        hit = None
+    if hit == "current":
+        m.status = "skip"
+        print("Excel unchanged; skip export.")
+        publish_output(c)
+        return
+    if hit == "restored":
+        m.status = "restored"
+        print(f"Output dipulihkan dari cache ({job.entry_dir}); skip export.")
+        if prev is not None:
+            with OutputTxn() as txn:
+                n = mutation_log.append_events(txn, c.EVENTS_CSV, mutation_log.diff_snapshots(
+                    prev, stock_rows.read_rows(c.ROWS_CSV), mutation_log.run_time()))
+            if n:
+                print(f"Mutasi: {n} event -> {c.EVENTS_CSV}")
+        sink_sqlite(c, job)
+        publish_output(c)
+        return
+
+    # import berat (openpyxl, numpy) baru di sini, biar run yang di-skip tetap cepat
+    from xlsx_stream import open_sheet, iter_columns
+    from loglist_volume import check_typed_rows, format_flag
+
+    is_invalid_nobtg = c.is_invalid_nobtg
+    should_skip_posisi = c.should_skip_posisi
+
+    ws = open_sheet(c.XLSX, c.SHEET, stream=c.STREAM)
+    if c.ROWS_CSV:
+        fields = dict(zip(STOCK_FIELDS, (c.COL_NOBTG, c.COL_JENIS, c.COL_VOL,
+                                         c.COL_KELAS, c.COL_TGL, c.COL_POSISI)))
+    else:
+        fields = {"posisi": c.COL_POSISI}
+    cmap = column_map.resolve(ws, c.XLSX, c.SHEET, xhash, fields,
+                              block=(c.OUT_FIELDS, c.OUT_MIN_COL), header_rows=c.MIN_ROW,
+                              strict=c.HEADER_STRICT)
+    # baca sempit (STREAM): kolom stock (atau posisi saja) + blok output;
+    # openpyxl tetap lo..hi
+    stock_cols = [cmap[k] for k in fields]
+    n_stock = len(stock_cols)
+    i_posisi = list(fields).index("posisi")
+
+    wrote_any = False
+    schema = None
+    schema_errors = []
+    typed_rows, typed_rownums = [], []
+    flags = []
+    rata2_idx = None
+    rows_w = None
+    cur_rows = [] if prev is not None else None
+    shards = shard_output.ShardSet(c.SHARD_BY, c.SHARD_DIR) if c.SHARD_BY else None
+    header = None
+    txn = OutputTxn()
+    with txn:
+        f = txn.open_text(c.OUT_CSV)
+        # konversi + tulis per batch (lihat csv_batch.py)
+        w = BatchCsvWriter(f)
+        if c.ROWS_CSV:
+            rows_w = BatchCsvWriter(txn.open_text(c.ROWS_CSV))
+            rows_w.write_header(stock_rows.ROWS_HEADER)
+
+        # filter noBtg di parser: baris dibuang kalau noBtg blok tidak valid DAN
+        # (kalau ROWS_CSV dipakai) noBtg kolom B juga tidak valid
+        skip_if = {cmap.block[0]: is_invalid_nobtg}
+        if rows_w is not None:
+            skip_if[cmap["noBtg"]] = stock_rows.is_invalid_nobtg
+        i = c.MIN_ROW - 1
+        for i, row in enumerate(iter_columns(ws, stock_cols + cmap.block, c.MIN_ROW, c.MAX_ROW,
+                                             skip_if=skip_if),
+                                start=c.MIN_ROW):
+
+            posisi_raw = row[i_posisi]
+            out_row = row[n_stock:]  # blok output
+
+            # header wajib ikut (baris pertama di range)
+            if i == c.MIN_ROW:
+                w.write_header(out_row)
+                header = out_row
+                hdr = [stock_rows.norm_str(v) for v in out_row]
+                rata2_idx = hdr.index("rata2") if "rata2" in hdr else None
+                if c.VALIDATE_SCHEMA:
+                    schema = compile_schema(out_row, first_col=cmap.block[0])
+                wrote_any = True
+                continue
+
+            # file antara: pakai filter noBtg versi stock (kolom B), posisi apa saja
+            if rows_w is not None:
+                b, jenis_raw, vol_raw, kelas_raw, tgl_raw, _ = row[:n_stock]
+                if not stock_rows.is_invalid_nobtg(b):
+                    sr = stock_rows.StockRow(
+                        stock_rows.norm_str(b),
+                        stock_rows.norm_str(posisi_raw),
+                        stock_rows.norm_str(kelas_raw),
+                        stock_rows.norm_str(jenis_raw),
+                        stock_rows.safe_float(vol_raw),
+                        stock_rows.parse_date(tgl_raw),
+                        stock_rows.num_or_none(out_row[rata2_idx]) if rata2_idx is not None else None,
+                    )
+                    rows_w.add(stock_rows.row_values(sr))
+                    if cur_rows is not None:
+                        cur_rows.append(sr)
+
+            nobtg_raw = out_row[0]  # kolom pertama output = noBtg
+
+            # filter baris:
+            if is_invalid_nobtg(nobtg_raw):
+                continue
+
+            # skip posisi (aturan per loglist, lihat should_skip_posisi di script)
+            if should_skip_posisi(posisi_raw):
+                continue
+
+            if schema is not None:
+                typed, errs = schema.coerce(out_row, i)
+                if errs:
+                    schema_errors.extend(errs)
+                    if c.SCHEMA_STRICT:
+                        continue
+                elif c.CHECK_VOLUME:
+                    typed_rows.append(typed)
+                    typed_rownums.append(i)
+                    if c.STREAM and len(typed_rows) >= c.STREAM_CHUNK:
+                        flags.extend(check_typed_rows(schema, typed_rows, typed_rownums))
+                        typed_rows, typed_rownums = [], []
+
+            w.add(out_row)
+            if shards is not None:
+                shards.add(posisi_raw, nobtg_raw, out_row)
+            wrote_any = True
+
+        w.close()
+        m.lap("read")
+        m.set("rows_read", i - c.MIN_ROW + 1)
+        m.set("rows_written", w.rows_written)
+        if shards is not None and header is not None:
+            shards.write(txn, c.OUT_CSV, header)
+        if rows_w is not None:
+            rows_w.close()
+        if schema_errors:
+            print(f"Warning: {len(schema_errors)} nilai tidak valid menurut schema"
+                  + (" (baris dibuang)" if c.SCHEMA_STRICT else ""))
+            for e in schema_errors[:c.MAX_SCHEMA_ERRORS_PRINT]:
+                print("  " + e)
+        if schema is not None and c.CHECK_VOLUME:
+            flags.extend(check_typed_rows(schema, typed_rows, typed_rownums))
+            if flags:
+                print(f"Warning: {len(flags)} baris volume/rata2 tidak konsisten")
+                for fl in flags[:c.MAX_SCHEMA_ERRORS_PRINT]:
+                    print("  " + format_flag(fl))
+        if not wrote_any:
+            print("Warning: tidak ada baris data yang lolos filter.")
+        n_events = 0
+        if cur_rows is not None:
+            n_events = mutation_log.append_events(txn, c.EVENTS_CSV, mutation_log.diff_snapshots(
+                prev, cur_rows, mutation_log.run_time()))
+        st["xlsx_sha256"] = xhash
+        job.record(st, txn)
+        save_state(txn, c.STATE, st)
+
+    job.store()
+    m.lap("write")
+    sink_sqlite(c, job)
+
+    if txn.changed[c.OUT_CSV]:
+        print(f"Export done -> {c.OUT_CSV}")
+    else:
+        print(f"Export done -> {c.OUT_CSV} (isi sama, file tidak ditulis ulang)")
+    if shards is not None and header is not None:
+        removed = shards.prune()
+        print(f"Shard -> {c.SHARD_DIR}/ ({shards.summary(txn)}, {removed} dihapus)")
+    if n_events:
+        print(f"Mutasi: {n_events} event -> {c.EVENTS_CSV}")
+
+    publish_output(c)
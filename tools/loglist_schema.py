@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Schema bertipe untuk loglist (loglist1 / loglist2 / loglist_ibs / loglist_internal).
+
+Kolom yang dikenal:
+  noBtg, idBarcode, jenis            -> teks
+  panjang, volume, grCm, grPersen/gr% -> angka desimal
+  pangkal, ujung, rata2              -> angka bulat (cm)
+
+Schema di-compile SEKALI dari baris header: tiap kolom dapat satu fungsi
+converter. Setelah itu tiap baris cukup lewat converter itu (streaming),
+hasilnya tuple bertipe. Nilai yang tidak valid dilaporkan dengan referensi
+baris + kolom Excel, contoh: "baris 57 kolom AK (pangkal): bukan angka bulat: 'l10'".
+
+Kolom yang tidak dikenal: tipenya ditebak dari contoh baris (kalau ada),
+kalau tidak ada contoh dibiarkan apa adanya.
+
+Cek file CSV yang sudah ada:
+  python tools/loglist_schema.py loglist1.csv [loglist2.csv ...]
+"""
+
+import re
+import sys
+from collections import namedtuple
+
+Field = namedtuple("Field", "name kind required min max aliases")
+
+LOGLIST_FIELDS = [
+    Field("noBtg",     "str",   True,  None, None,  ()),
+    Field("idBarcode", "str",   False, None, None,  ()),
+    Field("jenis",     "str",   True,  None, None,  ()),
+    Field("panjang",   "float", True,  0.0,  None,  ()),
+    Field("pangkal",   "int",   True,  0,    None,  ()),
+    Field("ujung",     "int",   True,  0,    None,  ()),
+    Field("rata2",     "int",   True,  0,    None,  ()),
+    Field("volume",    "float", True,  0.0,  None,  ()),
+    Field("grCm",      "float", False, 0.0,  None,  ()),
+    Field("grPersen",  "float", False, 0.0,  100.0, ("gr%",)),
+]
+
+class SchemaError(ValueError):
+    pass
+
+def col_letter(n):
+    """1 -> A, 27 -> AA."""
+    s = ""
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+def _norm(name):
+    return re.sub(r"[^0-9a-z%]", "", str(name or "").lower())
+
+_BY_NAME = {}
+for _f in LOGLIST_FIELDS:
+    for _n in (_f.name,) + _f.aliases:
+        _BY_NAME[_norm(_n)] = _f
+
+# ---------- converters ----------
+def _blank(v):
+    if v is None:
+        return True
+    if isinstance(v, str):
+        s = v.strip()
+        return s == "" or s == "="
+    return False
+
+def _make_str(f):
+    req = f.required
+
+    def conv(v):
+        if v.__class__ is str:
+            s = v.strip()
+            if s and s != "=":
+                return s
+        elif v is not None:
+            return str(v)
+        if req:
+            raise SchemaError("wajib diisi")
+        return None
+    return conv
+
+def _range_check(f, x):
+    if f.min is not None and x < f.min:
+        raise SchemaError(f"di bawah minimum {f.min}: {x}")
+    if f.max is not None and x > f.max:
+        raise SchemaError(f"di atas maksimum {f.max}: {x}")
+    return x
+
+def _make_float(f):
+    req = f.required
+    lo, hi = f.min, f.max
+
+    def conv(v):
+        c = v.__class__
+        if c is float or c is int:
+            x = float(v)
+        elif _blank(v):
+            if req:
+                raise SchemaError("wajib diisi")
+            return None
+        elif c is str:
+            try:
+                x = float(v.strip().replace(",", "."))
+            except ValueError:
+                raise SchemaError(f"bukan angka: {v!r}") from None
+        else:
+            raise SchemaError(f"bukan angka: {v!r}")
+        if (lo is not None and x < lo) or (hi is not None and x > hi):
+            return _range_check(f, x)
+        return x
+    return conv
+
+def _make_int(f):
+    req = f.required
+    lo, hi = f.min, f.max
+
+    def conv(v):
+        c = v.__class__
+        if c is int:
+            x = v
+        elif _blank(v):
+            if req:
+                raise SchemaError("wajib diisi")
+            return None
+        else:
+            try:
+                y = float(v.strip().replace(",", ".")) if c is str else float(v)
+            except (TypeError, ValueError):
+                raise SchemaError(f"bukan angka bulat: {v!r}") from None
+            if c is bool or not y.is_integer():
+                raise SchemaError(f"bukan angka bulat: {v!r}")
+            x = int(y)
+        if (lo is not None and x < lo) or (hi is not None and x > hi):
+            return _range_check(f, x)
+        return x
+    return conv
+
+def _passthrough(v):
+    return v
+
+_MAKERS = {"str": _make_str, "float": _make_float, "int": _make_int}
+
+# ---------- inferensi ----------
+def infer_kind(values):
+    """Tebak tipe kolom dari contoh nilai (kosong diabaikan)."""
+    kind = None
+    for v in values:
+        if _blank(v):
+            continue
+        if isinstance(v, bool):
+            return "str"
+        if isinstance(v, int):
+            k = "int"
+        elif isinstance(v, float):
+            k = "int" if v.is_integer() else "float"
+        else:
+            s = str(v).strip().replace(",", ".")
+            try:
+                k = "int" if float(s).is_integer() and "." not in s else "float"
+            except ValueError:
+                return "str"
+        if kind is None or (kind == "int" and k == "float"):
+            kind = k
+    return kind or "str"
+
+# ---------- schema ----------
+class Schema:
+    def __init__(self, fields, first_col=1, labels=None):
+        self.fields = fields
+        self.names = [f.name for f in fields]            # nama baku (grPersen, bukan gr%)
+        self.labels = labels or list(self.names)         # teks header asli
+        self.first_col = first_col
+        self.letters = [col_letter(first_col + j) for j in range(len(fields))]
+        self.converters = [
+            _MAKERS[f.kind](f) if f.kind in _MAKERS else _passthrough
+            for f in fields
+        ]
+
+    def index(self, name):
+        return self.names.index(name)
+
+    def coerce(self, row, rownum):
+        """Return (tuple bertipe, list pesan error). Error kosong = baris valid."""
+        out = []
+        errors = None
+        for j, (conv, v) in enumerate(zip(self.converters, row)):
+            try:
+                out.append(conv(v))
+            except SchemaError as e:
+                out.append(None)
+                if errors is None:
+                    errors = []
+                errors.append(f"baris {rownum} kolom {self.letters[j]} ({self.labels[j]}): {e}")
+        return tuple(out), errors or []
+
+    def iter_typed(self, rows, start_row, errors=None, strict=True):
+        """
+        Streaming: yield tuple bertipe per baris.
+        strict=True -> baris yang error tidak di-yield (errornya masuk list `errors`).
+        """
+        for i, row in enumerate(rows, start=start_row):
+            typed, errs = self.coerce(row, i)
+            if errs:
+                if errors is not None:
+                    errors.extend(errs)
+                if strict:
+                    continue
+            yield typed
+
+def compile_schema(header, first_col=1, sample=None):
+    """
+    header: isi baris header (nama kolom).
+    first_col: nomor kolom Excel untuk kolom pertama (buat referensi error).
+    sample: contoh baris data untuk menebak tipe kolom yang tidak dikenal.
+    """
+    fields = []
+    labels = []
+    for j, h in enumerate(header):
+        name = str(h).strip() if h is not None else ""
+        name = name or col_letter(first_col + j)
+        labels.append(name)
+        f = _BY_NAME.get(_norm(name))
+        if f is not None:
+            fields.append(f)
+            continue
+        kind = infer_kind(r[j] for r in sample if j < len(r)) if sample else "any"
+        fields.append(Field(name, kind, False, None, None, ()))
+    return Schema(fields, first_col, labels)
+
+# ---------- main ----------
+def main(argv=None):
+    import csv
+
+    paths = argv if argv is not None else sys.argv[1:]
+    if not paths:
+        raise SystemExit("Pakai: python tools/loglist_schema.py loglist1.csv [...]")
+
+    bad_files = 0
+    for path in paths:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                print(f"{path}: kosong")
+                bad_files += 1
+                continue
+            schema = compile_schema(header)
+            errors = []
+            n = sum(1 for _ in schema.iter_typed(reader, 2, errors))
+        print(f"{path}: {n} baris valid, {len(errors)} error")
+        for e in errors[:20]:
+            print("  " + e)
+        if errors:
+            bad_files += 1
+
+    if bad_files:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cek konsistensi rata2 / gr% / volume loglist (vektor NumPy, satu loglist sekaligus).
+
+Rumus (Brereton, sama dengan hasil di workbook):
+  rata2    = floor((pangkal + ujung) / 2)                    [cm]
+  gr%      = round(127.3 * grCm^2 / rata2^2, 1)               [%]  (cacat growong)
+  volume   = round(0.7854 * (rata2/100)^2 * panjang * (1 - gr%/100), 2)   [m3]
+
+Baris yang selisihnya di luar toleransi ditandai, lengkap dengan nomor baris.
+
+Cek file CSV:
+  python tools/loglist_volume.py loglist1.csv loglist2.csv loglist_ibs.csv
+"""
+
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+BRERETON = 0.7854   # pi/4
+GR_FACTOR = 127.3   # 100 / 0.7854, dibulatkan seperti di workbook
+
+RATA2_TOL = 0.0
+GR_TOL = 0.05       # gr% dibulatkan 1 desimal
+VOL_TOL = 0.01      # volume dibulatkan 2 desimal
+_EPS = 1e-6
+
+Flag = namedtuple("Flag", "rownum noBtg messages")
+
+def round_half_up(x, ndigits):
+    # pembulatan ala Excel ROUND (bukan banker's rounding)
+    m = 10.0 ** ndigits
+    return np.floor(np.abs(x) * m + 0.5 + 1e-9) / m * np.sign(x)
+
+def recompute(panjang, pangkal, ujung, gr_cm=None):
+    """Semua argumen array float (NaN = kosong). Return (rata2, gr_persen, volume)."""
+    rata2 = np.floor((pangkal + ujung) / 2.0)
+    if gr_cm is None:
+        gr_persen = np.zeros_like(rata2)
+    else:
+        g = np.nan_to_num(gr_cm, nan=0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gr_persen = np.where(rata2 > 0, round_half_up(GR_FACTOR * g * g / (rata2 * rata2), 1), 0.0)
+    gross = BRERETON * (rata2 / 100.0) ** 2 * panjang
+    volume = round_half_up(gross * (1.0 - gr_persen / 100.0), 2)
+    return rata2, gr_persen, volume
+
+def _col(values):
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+def check_columns(cols, rownums, nobtg=None):
+    """
+    cols: dict nama -> array float (panjang, pangkal, ujung, rata2, volume, grCm, grPersen).
+    Return list Flag untuk baris yang tidak konsisten.
+    """
+    rata2, gr_persen, volume = recompute(
+        cols["panjang"], cols["pangkal"], cols["ujung"], cols.get("grCm")
+    )
+
+    bad_rata = np.abs(cols["rata2"] - rata2) > RATA2_TOL + _EPS
+    bad_vol = np.abs(cols["volume"] - volume) > VOL_TOL + _EPS
+    bad_gr = np.zeros_like(bad_vol)
+    if "grPersen" in cols:
+        # gr% kosong tidak dicek (volume tetap dicek)
+        gp = cols["grPersen"]
+        bad_gr = ~np.isnan(gp) & (np.abs(gp - gr_persen) > GR_TOL + _EPS)
+    # NaN di kolom wajib juga dianggap tidak konsisten
+    bad_nan = np.isnan(cols["rata2"]) | np.isnan(cols["volume"]) | np.isnan(volume)
+
+    bad = bad_rata | bad_vol | bad_gr | bad_nan
+    flags = []
+    for k in np.flatnonzero(bad):
+        msgs = []
+        if bad_nan[k]:
+            msgs.append("ukuran kosong")
+        else:
+            if bad_rata[k]:
+                msgs.append(f"rata2 {cols['rata2'][k]:g} != {rata2[k]:g}")
+            if bad_gr[k]:
+                msgs.append(f"gr% {cols['grPersen'][k]:g} != {gr_persen[k]:g}")
+            if bad_vol[k]:
+                msgs.append(f"volume {cols['volume'][k]:g} != {volume[k]:g}")
+        flags.append(Flag(rownums[k], nobtg[k] if nobtg is not None else "", msgs))
+    return flags
+
+NEEDED = ("panjang", "pangkal", "ujung", "rata2", "volume")
+
+def check_typed_rows(schema, typed_rows, rownums):
+    """typed_rows: hasil Schema.coerce (lihat loglist_schema.py)."""
+    if not typed_rows:
+        return []
+    names = schema.names
+    missing = [n for n in NEEDED if n not in names]
+    if missing:
+        raise SystemExit(f"Kolom untuk cek volume tidak ada: {', '.join(missing)}")
+
+    columns = list(zip(*typed_rows))
+    cols = {}
+    for n in NEEDED + ("grCm", "grPersen"):
+        if n in names:
+            cols[n] = _col(columns[names.index(n)])
+    nobtg = columns[names.index("noBtg")] if "noBtg" in names else None
+    return check_columns(cols, rownums, nobtg)
+
+def check_csv(path):
+    import csv
+    from loglist_schema import compile_schema
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return []
+        schema = compile_schema(header)
+        typed, rownums = [], []
+        for i, row in enumerate(reader, start=2):
+            t, errs = schema.coerce(row, i)
+            if not errs:
+                typed.append(t)
+                rownums.append(i)
+    return check_typed_rows(schema, typed, rownums)
+
+def format_flag(fl):
+    return f"baris {fl.rownum} {fl.noBtg}: " + "; ".join(fl.messages)
+
+# ---------- main ----------
+def main(argv=None):
+    paths = argv if argv is not None else sys.argv[1:]
+    if not paths:
+        raise SystemExit("Pakai: python tools/loglist_volume.py loglist1.csv [...]")
+
+    any_bad = False
+    for path in paths:
+        flags = check_csv(path)
+        print(f"{path}: {len(flags)} baris di luar toleransi")
+        for fl in flags[:20]:
+            print("  " + format_flag(fl))
+        any_bad = any_bad or bool(flags)
+
+    if any_bad:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Log mutasi kayu dari snapshot POSISI TERAKHIR yang berurutan.
+
+Sheet cuma menyimpan posisi + tanggal terakhir (kolom T dan S), jadi
+perpindahan BLOK -> TPK 42 -> DKDS/MILIR hilang tertimpa. Exporter loglist
+membandingkan file antara run sebelumnya (loglist1_rows.csv, lihat
+stock_rows.py) dengan hasil run sekarang, lalu menambah event ke
+loglist1_events.csv (append-only, cuma baris yang berubah):
+
+  waktu,noBtg,event,dari,ke,tgl,jenis,volume
+  event: baru   noBtg belum ada di run sebelumnya
+         pindah posisi berubah
+         tgl    posisi sama, tanggal mutasi berubah
+         hilang noBtg tidak ada lagi di sheet
+
+Run pertama (belum ada file antara lama) tidak menulis event.
+
+Query:
+  python tools/mutation_log.py moves loglist1_events.csv [--nobtg A8277]
+  python tools/mutation_log.py daily loglist1_events.csv [--posisi "TPK 42"]
+  python tools/mutation_log.py days  loglist1_events.csv [--at 2026-08-31]
+"""
+
+import argparse
+import csv
+import os
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+import stock_rows
+from atomic_output import trim_torn_tail   # dipakai juga run_metrics
+
+EVENT_HEADER = ["waktu", "noBtg", "event", "dari", "ke", "tgl", "jenis", "volume"]
+Event = namedtuple("Event", EVENT_HEADER)
+
+WITA = timezone(timedelta(hours=8))
+
+def run_time():
+    return datetime.now(WITA).replace(microsecond=0).isoformat()
+
+def load_snapshot(rows_csv):
+    """File antara -> dict noBtg -> StockRow (None kalau file belum ada)."""
+    if not rows_csv or not os.path.exists(rows_csv):
+        return None
+    snap = {}
+    for r in stock_rows.read_rows(rows_csv):
+        snap[r.noBtg] = r   # noBtg dobel: baris terakhir yang dipakai
+    return snap
+
+def diff_snapshots(prev, cur_rows, when):
+    """prev: dict dari load_snapshot; cur_rows: iterable StockRow run sekarang."""
+    if prev is None:
+        return []
+    fmt = stock_rows.fmt_num
+    events = []
+    seen = set()
+    cur = {}
+    for r in cur_rows:
+        cur[r.noBtg] = r
+    for nobtg, r in cur.items():
+        seen.add(nobtg)
+        tgl = r.tgl.isoformat() if r.tgl else ""
+        old = prev.get(nobtg)
+        if old is None:
+            events.append(Event(when, nobtg, "baru", "", r.posisi, tgl, r.jenis, fmt(r.vol)))
+        elif old.posisi != r.posisi:
+            events.append(Event(when, nobtg, "pindah", old.posisi, r.posisi, tgl, r.jenis, fmt(r.vol)))
+        elif old.tgl != r.tgl:
+            events.append(Event(when, nobtg, "tgl", old.posisi, r.posisi, tgl, r.jenis, fmt(r.vol)))
+    for nobtg, old in prev.items():
+        if nobtg not in seen:
+            events.append(Event(when, nobtg, "hilang", old.posisi, "", "", old.jenis, fmt(old.vol)))
+    return events
+
+def append_events(txn, path, events):
+    """
+    Tambahkan event baru di akhir log lewat txn.open_append (ikut commit txn
+    yang sama dengan CSV lain). Isi lama tidak dibaca / ditulis ulang, jadi
+    biayanya sebanding jumlah event baru. Header cuma ditulis kalau file
+    belum ada / kosong. Tidak ada event -> file tidak disentuh.
+    """
+    if not events:
+        return 0
+    trim_torn_tail(path)
+    w = csv.writer(txn.open_append(path))
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        w.writerow(EVENT_HEADER)
+    w.writerows(events)
+    return len(events)
+
+def read_events(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header != EVENT_HEADER:
+            raise SystemExit(f"{path}: header event log tidak dikenal: {header}")
+        for row in reader:
+            yield Event(*row)
+
+def event_day(ev):
+    """Tanggal event: tanggal mutasi (kolom S) kalau ada, kalau tidak tanggal run."""
+    if ev.tgl:
+        return date.fromisoformat(ev.tgl)
+    return datetime.fromisoformat(ev.waktu).date()
+
+# ---------- query ----------
+def cmd_moves(events, nobtg=None):
+    for ev in events:
+        if nobtg and ev.noBtg != nobtg:
+            continue
+        print(f"{ev.waktu}  {ev.noBtg:<10} {ev.event:<6} {ev.dari or '-':>12} -> {ev.ke or '-':<12} {ev.tgl}")
+
+def cmd_daily(events, posisi=None):
+    """Jumlah kayu masuk per hari per posisi (event baru/pindah)."""
+    counts = {}
+    for ev in events:
+        if ev.event not in ("baru", "pindah") or not ev.ke:
+            continue
+        if posisi and ev.ke.upper() != posisi.upper():
+            continue
+        key = (ev.ke, event_day(ev))
+        btg, vol = counts.get(key, (0, 0.0))
+        counts[key] = (btg + 1, vol + stock_rows.safe_float(ev.volume))
+    for (pos, day), (btg, vol) in sorted(counts.items()):
+        print(f"{day.isoformat()}  {pos:<14} {btg:>5} btg  {vol:10.2f} m3")
+
+def cmd_days(events, at=None):
+    """Lama (hari) tiap noBtg di posisi sekarang, dari event masuk terakhir."""
+    at = at or datetime.now(WITA).date()
+    where = {}
+    for ev in events:
+        if ev.event == "hilang":
+            where.pop(ev.noBtg, None)
+        elif ev.event in ("baru", "pindah"):
+            where[ev.noBtg] = (ev.ke, event_day(ev))
+    per_pos = {}
+    for nobtg, (pos, since) in where.items():
+        per_pos.setdefault(pos, []).append((at - since).days)
+    for pos, days in sorted(per_pos.items()):
+        days.sort()
+        print(f"{pos:<14} {len(days):>5} btg  median {days[len(days) // 2]:>4} hari  maks {days[-1]:>4} hari")
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query log mutasi loglist")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("moves", help="daftar event")
+    m.add_argument("events_csv")
+    m.add_argument("--nobtg")
+    d = sub.add_parser("daily", help="kayu masuk per hari per posisi")
+    d.add_argument("events_csv")
+    d.add_argument("--posisi")
+    a = sub.add_parser("days", help="lama di posisi sekarang (dari event)")
+    a.add_argument("events_csv")
+    a.add_argument("--at", type=date.fromisoformat, help="tanggal acuan (default hari ini)")
+    args = ap.parse_args(argv)
+
+    events = read_events(args.events_csv)
+    if args.cmd == "moves":
+        cmd_moves(events, args.nobtg)
+    elif args.cmd == "daily":
+        cmd_daily(events, args.posisi)
+    else:
+        cmd_days(events, args.at)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Download workbook dari pCloud dengan cek metadata dulu.
+
+Alur per file:
+- ambil metadata remote (size, modtime, hash) lewat `rclone lsjson --hash`
+- bandingkan dengan index mirror lokal (.pcloud_mirror/index.json)
+- kalau sama -> TIDAK download, file diambil dari mirror
+- kalau beda -> download ke mirror (retry terbatas), lalu taruh di tujuan
+
+Beberapa workbook bisa di-fetch sekaligus (asyncio, dibatasi CONCURRENCY).
+Sumber tanpa prefix "remote:" dianggap folder lokal (buat uji coba tanpa rclone).
+
+Pemakaian:
+  python tools/pcloud_fetch.py "pcloud:FOLDER/FILE.xlsx" ["pcloud:LAIN.xlsx=./tujuan.xlsx" ...]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import run_metrics
+
+MIRROR_DIR = Path(".pcloud_mirror")
+INDEX_FILE = "index.json"
+
+CONCURRENCY = 3
+MAX_ATTEMPTS = 5
+RETRY_SLEEP = 10   # detik, dikali nomor attempt (sama seperti loop lama: i*10)
+
+# "pcloud:..." / "remote:..." -> rclone; selain itu path lokal
+_RCLONE_RE = re.compile(r"^[A-Za-z0-9_.-]{2,}:")
+
+# ---------- remote ----------
+class FetchError(Exception):
+    pass
+
+class RcloneRemote:
+    def __init__(self, rclone="rclone"):
+        self.rclone = rclone
+
+    async def _run(self, *args):
+        proc = await asyncio.create_subprocess_exec(
+            self.rclone, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        out, err = await proc.communicate()
+        if proc.returncode != 0:
+            msg = err.decode("utf-8", "replace").strip().splitlines()
+            raise FetchError(f"rclone {args[0]} gagal ({proc.returncode}): {msg[-1] if msg else ''}")
+        return out
+
+    async def stat(self, src):
+        out = await self._run("lsjson", "--hash", "--files-only", src)
+        items = json.loads(out or b"[]")
+        if not items:
+            raise FetchError(f"File remote tidak ditemukan: {src}")
+        it = items[0]
+        hashes = it.get("Hashes") or {}
+        # pilih hash yang stabil urutannya (pcloud biasanya sha1 + md5)
+        htype = sorted(hashes)[0] if hashes else ""
+        return {
+            "size": int(it.get("Size", -1)),
+            "modtime": it.get("ModTime", ""),
+            "hash": f"{htype}:{hashes[htype]}" if htype else "",
+        }
+
+    async def fetch(self, src, dest):
+        # retry dihandle di level job, jadi rclone cukup sekali coba
+        await self._run(
+            "copyto", src, str(dest),
+            "--retries", "1", "--low-level-retries", "20",
+        )
+
+class LocalRemote:
+    """Folder lokal sebagai pengganti pCloud (uji coba / dry run)."""
+
+    async def stat(self, src):
+        return await asyncio.to_thread(self._stat, src)
+
+    def _stat(self, src):
+        p = Path(src)
+        if not p.is_file():
+            raise FetchError(f"File remote tidak ditemukan: {src}")
+        st = p.stat()
+        h = hashlib.sha1()
+        with p.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return {
+            "size": st.st_size,
+            "modtime": datetime.fromtimestamp(st.st_mtime, timezone.utc).isoformat(),
+            "hash": f"sha1:{h.hexdigest()}",
+        }
+
+    async def fetch(self, src, dest):
+        await asyncio.to_thread(shutil.copyfile, src, dest)
+
+def remote_for(src):
+    if _RCLONE_RE.match(src) and not os.path.exists(src):
+        return RcloneRemote()
+    return LocalRemote()
+
+# ---------- mirror ----------
+def load_index(mirror):
+    p = mirror / INDEX_FILE
+    if not p.exists():
+        return {}
+    with p.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_index(mirror, index):
+    p = mirror / INDEX_FILE
+    tmp = p.with_name(p.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, p)
+
+def same_meta(old, new):
+    if not old:
+        return False
+    if old.get("size") != new["size"] or old.get("modtime") != new["modtime"]:
+        return False
+    # hash cuma dibandingkan kalau dua-duanya ada
+    if old.get("hash") and new["hash"] and old["hash"] != new["hash"]:
+        return False
+    return True
+
+def place(mirror_file, dest):
+    """Taruh file mirror di tujuan (hardlink kalau bisa, kalau tidak copy)."""
+    dest = Path(dest)
+    if dest.exists():
+        if os.path.samefile(mirror_file, dest):
+            return
+        dest.unlink()
+    try:
+        os.link(mirror_file, dest)
+    except OSError:
+        shutil.copyfile(mirror_file, dest)
+
+# ---------- job ----------
+async def with_retry(label, fn, attempts, sleep):
+    for i in range(1, attempts + 1):
+        try:
+            return await fn()
+        except FetchError as e:
+            if i == attempts:
+                raise
+            print(f"[{label}] attempt {i} gagal: {e}; retry {i * sleep}s", flush=True)
+            run_metrics.current().count("retries")
+            await asyncio.sleep(i * sleep)
+
+async def fetch_one(src, dest, mirror, index, sem, attempts=MAX_ATTEMPTS, sleep=RETRY_SLEEP):
+    name = Path(dest).name
+    remote = remote_for(src)
+    async with sem:
+        meta = await with_retry(name, lambda: remote.stat(src), attempts, sleep)
+        mirror_file = mirror / name
+
+        old = index.get(name)
+        if (old and old.get("remote") == src and same_meta(old, meta)
+                and mirror_file.exists() and mirror_file.stat().st_size == meta["size"]):
+            place(mirror_file, dest)
+            return name, "unchanged", meta
+
+        part = mirror_file.with_name(name + ".part")
+
+        async def download():
+            await remote.fetch(src, part)
+            size = part.stat().st_size
+            if meta["size"] >= 0 and size != meta["size"]:
+                raise FetchError(f"size tidak cocok: {size} != {meta['size']}")
+
+        try:
+            await with_retry(name, download, attempts, sleep)
+        except BaseException:
+            # jangan tinggalkan file setengah jadi di mirror
+            if part.exists():
+                part.unlink()
+            raise
+        os.replace(part, mirror_file)
+        index[name] = {"remote": src, **meta}
+        place(mirror_file, dest)
+        return name, "downloaded", meta
+
+async def fetch_all(jobs, mirror=MIRROR_DIR, concurrency=CONCURRENCY,
+                    attempts=MAX_ATTEMPTS, sleep=RETRY_SLEEP):
+    """
+    jobs: list of (src, dest).
+    Return list of (name, status, meta|error). status: unchanged / downloaded / failed
+    """
+    mirror = Path(mirror)
+    mirror.mkdir(parents=True, exist_ok=True)
+    index = load_index(mirror)
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    tasks = [fetch_one(src, dest, mirror, index, sem, attempts, sleep) for src, dest in jobs]
+    results = []
+    for (src, dest), res in zip(jobs, await asyncio.gather(*tasks, return_exceptions=True)):
+        if isinstance(res, BaseException):
+            results.append((Path(dest).name, "failed", res))
+        else:
+            results.append(res)
+
+    save_index(mirror, index)
+    return results
+
+def parse_job(spec):
+    # "SRC=DEST" ; DEST default = nama file di folder kerja
+    src, sep, dest = spec.rpartition("=")
+    if not sep or not src:
+        src, dest = spec, ""
+    if not dest:
+        dest = Path(src.split(":", 1)[-1] if _RCLONE_RE.match(src) else src).name
+    return src, dest
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fetch workbook pCloud dengan cek metadata + mirror lokal")
+    ap.add_argument("jobs", nargs="+", help='"remote:path/file.xlsx" atau "remote:path/file.xlsx=./tujuan.xlsx"')
+    ap.add_argument("--mirror", default=str(MIRROR_DIR))
+    ap.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    ap.add_argument("--attempts", type=int, default=MAX_ATTEMPTS)
+    ap.add_argument("--retry-sleep", type=float, default=RETRY_SLEEP)
+    args = ap.parse_args(argv)
+
+    jobs = [parse_job(s) for s in args.jobs]
+    results = asyncio.run(fetch_all(
+        jobs, Path(args.mirror), args.concurrency, args.attempts, args.retry_sleep
+    ))
+
+    m = run_metrics.current()
+    m.lap("fetch")
+    for _name, status, _info in results:
+        m.count(status)
+
+    failed = 0
+    for name, status, info in results:
+        if status == "failed":
+            failed += 1
+            print(f"{name}: FAILED ({info})")
+        else:
+            print(f"{name}: {status} (size={info['size']}, modtime={info['modtime']})")
+
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    run_metrics.run(main)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Publikasi loglist untuk klien (APK): snapshot gzip + patch per noBtg.
+
+Setiap kali isi CSV berubah, versi naik 1 dan di folder publish ditulis:
+  <name>_v<N>.csv.gz          snapshot penuh versi N (snapshot lama dihapus)
+  <name>_v<N-1>_v<N>.json.gz  patch dari versi sebelumnya
+  manifest.json               daftar versi, file, ukuran, sha256
+
+Isi patch:
+  {"from": 4, "to": 5, "key": "noBtg", "header": [...],
+   "upsert": {"A8277": [[...baris...]], ...},   # semua baris dengan key itu
+   "delete": ["A9001", ...]}
+
+Klien yang punya versi V: ambil manifest, lalu
+- V == latest         -> sudah terbaru
+- ada rantai patch V -> latest -> terapkan berurutan (lihat apply_patch)
+- selain itu          -> download snapshot
+Setelah patch diterapkan, isi per key sama dengan snapshot (urutan baris
+boleh beda: key baru ditaruh di akhir). Header berubah = tidak ada patch
+untuk versi itu, klien wajib ambil snapshot.
+
+Pemakaian:
+  python tools/publish_delta.py loglist1.csv publish/loglist1
+  python tools/publish_delta.py loglist2.csv publish/loglist2 --name loglist2
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+from datetime import datetime, timezone
+
+from atomic_output import OutputTxn
+
+MANIFEST = "manifest.json"
+KEY_COL = "noBtg"
+MAX_PATCHES = 168       # 1 minggu kalau export tiap jam
+GZIP_LEVEL = 9
+
+# ---------- helpers ----------
+def gzip_bytes(data):
+    # mtime=0 + tanpa nama file -> isi gzip deterministik (hash stabil)
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=GZIP_LEVEL, mtime=0, filename="") as gz:
+        gz.write(data)
+    return buf.getvalue()
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def parse_csv(text):
+    rows = list(csv.reader(io.StringIO(text, newline="")))
+    if not rows:
+        return [], []
+    return rows[0], rows[1:]
+
+def group_by_key(header, rows, key=KEY_COL):
+    """Return dict key -> list baris (urutan sesuai CSV). noBtg dobel tetap satu grup."""
+    if key not in header:
+        raise SystemExit(f"Kolom key '{key}' tidak ada di header: {header}")
+    k = header.index(key)
+    groups = {}
+    for r in rows:
+        groups.setdefault(r[k] if k < len(r) else "", []).append(r)
+    return groups
+
+def diff_groups(old, new):
+    """Return (upsert {key: rows}, delete [key])."""
+    upsert = {k: rows for k, rows in new.items() if old.get(k) != rows}
+    delete = [k for k in old if k not in new]
+    return upsert, delete
+
+def apply_patch(groups, patch):
+    """Terapkan patch ke dict key -> rows (hasil group_by_key). Return dict baru."""
+    out = {k: rows for k, rows in groups.items() if k not in patch["delete"]}
+    for k, rows in patch["upsert"].items():
+        out[k] = rows
+    return out
+
+def load_manifest(pub_dir):
+    path = os.path.join(pub_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def read_snapshot(pub_dir, manifest):
+    snap = manifest["snapshot"]
+    with open(os.path.join(pub_dir, snap["file"]), "rb") as f:
+        return gzip.decompress(f.read())
+
+# ---------- publish ----------
+def publish(csv_path, pub_dir, name=None, key=KEY_COL, max_patches=MAX_PATCHES):
+    """
+    Tambah versi baru kalau isi csv_path beda dari snapshot terakhir.
+    Return nomor versi baru, atau None kalau tidak ada perubahan.
+    """
+    name = name or os.path.splitext(os.path.basename(csv_path))[0]
+    with open(csv_path, "rb") as f:
+        raw = f.read()
+    csv_sha = sha256_bytes(raw)
+
+    os.makedirs(pub_dir, exist_ok=True)
+    man = load_manifest(pub_dir)
+    if man is not None and man["snapshot"]["csv_sha256"] == csv_sha:
+        return None
+
+    header, rows = parse_csv(raw.decode("utf-8"))
+    new_groups = group_by_key(header, rows, key)
+    version = (man["latest"] + 1) if man else 1
+    now = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+    patches = list(man["patches"]) if man else []
+    patch_entry = None
+    if man is not None:
+        old_header, old_rows = parse_csv(read_snapshot(pub_dir, man).decode("utf-8"))
+        if old_header == header:
+            upsert, delete = diff_groups(group_by_key(old_header, old_rows, key), new_groups)
+            patch = {"from": man["latest"], "to": version, "key": key,
+                     "header": header, "upsert": upsert, "delete": delete}
+            data = gzip_bytes(json.dumps(patch, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            patch_entry = {
+                "from": man["latest"], "to": version,
+                "file": f"{name}_v{man['latest']}_v{version}.json.gz",
+                "sha256": sha256_bytes(data), "bytes": len(data),
+                "upsert": len(upsert), "delete": len(delete),
+            }
+            patches.append(patch_entry)
+        else:
+            # header beda: rantai patch putus, klien lama harus ambil snapshot
+            patches = []
+
+    dropped = patches[:-max_patches] if max_patches and len(patches) > max_patches else []
+    patches = patches[len(dropped):]
+
+    snap_data = gzip_bytes(raw)
+    snapshot = {
+        "version": version, "file": f"{name}_v{version}.csv.gz",
+        "sha256": sha256_bytes(snap_data), "csv_sha256": csv_sha,
+        "bytes": len(snap_data), "csv_bytes": len(raw), "rows": len(rows),
+    }
+    manifest = {
+        "name": name, "key": key, "latest": version, "updated": now,
+        "snapshot": snapshot, "patches": patches,
+    }
+
+    with OutputTxn() as txn:
+        txn.open_binary(os.path.join(pub_dir, snapshot["file"])).write(snap_data)
+        if patch_entry is not None:
+            txn.open_binary(os.path.join(pub_dir, patch_entry["file"])).write(data)
+        txn.write_json(os.path.join(pub_dir, MANIFEST), manifest)
+
+    # bersih-bersih setelah manifest baru ter-commit
+    stale = [p["file"] for p in dropped]
+    if man is not None:
+        stale.append(man["snapshot"]["file"])
+        if not patches:
+            stale += [p["file"] for p in man["patches"]]
+    for fn in stale:
+        try:
+            os.remove(os.path.join(pub_dir, fn))
+        except FileNotFoundError:
+            pass
+    return version
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Snapshot gzip + patch per noBtg untuk klien")
+    ap.add_argument("csv_path")
+    ap.add_argument("pub_dir")
+    ap.add_argument("--name", help="prefix nama file (default: nama CSV)")
+    ap.add_argument("--key", default=KEY_COL)
+    ap.add_argument("--max-patches", type=int, default=MAX_PATCHES)
+    args = ap.parse_args(argv)
+
+    v = publish(args.csv_path, args.pub_dir, args.name, args.key, args.max_patches)
+    if v is None:
+        print(f"Publish: {args.csv_path} tidak berubah")
+        return
+    man = load_manifest(args.pub_dir)
+    snap = man["snapshot"]
+    msg = f"Publish v{v} -> {args.pub_dir} (snapshot {snap['bytes']} B dari {snap['csv_bytes']} B"
+    if man["patches"] and man["patches"][-1]["to"] == v:
+        p = man["patches"][-1]
+        msg += f", patch {p['bytes']} B: {p['upsert']} upsert, {p['delete']} delete"
+    print(msg + ")")
+
+if __name__ == "__main__":
+    main()
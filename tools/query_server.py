@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Server HTTP lokal untuk query kecil ke data stock / loglist (tanpa download CSV utuh).
+
+Data dibaca sekali ke memori + index, lalu di-reload otomatis kalau file
+berubah (exporter menulis lewat os.replace, jadi cukup cek mtime/size).
+
+Endpoint (semua GET, balasan JSON):
+  /sources                              daftar sumber data + versi
+  /stock?posisi=TPK 42[&jenis=..][&kelas=..][&source=stock]
+  /loglist?noBtg=A8277[&source=loglist1]
+  /cube?posisi=TPK 42[&jenis=..][&kelas=SEMUA]   stock_cube.csv (stock_cube.py):
+                                        per sumber + selisih internal - external
+  /health
+
+Filter teks tidak peka huruf besar/kecil. ETag per respons; kirim
+If-None-Match untuk dapat 304 kalau data belum berubah.
+
+Pemakaian:
+  python tools/query_server.py [--dir .] [--host 127.0.0.1] [--port 8080]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+STOCK_FILES = {
+    "stock": "stock.csv",
+    "stock_internal": "stock_internal.csv",
+    "stock_external": "stock_external.csv",
+    "stock_ibs": "stock_ibs.csv",
+}
+LOGLIST_FILES = {
+    "loglist1": "loglist1.csv",
+    "loglist2": "loglist2.csv",
+    "loglist_ibs": "loglist_ibs.csv",
+    "loglist_internal": "loglist_internal.csv",
+}
+
+CUBE_FILE = "stock_cube.csv"
+
+RELOAD_INTERVAL = 2.0  # detik
+
+def _key(s):
+    return (s or "").strip().upper()
+
+def _num(s):
+    try:
+        return float(s) if "." in s else int(s)
+    except (TypeError, ValueError):
+        return s
+
+# ---------- sumber data ----------
+class Source:
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.sig = None
+        self.version = ""
+        self.rows = []
+
+    def signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def load(self):
+        sig = self.signature()
+        if sig is None:
+            self.sig, self.version, self.rows = None, "", []
+            self.build_index()
+            return
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        self.version = hashlib.sha256(raw).hexdigest()[:16]
+        text = raw.decode("utf-8-sig")
+        self.rows = self.parse(list(csv.reader(text.splitlines())))
+        self.build_index()
+        self.sig = sig
+
+    def info(self):
+        return {"name": self.name, "file": os.path.basename(self.path),
+                "version": self.version, "rows": len(self.rows)}
+
+class StockSource(Source):
+    def parse(self, rows):
+        if not rows:
+            return []
+        header = [h.strip() for h in rows[0]]
+        out = []
+        for r in rows[1:]:
+            if len(r) < len(header) or not r[0] or r[0] == "GLOBAL" or r[1] == "TOTAL":
+                continue
+            d = dict(zip(header, r))
+            d["btg"] = _num(d.get("btg", ""))
+            d["volume_m3"] = _num(d.get("volume_m3", ""))
+            out.append(d)
+        return out
+
+    def build_index(self):
+        self.by_posisi, self.by_jenis, self.by_kelas = {}, {}, {}
+        for i, d in enumerate(self.rows):
+            self.by_posisi.setdefault(_key(d.get("posisi")), set()).add(i)
+            self.by_jenis.setdefault(_key(d.get("jenis")), set()).add(i)
+            self.by_kelas.setdefault(_key(d.get("kelas_diameter")), set()).add(i)
+
+    def query(self, posisi=None, jenis=None, kelas=None):
+        sets = []
+        for val, idx in ((posisi, self.by_posisi), (jenis, self.by_jenis), (kelas, self.by_kelas)):
+            if val:
+                sets.append(idx.get(_key(val), set()))
+        ids = set.intersection(*sets) if sets else range(len(self.rows))
+        rows = [self.rows[i] for i in sorted(ids)]
+        total_btg = sum(r["btg"] for r in rows if isinstance(r["btg"], (int, float)))
+        total_vol = sum(r["volume_m3"] for r in rows if isinstance(r["volume_m3"], (int, float)))
+        return {"rows": rows, "total": {"btg": total_btg, "volume_m3": round(total_vol, 3)}}
+
+class LoglistSource(Source):
+    def parse(self, rows):
+        if not rows:
+            return []
+        header = [h.strip() for h in rows[0]]
+        out = []
+        for r in rows[1:]:
+            if not r or not r[0]:
+                continue
+            d = {h: (_num(v) if j else v) for j, (h, v) in enumerate(zip(header, r))}
+            if "idBarcode" in d:
+                d["idBarcode"] = r[header.index("idBarcode")]  # jangan jadi angka
+            out.append(d)
+        return out
+
+    def build_index(self):
+        self.by_nobtg = {}
+        for d in self.rows:
+            self.by_nobtg.setdefault(_key(d.get("noBtg")), []).append(d)
+
+    def query(self, nobtg):
+        return self.by_nobtg.get(_key(nobtg), [])
+
+class CubeSource(Source):
+    """stock_cube.csv: baris detail, kelas SEMUA, TOTAL per posisi, GLOBAL."""
+
+    def parse(self, rows):
+        if not rows:
+            return []
+        header = [h.strip() for h in rows[0]]
+        out = []
+        for r in rows[1:]:
+            if len(r) < len(header) or not r[0]:
+                continue
+            out.append({h: (_num(v) if j >= 3 else v) for j, (h, v) in enumerate(zip(header, r))})
+        return out
+
+    def build_index(self):
+        self.by_posisi, self.by_jenis, self.by_kelas = {}, {}, {}
+        for i, d in enumerate(self.rows):
+            self.by_posisi.setdefault(_key(d.get("posisi")), set()).add(i)
+            self.by_jenis.setdefault(_key(d.get("jenis")), set()).add(i)
+            self.by_kelas.setdefault(_key(d.get("kelas_diameter")), set()).add(i)
+
+    def query(self, posisi=None, jenis=None, kelas=None):
+        # baris TOTAL / GLOBAL sudah ada di file, tidak dijumlah ulang
+        sets = []
+        for val, idx in ((posisi, self.by_posisi), (jenis, self.by_jenis), (kelas, self.by_kelas)):
+            if val:
+                sets.append(idx.get(_key(val), set()))
+        ids = set.intersection(*sets) if sets else range(len(self.rows))
+        return {"rows": [self.rows[i] for i in sorted(ids)]}
+
+class DataStore:
+    def __init__(self, data_dir, stock_files=None, loglist_files=None, cube_file=CUBE_FILE):
+        self.lock = threading.RLock()
+        self.stock = {n: StockSource(n, os.path.join(data_dir, f))
+                      for n, f in (stock_files or STOCK_FILES).items()}
+        self.loglist = {n: LoglistSource(n, os.path.join(data_dir, f))
+                        for n, f in (loglist_files or LOGLIST_FILES).items()}
+        self.cube = {"stock_cube": CubeSource("stock_cube", os.path.join(data_dir, cube_file))}
+        self.generation = 0
+        self.reload(force=True)
+
+    def sources(self):
+        return list(self.stock.values()) + list(self.loglist.values()) + list(self.cube.values())
+
+    def reload(self, force=False):
+        """Reload sumber yang berubah. Return daftar nama yang di-reload."""
+        changed = []
+        for s in self.sources():
+            if force or s.signature() != s.sig:
+                # load di luar lock dulu, baru tukar (request lain tidak menunggu parse)
+                fresh = type(s)(s.name, s.path)
+                fresh.load()
+                if isinstance(s, StockSource):
+                    group = self.stock
+                elif isinstance(s, CubeSource):
+                    group = self.cube
+                else:
+                    group = self.loglist
+                with self.lock:
+                    group[s.name] = fresh
+                changed.append(s.name)
+        if changed:
+            with self.lock:
+                self.generation += 1
+        return changed
+
+    def watch(self, interval=RELOAD_INTERVAL):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    changed = self.reload()
+                except Exception as e:  # jangan matikan server karena satu file rusak
+                    print(f"reload gagal: {e}", flush=True)
+                    continue
+                if changed:
+                    print(f"reload: {', '.join(changed)}", flush=True)
+        t = threading.Thread(target=loop, name="reload", daemon=True)
+        t.start()
+        return t
+
+# ---------- HTTP ----------
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    server_version = "data_apk/1"
+    disable_nagle_algorithm = True  # header & body ditulis terpisah; tanpa ini ~40 ms/req
+    store = None                    # di-set oleh make_server()
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def send_json(self, status, obj, etag=None):
+        body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def not_modified(self, etag):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        store = self.store
+
+        with store.lock:
+            if url.path == "/health":
+                return self.send_json(200, {"ok": True, "generation": store.generation})
+
+            if url.path == "/sources":
+                srcs = store.sources()
+                payload = {"sources": [s.info() for s in srcs]}
+            elif url.path == "/stock":
+                name = q.get("source", "stock")
+                src = store.stock.get(name)
+                if src is None:
+                    return self.send_json(404, {"error": f"source tidak dikenal: {name}"})
+                srcs = [src]
+                payload = {"source": name, **src.query(q.get("posisi"), q.get("jenis"), q.get("kelas"))}
+            elif url.path == "/cube":
+                src = store.cube["stock_cube"]
+                if not src.version:
+                    return self.send_json(404, {"error": f"{CUBE_FILE} belum ada (jalankan stock_cube.py)"})
+                srcs = [src]
+                payload = src.query(q.get("posisi"), q.get("jenis"), q.get("kelas"))
+            elif url.path == "/loglist":
+                nobtg = q.get("noBtg") or q.get("nobtg")
+                if not nobtg:
+                    return self.send_json(400, {"error": "parameter noBtg wajib"})
+                if "source" in q:
+                    if q["source"] not in store.loglist:
+                        return self.send_json(404, {"error": f"source tidak dikenal: {q['source']}"})
+                    srcs = [store.loglist[q["source"]]]
+                else:
+                    srcs = list(store.loglist.values())
+                results = {}
+                for s in srcs:
+                    hit = s.query(nobtg)
+                    if hit:
+                        results[s.name] = hit
+                payload = {"noBtg": nobtg, "results": results}
+            else:
+                return self.send_json(404, {"error": "endpoint tidak dikenal"})
+
+            # ETag = versi sumber yang dipakai + query
+            h = hashlib.sha256(self.path.encode("utf-8"))
+            for s in srcs:
+                h.update(s.version.encode("ascii"))
+            etag = '"' + h.hexdigest()[:20] + '"'
+
+        inm = self.headers.get("If-None-Match")
+        if inm and etag in [t.strip() for t in inm.split(",")]:
+            return self.not_modified(etag)
+        self.send_json(200, payload, etag)
+
+def make_server(data_dir=".", host="127.0.0.1", port=8080, verbose=False):
+    store = DataStore(data_dir)
+    handler = type("BoundHandler", (Handler,), {"store": store})
+    srv = ThreadingHTTPServer((host, port), handler)
+    srv.daemon_threads = True
+    srv.verbose = verbose
+    srv.store = store
+    return srv
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Server query stock/loglist lokal")
+    ap.add_argument("--dir", default=".", help="folder berisi CSV (default: folder kerja)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL)
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    srv = make_server(args.dir, args.host, args.port, args.verbose)
+    srv.store.watch(args.reload_interval)
+    for s in srv.store.sources():
+        print(f"  {s.name:<18} {s.info()['rows']:>6} rows  {s.version or '(tidak ada)'}")
+    print(f"Listening on http://{args.host}:{srv.server_address[1]}", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+
+if __name__ == "__main__":
+    main()
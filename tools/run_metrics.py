@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Riwayat run tiap job sync (exporter, renderer pesan, pcloud_fetch) + alarm
+kalau ada run yang jauh lebih lambat dari biasanya.
+
+Tiap run menambah satu baris JSON di akhir METRICS_PATH (append, isi lama
+tidak ditulis ulang; baru dipangkas ke KEEP_RUNS baris terakhir kalau sudah
+lewat kira-kira KEEP_RUNS x TRIM_FACTOR; di dalam .job_cache, yang di workflow disimpan lewat
+actions/cache/save dengan if: always(), jadi run gagal juga ikut tercatat):
+
+  {"tool": "export_stock_csv", "start": "...", "status": "ok",
+   "total_s": 1.23, "phases": {"cache": 0.01, "read": 1.1, "write": 0.05},
+   "counts": {"rows_read": 3400, "rows_written": 45, "groups": 38}}
+
+status: ok / skip (cache current) / restored / error.
+
+Di script:
+    import run_metrics
+    def main():
+        m = run_metrics.current()
+        ... m.lap("read") ...          # waktu sejak lap sebelumnya -> phases["read"]
+        m.count("rows_read", n)
+    if __name__ == "__main__":
+        run_metrics.run(main)
+
+Laporan:
+  python tools/run_metrics.py report                    # semua tool
+  python tools/run_metrics.py report --tool export_stock_csv --last 200
+  python tools/run_metrics.py report --factor 2 --fail  # exit 1 kalau run terakhir lambat
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+METRICS_PATH = os.environ.get("RUN_METRICS_FILE", os.path.join(".job_cache", "run_metrics.jsonl"))
+KEEP_RUNS = 5000
+TRIM_FACTOR = 1.2     # pangkas baru kalau file kira-kira > KEEP_RUNS x ini
+BASELINE_RUNS = 20    # run ok sebelumnya yang jadi patokan
+SLOW_FACTOR = 2.0     # lebih lambat dari p50 patokan x ini -> ditandai
+MIN_SLOW_S = 0.5      # selisih di bawah ini tidak dianggap regresi (noise)
+
+WITA = timezone(timedelta(hours=8))
+
+class Run:
+    def __init__(self, tool):
+        self.tool = tool
+        self.start = datetime.now(WITA).replace(microsecond=0).isoformat()
+        self.t0 = self.last = time.perf_counter()
+        self.phases = {}
+        self.counts = {}
+        self.status = "ok"
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = round(self.phases.get(phase, 0.0) + now - self.last, 4)
+        self.last = now
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def set(self, name, value):
+        self.counts[name] = value
+
+    def record(self):
+        return {
+            "tool": self.tool, "start": self.start, "status": self.status,
+            "total_s": round(time.perf_counter() - self.t0, 4),
+            "phases": self.phases, "counts": self.counts,
+        }
+
+_current = None
+
+def current():
+    """Run yang sedang jalan (dummy kalau script tidak dijalankan lewat run())."""
+    global _current
+    if _current is None:
+        _current = Run(os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0])
+    return _current
+
+def estimated_lines(path, sample=65536):
+    """Perkiraan jumlah baris: ukuran file / rata-rata panjang baris di awal file (O(1))."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(sample)
+    if len(head) == size:
+        return head.count(b"\n")
+    return size * max(1, head.count(b"\n")) / len(head)
+
+def trim_runs(path, keep=KEEP_RUNS):
+    """Tulis ulang file dengan `keep` baris terakhir saja. Return jumlah baris yang dibuang."""
+    from atomic_output import OutputTxn
+
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [ln for ln in f.read().splitlines() if ln.strip()]
+    if len(lines) <= keep:
+        return 0
+    with OutputTxn() as txn:
+        txn.open_text(path).write("\n".join(lines[-keep:]) + "\n")
+    return len(lines) - keep
+
+def append_run(rec, path=METRICS_PATH, keep=KEEP_RUNS):
+    from atomic_output import OutputTxn, trim_torn_tail
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    trim_torn_tail(path)
+    with OutputTxn() as txn:
+        txn.open_append(path).write(json.dumps(rec, ensure_ascii=False, sort_keys=True) + "\n")
+    if keep and estimated_lines(path) > keep * TRIM_FACTOR:
+        trim_runs(path, keep)
+
+def run(main, tool=None, path=METRICS_PATH):
+    """Jalankan main(), lalu catat metrik (juga kalau gagal). Gagal catat tidak fatal."""
+    global _current
+    _current = m = Run(tool or os.path.splitext(os.path.basename(sys.argv[0]))[0])
+    try:
+        return main()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            m.status = "error"
+        raise
+    except BaseException:
+        m.status = "error"
+        raise
+    finally:
+        if path:
+            try:
+                append_run(m.record(), path)
+            except OSError as e:
+                print(f"Warning: gagal catat metrik run: {e}", file=sys.stderr)
+
+# ---------- report ----------
+def read_runs(path):
+    runs = []
+    if not os.path.exists(path):
+        return runs
+    with open(path, "r", encoding="utf-8") as f:
+        for ln in f:
+            try:
+                runs.append(json.loads(ln))
+            except ValueError:
+                continue   # baris rusak (mis. terpotong) dilewati
+    return runs
+
+def pct(values, p):
+    """Persentil nearest-rank (p 0..100)."""
+    if not values:
+        return None
+    s = sorted(values)
+    k = max(0, min(len(s) - 1, math.ceil(p / 100 * len(s)) - 1))
+    return s[k]
+
+def flag_slow(runs, factor=SLOW_FACTOR, baseline=BASELINE_RUNS, min_s=MIN_SLOW_S):
+    """
+    runs: riwayat satu tool, urut waktu. Return list (run, p50 patokan) untuk
+    run yang total_s > factor x p50 dari `baseline` run sebelumnya berstatus sama.
+    """
+    out = []
+    hist = {}
+    for r in runs:
+        prev = hist.setdefault(r.get("status"), [])
+        if len(prev) >= min(5, baseline):
+            base = pct(prev[-baseline:], 50)
+            if r["total_s"] > base * factor and r["total_s"] - base >= min_s:
+                out.append((r, base))
+        if r.get("status") != "error":
+            prev.append(r["total_s"])
+    return out
+
+def fmt_s(v):
+    return "-" if v is None else f"{v:.2f}s"
+
+def report(runs, last=None, factor=SLOW_FACTOR, out=sys.stdout):
+    """Cetak ringkasan per tool. Return True kalau run terakhir suatu tool ditandai lambat."""
+    by_tool = {}
+    for r in runs:
+        by_tool.setdefault(r.get("tool", "?"), []).append(r)
+    latest_slow = False
+    for tool in sorted(by_tool):
+        rs = by_tool[tool][-last:] if last else by_tool[tool]
+        ok = [r for r in rs if r.get("status") == "ok"]
+        statuses = {}
+        for r in rs:
+            statuses[r.get("status")] = statuses.get(r.get("status"), 0) + 1
+        st = ", ".join(f"{k} {v}" for k, v in sorted(statuses.items()))
+        print(f"{tool}  ({len(rs)} run: {st})", file=out)
+
+        totals = [r["total_s"] for r in ok]
+        print(f"  total ok      p50 {fmt_s(pct(totals, 50))}  p95 {fmt_s(pct(totals, 95))}"
+              f"  terakhir {fmt_s(rs[-1]['total_s'])} ({rs[-1].get('status')}, {rs[-1].get('start')})",
+              file=out)
+        # tren: p50 10 run ok terakhir vs sebelumnya
+        if len(totals) >= 20:
+            now, before = pct(totals[-10:], 50), pct(totals[:-10], 50)
+            change = f" ({(now / before - 1) * 100:+.0f}%)" if before else ""
+            print(f"  tren p50      {fmt_s(before)} -> {fmt_s(now)}{change}", file=out)
+        phases = sorted({p for r in ok for p in r.get("phases", {})})
+        for p in phases:
+            vals = [r["phases"][p] for r in ok if p in r.get("phases", {})]
+            print(f"  {p:<13} p50 {fmt_s(pct(vals, 50))}  p95 {fmt_s(pct(vals, 95))}", file=out)
+        counts = rs[-1].get("counts", {})
+        if counts:
+            print("  terakhir: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())), file=out)
+
+        slow = flag_slow(rs, factor)
+        for r, base in slow[-5:]:
+            print(f"  LAMBAT {r.get('start')}: {fmt_s(r['total_s'])} vs p50 {fmt_s(base)} "
+                  f"({r['total_s'] / base:.1f}x, {r.get('status')})", file=out)
+        if slow and slow[-1][0] is rs[-1]:
+            latest_slow = True
+        print(file=out)
+    return latest_slow
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Riwayat metrik run job sync")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rp = sub.add_parser("report", help="p50/p95 per tool + run yang lambat")
+    rp.add_argument("--file", default=METRICS_PATH)
+    rp.add_argument("--tool", help="hanya tool ini")
+    rp.add_argument("--last", type=int, help="hanya N run terakhir per tool")
+    rp.add_argument("--factor", type=float, default=SLOW_FACTOR,
+                    help=f"lambat = lebih dari p50 patokan x ini (default {SLOW_FACTOR})")
+    rp.add_argument("--fail", action="store_true", help="exit 1 kalau run terakhir ditandai lambat")
+    args = ap.parse_args(argv)
+
+    runs = read_runs(args.file)
+    if args.tool:
+        runs = [r for r in runs if r.get("tool") == args.tool]
+    if not runs:
+        print(f"Belum ada metrik di {args.file}")
+        return
+    if report(runs, args.last, args.factor) and args.fail:
+        raise SystemExit("Run terakhir jauh lebih lambat dari patokan")
+
+if __name__ == "__main__":
+    main()
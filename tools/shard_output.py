@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Output loglist dipecah per shard (posisi atau awalan noBtg), opsional.
+
+loglist1.csv / loglist2.csv / loglist_ibs.csv tetap ditulis utuh; shard cuma
+salinan terbagi supaya klien bisa ambil TPK-nya saja:
+
+  <dir>/<shard>.csv      header + baris yang sama persis dengan CSV utama
+  <dir>/manifest.json    {"source", "source_sha256", "by", "header", "rows",
+                          "shards": [{"shard", "file", "keys", "rows", "sha256"}]}
+
+- by="posisi": kunci = posisi terakhir (kolom T), by="prefix": PREFIX_LEN
+  karakter pertama noBtg; nama file = kunci yang dibersihkan;
+- urutan baris dalam shard = urutan di CSV utama, shard di manifest urut nama
+  (deterministik, hasil sama untuk input sama);
+- tiap shard ditulis di thread sendiri lewat OutputTxn yang sama dengan CSV
+  utama: shard yang isinya sama tidak disentuh, shard yang hilang dihapus.
+
+Di exporter:
+    shards = ShardSet(SHARD_BY, SHARD_DIR) if SHARD_BY else None
+    ... shards.add(posisi_raw, nobtg_raw, out_row) tiap baris yang ditulis ...
+    shards.write(txn, OUT_CSV, header)   # di dalam txn, setelah CSV utama selesai
+    shards.prune()                       # setelah commit
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from atomic_output import sha256_file
+from csv_batch import BatchCsvWriter, cell_str
+from stock_rows import norm_str
+
+MANIFEST = "manifest.json"
+PREFIX_LEN = 1
+WORKERS = 4
+EMPTY_KEY = "_kosong"
+
+_unsafe = re.compile(r"[^0-9A-Za-z-]+")
+
+def shard_name(key):
+    name = _unsafe.sub("_", key).strip("_-")
+    return name or EMPTY_KEY
+
+def load_manifest(shard_dir):
+    try:
+        with open(os.path.join(shard_dir, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def manifest_matches(shard_dir, source_csv, by):
+    """True kalau shard di folder dibuat dari isi source_csv sekarang (dan belum diubah)."""
+    m = load_manifest(shard_dir)
+    if not m or m.get("by") != by or not os.path.exists(source_csv):
+        return False
+    if m.get("source_sha256") != sha256_file(source_csv):
+        return False
+    for s in m.get("shards", []):
+        p = os.path.join(shard_dir, s["file"])
+        if not os.path.exists(p) or sha256_file(p) != s["sha256"]:
+            return False
+    return True
+
+class ShardSet:
+    def __init__(self, by, shard_dir, prefix_len=PREFIX_LEN, workers=WORKERS):
+        if by not in ("posisi", "prefix"):
+            raise SystemExit(f"SHARD_BY harus 'posisi' atau 'prefix', bukan {by!r}")
+        self.by = by
+        self.dir = shard_dir
+        self.prefix_len = prefix_len
+        self.workers = workers
+        self.rows = {}     # nama shard -> list baris
+        self.keys = {}     # nama shard -> set kunci asli
+        self.files = []
+
+    def add(self, posisi_raw, nobtg_raw, row):
+        if self.by == "posisi":
+            key = norm_str(posisi_raw)
+        else:
+            key = norm_str(nobtg_raw)[:self.prefix_len].upper()
+        name = shard_name(key)
+        bucket = self.rows.get(name)
+        if bucket is None:
+            bucket = self.rows[name] = []
+            self.keys[name] = set()
+        bucket.append(row)
+        self.keys[name].add(key)
+
+    def write(self, txn, source_csv, header):
+        """Tulis semua shard + manifest lewat txn (paralel per shard). Return manifest."""
+        os.makedirs(self.dir, exist_ok=True)
+        names = sorted(self.rows)
+        self.files = [name + ".csv" for name in names]
+        paths = [os.path.join(self.dir, fn) for fn in self.files]
+        # file dibuka di thread utama (OutputTxn tidak thread-safe)
+        outs = [txn.open_text(p) for p in paths]
+
+        def write_one(k):
+            w = BatchCsvWriter(outs[k])
+            w.write_header(header)
+            for r in self.rows[names[k]]:
+                w.add(r)
+            w.close()
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(names)))) as pool:
+            list(pool.map(write_one, range(len(names))))
+
+        manifest = {
+            "source": os.path.basename(source_csv),
+            "source_sha256": txn.digest(source_csv),
+            "by": self.by,
+            "header": [cell_str(h) for h in header],
+            "rows": sum(len(self.rows[n]) for n in names),
+            "shards": [
+                {"shard": n, "file": fn, "keys": sorted(self.keys[n]),
+                 "rows": len(self.rows[n]), "sha256": txn.digest(p)}
+                for n, fn, p in zip(names, self.files, paths)
+            ],
+        }
+        txn.write_json(os.path.join(self.dir, MANIFEST), manifest)
+        return manifest
+
+    def prune(self):
+        """Hapus file .csv di folder shard yang tidak ada di manifest baru. Return jumlah."""
+        keep = set(self.files)
+        n = 0
+        for fn in os.listdir(self.dir):
+            if fn.endswith(".csv") and fn not in keep:
+                os.remove(os.path.join(self.dir, fn))
+                n += 1
+        return n
+
+    def summary(self, txn):
+        changed = sum(1 for fn in self.files if txn.changed.get(os.path.join(self.dir, fn)))
+        return f"{len(self.files)} shard per {self.by}, {changed} berubah"
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Salinan semua output CSV di satu database SQLite lokal, supaya tool APK /
+script pesan bisa query pakai index, bukan scan CSV utuh.
+
+- satu tabel per file: loglist1.csv -> loglist1, stock_ibs.csv -> stock_ibs,
+  koordinat_presensi.csv -> koordinat_presensi, dst.;
+- tabel diganti utuh (DROP + CREATE + executemany) di SATU transaksi untuk
+  semua file yang berubah; mode WAL, jadi pembaca tetap lihat versi lama
+  sampai commit;
+- kolom yang isinya angka semua jadi INTEGER/REAL, kecuali TEXT_COLUMNS
+  (noBtg "0123" tetap teks);
+- index otomatis untuk kolom INDEX_COLUMNS yang ada di tabel;
+- tabel _sources menyimpan sha256 tiap CSV; file yang tidak berubah dilewati.
+
+Dari exporter (SQLITE_DB = "data_apk.sqlite"):
+    sqlite_sink.sink(SQLITE_DB, [OUT_CSV, ...])
+
+Manual:
+  python tools/sqlite_sink.py load                         # semua CSV default
+  python tools/sqlite_sink.py load stock.csv loglist1.csv --db data_apk.sqlite
+  python tools/sqlite_sink.py query "SELECT jenis, SUM(volume) FROM loglist1 GROUP BY jenis"
+"""
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from atomic_output import sha256_file
+
+DB_PATH = "data_apk.sqlite"
+DEFAULT_FILES = [
+    "loglist1.csv", "loglist2.csv", "loglist_ibs.csv", "loglist_internal.csv",
+    "stock.csv", "stock_internal.csv", "stock_external.csv", "stock_ibs.csv",
+    "koordinat_presensi.csv",
+]
+INDEX_COLUMNS = ("noBtg", "idBarcode", "posisi", "jenis")
+TEXT_COLUMNS = {"noBtg", "idBarcode", "posisi", "jenis", "kelas", "kelas_diameter", "lokasi"}
+BUSY_TIMEOUT = 30.0   # detik, kalau exporter lain sedang menulis
+
+_num_re = re.compile(r"-?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+_ident_re = re.compile(r"[^0-9A-Za-z_]+")
+
+def table_name(path):
+    name = _ident_re.sub("_", os.path.splitext(os.path.basename(path))[0])
+    return name if not name[:1].isdigit() else "t_" + name
+
+def quote(ident):
+    return '"' + ident.replace('"', '""') + '"'
+
+def connect(db):
+    con = sqlite3.connect(db, timeout=BUSY_TIMEOUT, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("CREATE TABLE IF NOT EXISTS _sources ("
+                "tbl TEXT PRIMARY KEY, path TEXT, sha256 TEXT, rows INTEGER, loaded_at TEXT)")
+    return con
+
+def read_csv(path):
+    """Return (header, rows); baris kosong dibuang, baris pendek diisi ""."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader, [])]
+        width = len(header)
+        rows = []
+        for r in reader:
+            if not r or not any(c.strip() for c in r):
+                continue
+            if len(r) < width:
+                r = r + [""] * (width - len(r))
+            rows.append(r[:width])
+    return header, rows
+
+def column_types(header, rows):
+    """INTEGER / REAL / TEXT per kolom dari isi (sel kosong diabaikan)."""
+    types = []
+    for j, name in enumerate(header):
+        if name in TEXT_COLUMNS:
+            types.append("TEXT")
+            continue
+        t = None
+        for r in rows:
+            v = r[j].strip()
+            if not v:
+                continue
+            if not _num_re.match(v):
+                t = "TEXT"
+                break
+            if t is None:
+                t = "INTEGER"
+            if t == "INTEGER" and ("." in v or "e" in v or "E" in v):
+                t = "REAL"
+        types.append(t or "TEXT")
+    return types
+
+def typed_rows(rows, types):
+    conv = []
+    for t in types:
+        if t == "INTEGER":
+            conv.append(lambda v: int(v) if v.strip() else None)
+        elif t == "REAL":
+            conv.append(lambda v: float(v) if v.strip() else None)
+        else:
+            conv.append(lambda v: v.strip())
+    for r in rows:
+        yield tuple([c(v) for c, v in zip(conv, r)])
+
+def replace_table(con, table, header, rows):
+    # nama kolom dobel / kosong di CSV -> diberi akhiran supaya CREATE TABLE sah
+    cols, seen = [], set()
+    for j, h in enumerate(header):
+        c = h or f"col{j + 1}"
+        while c.lower() in seen:
+            c += "_"
+        seen.add(c.lower())
+        cols.append(c)
+    types = column_types(header, rows)
+    q = quote(table)
+    con.execute(f"DROP TABLE IF EXISTS {q}")
+    con.execute(f"CREATE TABLE {q} (" + ", ".join(f"{quote(c)} {t}" for c, t in zip(cols, types)) + ")")
+    con.executemany(f"INSERT INTO {q} VALUES ({', '.join('?' * len(cols))})", typed_rows(rows, types))
+    for c in INDEX_COLUMNS:
+        if c in cols:
+            con.execute(f"CREATE INDEX {quote(f'ix_{table}_{c}')} ON {q} ({quote(c)})")
+
+def sync_csvs(db, paths, force=False):
+    """
+    Muat CSV yang berubah ke `db` dalam satu transaksi.
+    Return list (tabel, baris, "loaded" / "same" / "missing").
+    """
+    con = connect(db)
+    out = []
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        known = dict(con.execute("SELECT tbl, sha256 FROM _sources"))
+        for path in paths:
+            table = table_name(path)
+            if not os.path.exists(path):
+                out.append((table, 0, "missing"))
+                continue
+            h = sha256_file(path)
+            if not force and known.get(table) == h:
+                out.append((table, None, "same"))
+                continue
+            header, rows = read_csv(path)
+            replace_table(con, table, header, rows)
+            con.execute("INSERT OR REPLACE INTO _sources VALUES (?, ?, ?, ?, ?)",
+                        (table, path, h, len(rows), time.strftime("%Y-%m-%dT%H:%M:%S")))
+            out.append((table, len(rows), "loaded"))
+        con.execute("COMMIT")
+    except BaseException:
+        if con.in_transaction:
+            con.execute("ROLLBACK")
+        raise
+    finally:
+        con.close()
+    return out
+
+def sink(db, paths):
+    """Dipanggil exporter setelah output ditulis; gagal di sini tidak fatal."""
+    try:
+        res = sync_csvs(db, [p for p in paths if p])
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: gagal update {db}: {e}")
+        return
+    loaded = [f"{t} ({n} baris)" for t, n, s in res if s == "loaded"]
+    if loaded:
+        print(f"SQLite {db}: {', '.join(loaded)}")
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Salin output CSV ke SQLite / query")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ld = sub.add_parser("load", help="muat CSV (default: semua output)")
+    ld.add_argument("csv", nargs="*", default=DEFAULT_FILES)
+    ld.add_argument("--db", default=DB_PATH)
+    ld.add_argument("--force", action="store_true", help="muat ulang walau hash sama")
+    qy = sub.add_parser("query", help="jalankan SQL, hasil CSV ke stdout")
+    qy.add_argument("sql")
+    qy.add_argument("--db", default=DB_PATH)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "load":
+        t0 = time.perf_counter()
+        res = sync_csvs(args.db, args.csv, args.force)
+        for table, n, status in res:
+            print(f"{table:<20} {status:<8} {'' if n is None else n}")
+        print(f"done -> {args.db} ({time.perf_counter() - t0:.2f}s)")
+        return
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"{args.db} tidak ada; jalankan 'load' dulu")
+    con = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    try:
+        cur = con.execute(args.sql)
+        w = csv.writer(sys.stdout)
+        w.writerow([d[0] for d in cur.description or ()])
+        w.writerows(cur)
+    except sqlite3.Error as e:
+        raise SystemExit(f"SQL error: {e}")
+    finally:
+        con.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Umur stock: berapa hari tiap kayu sudah diam di posisi terakhirnya.
+
+Umur = tanggal acuan - tanggal mutasi (kolom S) per noBtg. Tanggal acuan
+default = mutasi terakhir global (tanggal terbaru di data), bukan jam run,
+jadi hasilnya hanya berubah kalau workbook berubah (cocok dengan job_cache).
+
+Hasil per posisi x jenis (+ TOTAL per posisi, GLOBAL di akhir):
+  btg, volume, median & maks hari, lalu btg/volume per bucket umur
+  (default "0-7,8-30,31-UP", format sama dengan kelas_bins.py), dan btg
+  tanpa tanggal mutasi.
+
+Hitungnya sekali jalan di numpy (selisih ordinal tanggal + searchsorted +
+bincount), dari baris yang sudah dibaca exporter (export_stock_csv.py,
+AGING_CSV) atau dari file antara:
+
+  python tools/stock_aging.py loglist1_rows.csv stock_aging.csv
+  python tools/stock_aging.py loglist_ibs_rows.csv stock_ibs_aging.csv --profile ibs
+  python tools/stock_aging.py loglist1_rows.csv out.csv --buckets "0-14,15-60,61-UP" --at 2026-09-01
+"""
+
+import argparse
+import csv
+from array import array
+from datetime import date
+
+import numpy as np
+
+import stock_rows
+from kelas_bins import parse_scheme, bin_index
+
+BUCKETS = "0-7,8-30,31-UP"
+
+class AgingCollector:
+    """Kumpulkan (posisi, jenis, volume, tanggal) per baris; hitung di compute()."""
+
+    def __init__(self):
+        self.keys = {}          # (posisi, jenis) -> group id
+        # array, bukan list: ~20 byte per baris (aman untuk mode STREAM)
+        self.gid = array("q")
+        self.vol = array("d")
+        self.ords = array("q")  # date.toordinal(), -1 = tanpa tanggal
+        self.last = None
+
+    def add(self, posisi, jenis, vol, tgl):
+        g = self.keys.get((posisi, jenis))
+        if g is None:
+            g = self.keys[(posisi, jenis)] = len(self.keys)
+        self.gid.append(g)
+        self.vol.append(vol)
+        if tgl:
+            self.ords.append(tgl.toordinal())
+            if self.last is None or tgl > self.last:
+                self.last = tgl
+        else:
+            self.ords.append(-1)
+
+    def compute(self, at=None, buckets=BUCKETS):
+        """Return (header, rows) laporan umur; at default = tanggal terbaru di data."""
+        scheme = parse_scheme(buckets)
+        at = at or self.last
+        gid = np.frombuffer(self.gid, dtype=np.int64)
+        vol = np.frombuffer(self.vol, dtype=float)
+        ords = np.frombuffer(self.ords, dtype=np.int64)
+        has = ords >= 0
+        days = np.where(has, (at.toordinal() if at else 0) - ords, 0)
+        days = np.maximum(days, 0)   # tanggal di depan tanggal acuan dihitung 0 hari
+
+        b = bin_index(np.where(has, days, np.nan), scheme)
+        b = np.where(b == -1, 0, b)  # di bawah bin pertama -> bin pertama
+
+        # posisi untuk baris TOTAL per posisi
+        ordered = sorted(self.keys, key=lambda k: (k[0], k[1]))
+        pos_names = sorted({p for p, _ in ordered})
+        pos_idx = {p: i for i, p in enumerate(pos_names)}
+        pos_of_key = np.empty(len(self.keys), dtype=np.int64)
+        for (p, _j), g in self.keys.items():
+            pos_of_key[g] = pos_idx[p]
+
+        detail = histogram(gid, len(self.keys), vol, days, has, b, len(scheme.labels))
+        per_pos = histogram(pos_of_key[gid], len(pos_names),
+                            vol, days, has, b, len(scheme.labels))
+        glob = histogram(np.zeros_like(gid), 1, vol, days, has, b, len(scheme.labels))
+
+        header = ["posisi", "jenis", "btg", "volume_m3", "hari_median", "hari_maks"]
+        for label in scheme.labels:
+            header += [f"btg_{label}", f"volume_{label}"]
+        header += ["btg_tanpa_tgl", "tanggal_acuan"]
+        at_str = stock_rows.fmt_d(at)
+
+        rows = []
+        cur = None
+        for key in ordered:
+            if cur is not None and key[0] != cur:
+                rows.append([cur, "TOTAL"] + per_pos[pos_idx[cur]] + [at_str])
+                rows.append([])
+            cur = key[0]
+            rows.append(list(key) + detail[self.keys[key]] + [at_str])
+        if cur is not None:
+            rows.append([cur, "TOTAL"] + per_pos[pos_idx[cur]] + [at_str])
+            rows.append([])
+        rows.append(["GLOBAL", "TOTAL"] + glob[0] + [at_str])
+        return header, rows
+
+def histogram(gid, ngroups, vol, days, has, bucket, nbuckets):
+    """Return list per group: [btg, vol, median, maks, (btg, vol) per bucket..., tanpa_tgl]."""
+    btg = np.bincount(gid, minlength=ngroups)
+    vsum = np.bincount(gid, weights=vol, minlength=ngroups)
+    no_date = np.bincount(gid[~has], minlength=ngroups)
+
+    ok = has & (bucket >= 0)
+    cell = gid[ok] * nbuckets + bucket[ok]
+    bb = np.bincount(cell, minlength=ngroups * nbuckets).reshape(ngroups, nbuckets)
+    bv = np.bincount(cell, weights=vol[ok], minlength=ngroups * nbuckets).reshape(ngroups, nbuckets)
+
+    # median/maks: urutkan (group, hari), ambil posisi tengah & akhir tiap group
+    g_d, d_d = gid[has], days[has]
+    order = np.lexsort((d_d, g_d))
+    g_s, d_s = g_d[order], d_d[order]
+    n_d = np.bincount(g_s, minlength=ngroups)
+    start = np.concatenate(([0], np.cumsum(n_d)[:-1]))
+
+    out = []
+    for g in range(ngroups):
+        if n_d[g]:
+            med = int(d_s[start[g] + (n_d[g] - 1) // 2])
+            mx = int(d_s[start[g] + n_d[g] - 1])
+        else:
+            med = mx = ""
+        row = [int(btg[g]), round(float(vsum[g]), 3), med, mx]
+        for k in range(nbuckets):
+            row += [int(bb[g, k]), round(float(bv[g, k]), 3)]
+        out.append(row + [int(no_date[g])])
+    return out
+
+def write_aging_csv(w, collector, at=None, buckets=BUCKETS):
+    header, rows = collector.compute(at, buckets)
+    w.writerow(header)
+    w.writerows(rows)
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Laporan umur stock per posisi x jenis")
+    ap.add_argument("rows_csv", help="file antara (loglist1_rows.csv / loglist_ibs_rows.csv)")
+    ap.add_argument("out_csv")
+    ap.add_argument("--profile", choices=sorted(stock_rows.SKIP_RULES), default="main",
+                    help="aturan skip posisi (lihat stock_rows.py)")
+    ap.add_argument("--buckets", default=BUCKETS, help=f'bucket hari (default "{BUCKETS}")')
+    ap.add_argument("--at", type=date.fromisoformat,
+                    help="tanggal acuan YYYY-MM-DD (default: mutasi terakhir global)")
+    args = ap.parse_args(argv)
+
+    skip = stock_rows.SKIP_RULES[args.profile]
+    col = AgingCollector()
+    for r in stock_rows.read_rows(args.rows_csv):
+        if not skip(r.posisi):
+            col.add(r.posisi, r.jenis, r.vol, r.tgl)
+
+    from atomic_output import OutputTxn
+    with OutputTxn() as txn:
+        write_aging_csv(csv.writer(txn.open_text(args.out_csv)), col, args.at, args.buckets)
+    print(f"Aging done -> {args.out_csv} (acuan {stock_rows.fmt_d(args.at or col.last)}, "
+          f"{len(col.gid)} btg, {len(col.keys)} posisi x jenis)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gabungan stock.csv, stock_internal.csv, stock_external.csv, stock_ibs.csv
+jadi satu tabel (posisi x kelas_diameter x jenis) dengan kolom per sumber.
+
+Keempat file ditulis write_stock_csv (stock_rows.py) jadi sudah urut
+(posisi, kelas, jenis); di sini cukup merge satu jalan (heapq.merge), tanpa
+dict besar. Setelah baris detail tiap posisi ditulis juga baris kelas
+"SEMUA" per jenis, lalu TOTAL posisi, dan GLOBAL di akhir.
+
+Kolom selisih = internal - external (volume internal dari kolom M,
+external dari kolom AB, jadi selisih ini menunjukkan beda ukuran di
+workbook, bukan salah hitung).
+
+Pemakaian:
+  python tools/stock_cube.py                     # baca dari folder kerja, tulis stock_cube.csv
+  python tools/stock_cube.py --dir . --out stock_cube.csv --top 10
+"""
+
+import argparse
+import csv
+import heapq
+import os
+
+from atomic_output import OutputTxn
+from csv_columns import read_columns
+
+SOURCES = [
+    ("stock", "stock.csv"),
+    ("internal", "stock_internal.csv"),
+    ("external", "stock_external.csv"),
+    ("ibs", "stock_ibs.csv"),
+]
+OUT_CSV = "stock_cube.csv"
+ALL_KELAS = "SEMUA"
+
+def cube_header(names):
+    h = ["posisi", "kelas_diameter", "jenis"]
+    for n in names:
+        h += [f"btg_{n}", f"volume_{n}"]
+    return h + ["selisih_btg_internal_external", "selisih_volume_internal_external"]
+
+def iter_source(path, tag):
+    """Baris detail stock CSV -> ((posisi, kelas, jenis), tag, btg, vol), urut."""
+    rows = read_columns(path, ["posisi", "kelas_diameter", "jenis", "btg", "volume_m3"],
+                        required=["posisi", "kelas_diameter", "jenis", "btg", "volume_m3"])
+    prev = None
+    for posisi, kelas, jenis, btg, vol in rows:
+        if not posisi or not jenis or kelas == "TOTAL" or posisi == "GLOBAL":
+            continue
+        key = (posisi, kelas, jenis)
+        if prev is not None and key < prev:
+            raise SystemExit(f"{path}: baris tidak urut ({key} setelah {prev}); "
+                             "tulis ulang pakai stock_rows.write_stock_csv")
+        prev = key
+        yield key, tag, int(float(btg or 0)), float(vol or 0)
+
+class Cube:
+    """Penampung nilai per sumber untuk satu key."""
+
+    def __init__(self, n):
+        self.btg = [0] * n
+        self.vol = [0.0] * n
+
+    def add(self, other):
+        for i in range(len(self.btg)):
+            self.btg[i] += other.btg[i]
+            self.vol[i] += other.vol[i]
+
+def merge(sources, w, int_idx=None, ext_idx=None):
+    """
+    sources: list (nama, path) yang ada. Tulis cube ke csv.writer `w`.
+    Return list (posisi, jenis, selisih_vol, selisih_btg) baris SEMUA (untuk ringkasan).
+    """
+    names = [n for n, _ in sources]
+    n = len(names)
+    w.writerow(cube_header(names))
+
+    def diff(c):
+        if int_idx is None or ext_idx is None:
+            return ["", ""]
+        return [c.btg[int_idx] - c.btg[ext_idx], round(c.vol[int_idx] - c.vol[ext_idx], 3)]
+
+    def emit(posisi, kelas, jenis, c):
+        row = [posisi, kelas, jenis]
+        for i in range(n):
+            row += [c.btg[i], round(c.vol[i], 3)]
+        w.writerow(row + diff(c))
+
+    per_jenis = {}     # jenis -> Cube (kelas SEMUA), posisi yang sedang jalan
+    pos_total = Cube(n)
+    glob = Cube(n)
+    diffs = []
+
+    def flush_posisi(posisi):
+        for jenis in sorted(per_jenis):
+            c = per_jenis[jenis]
+            emit(posisi, ALL_KELAS, jenis, c)
+            if int_idx is not None and ext_idx is not None:
+                diffs.append((posisi, jenis, c.vol[int_idx] - c.vol[ext_idx], c.btg[int_idx] - c.btg[ext_idx]))
+        emit(posisi, "TOTAL", "", pos_total)
+        w.writerow([])
+
+    streams = [iter_source(path, i) for i, (_, path) in enumerate(sources)]
+    cur_key, cur = None, None
+    cur_posisi = None
+    for key, i, btg, vol in heapq.merge(*streams, key=lambda t: t[0]):
+        if key != cur_key:
+            if cur is not None:
+                emit(*cur_key, cur)
+                per_jenis.setdefault(cur_key[2], Cube(n)).add(cur)
+                pos_total.add(cur)
+                glob.add(cur)
+            if cur_posisi is not None and key[0] != cur_posisi:
+                flush_posisi(cur_posisi)
+                per_jenis, pos_total = {}, Cube(n)
+            cur_key, cur, cur_posisi = key, Cube(n), key[0]
+        cur.btg[i] += btg
+        cur.vol[i] += vol
+
+    if cur is not None:
+        emit(*cur_key, cur)
+        per_jenis.setdefault(cur_key[2], Cube(n)).add(cur)
+        pos_total.add(cur)
+        glob.add(cur)
+        flush_posisi(cur_posisi)
+    emit("GLOBAL", "TOTAL", "", glob)
+    return diffs
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Gabung 4 stock CSV jadi satu cube")
+    ap.add_argument("--dir", default=".", help="folder berisi stock*.csv")
+    ap.add_argument("--out", default=OUT_CSV)
+    ap.add_argument("--top", type=int, default=10, help="tampilkan N selisih internal/external terbesar")
+    args = ap.parse_args(argv)
+
+    sources = []
+    for name, fn in SOURCES:
+        path = os.path.join(args.dir, fn)
+        if os.path.exists(path):
+            sources.append((name, path))
+        else:
+            print(f"Warning: {path} tidak ada, kolom {name} dilewati")
+    if not sources:
+        raise SystemExit("Tidak ada stock CSV yang bisa digabung")
+
+    names = [n for n, _ in sources]
+    int_idx = names.index("internal") if "internal" in names else None
+    ext_idx = names.index("external") if "external" in names else None
+
+    with OutputTxn() as txn:
+        diffs = merge(sources, csv.writer(txn.open_text(args.out)), int_idx, ext_idx)
+    print(f"Cube done -> {args.out} (sumber: {', '.join(names)})")
+
+    big = sorted((d for d in diffs if abs(d[2]) > 0.005 or d[3]), key=lambda d: -abs(d[2]))
+    if big and args.top:
+        print(f"Selisih internal - external terbesar ({len(big)} posisi x jenis berbeda):")
+        for posisi, jenis, dv, db in big[:args.top]:
+            print(f"  {posisi:<14} {jenis:<14} {db:+6d} btg  {dv:+10.3f} m3")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Renderer pesan stock (dipakai *_to_message.py dan notifikasi ntfy).
+
+stock.csv dibaca sekali (load_view), lalu layout tiap format di-compile
+sekali jadi template (compile_template, di-cache) dan semua posisi
+di-render dalam satu jalan. Hasil render berupa section -> blok -> baris,
+jadi bisa dipotong per blok kalau ada batas ukuran pesan (split_chunks).
+
+Format:
+  text  teks lebar HP (output *_to_message.py, 1 pesan)
+  ntfy  teks ntfy: 1 pesan per posisi + REKAP (output script lama di workflow)
+  csv   ringkasan CSV posisi,jenis,btg,volume_m3,mutasi_terakhir
+
+Pemakaian:
+  python tools/stock_render.py stock.csv                       # text
+  python tools/stock_render.py stock.csv --format ntfy         # pesan dipisah ---NTFY-SPLIT---
+  python tools/stock_render.py stock.csv --format ntfy --max-bytes 4000
+  python tools/stock_render.py stock.csv --format ntfy --pack   # pesan sesedikit mungkin
+"""
+
+import argparse
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from csv_columns import read_columns
+import run_metrics
+
+CLASSES = ("40-49", "50-59", "60-UP")   # kelas yang tampil di format ntfy
+NTFY_SPLIT = "---NTFY-SPLIT---"
+NTFY_MAX_BYTES = 4000  # batas body pesan ntfy 4096 byte (lebih dari itu jadi attachment)
+JENIS_WIDTH_MAX = 18   # biar aman layar hp
+
+# ---------- helpers ----------
+def parse_int(x, default=0):
+    try:
+        s = str(x).strip()
+        if s == "":
+            return default
+        return int(float(s))
+    except Exception:
+        return default
+
+def parse_float(x, default=0.0):
+    try:
+        s = str(x).strip().replace(",", ".")
+        if s == "":
+            return default
+        return float(s)
+    except Exception:
+        return default
+
+def parse_date_ddmmyyyy(s):
+    """
+    stock.csv pakai format: 31-12-2025
+    kalau kosong / invalid -> None
+    """
+    if s is None:
+        return None
+    t = str(s).strip()
+    if not t:
+        return None
+    # normalisasi separator
+    t = t.replace("/", "-").replace(".", "-")
+    for fmt in ("%d-%m-%Y", "%d-%m-%y"):
+        try:
+            return datetime.strptime(t, fmt).date()
+        except Exception:
+            pass
+    return None
+
+def fmt_date(d):
+    return d.strftime("%d-%m-%Y") if d else "-"
+
+def fmt_vol(v):
+    # 2 digit biar stabil
+    return f"{v:,.2f}".replace(",", "") + " m³"
+
+def text_bytes(lines):
+    return len("\n".join(lines).encode("utf-8"))
+
+# ---------- data ----------
+class StockView:
+    """
+    Hasil satu kali baca stock.csv.
+
+    posisi[p]  = {"jenis": OrderedDict(jenis -> [btg, vol]), "btg", "vol", "last"}
+                 (semua kelas; untuk format text/csv)
+    kelas[p]   = OrderedDict(jenis -> {kelas: {"btg", "vol"}})
+                 (hanya kelas di `classes`; untuk format ntfy)
+    species    = urutan jenis pertama kali muncul (baris `classes`)
+    latest_global = nilai mutasi_terakhir_global terakhir yang tidak kosong
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.posisi = OrderedDict()
+        self.kelas = OrderedDict()
+        self.species = []
+        self.latest_global = ""
+
+def load_view(path, classes=CLASSES):
+    path = Path(path)
+    classes = tuple(classes)
+    rows = read_columns(
+        path,
+        ["posisi", "kelas_diameter", "jenis", "btg", "volume_m3",
+         "mutasi_terakhir_posisi", "mutasi_terakhir_global"],
+        required=["posisi", "jenis", "btg", "volume_m3"],
+    )
+    view = StockView(path.name)
+    posisi_data, kelas_data, species = view.posisi, view.kelas, view.species
+    seen_species = set()
+
+    for posisi, kelas, jenis, btg_s, vol_s, last_pos, last_global in rows:
+        if last_global:
+            view.latest_global = last_global
+
+        posisi = (posisi or "").strip()
+        jenis = (jenis or "").strip()
+        if not posisi or not jenis:
+            continue
+
+        btg = parse_int(btg_s)
+        vol = parse_float(vol_s)
+
+        # tanggal mutasi per posisi (lebih prioritas), kalau kosong pakai global
+        d = parse_date_ddmmyyyy(last_pos) or parse_date_ddmmyyyy(last_global)
+
+        p = posisi_data.get(posisi)
+        if p is None:
+            p = posisi_data[posisi] = {"jenis": OrderedDict(), "btg": 0, "vol": 0.0, "last": None}
+        j = p["jenis"].get(jenis)
+        if j is None:
+            j = p["jenis"][jenis] = [0, 0.0]
+        j[0] += btg
+        j[1] += vol
+        p["btg"] += btg
+        p["vol"] += vol
+        if d and (p["last"] is None or d > p["last"]):
+            p["last"] = d
+
+        kelas = (kelas or "").strip()
+        if kelas not in classes:
+            continue
+        if jenis not in seen_species:
+            seen_species.add(jenis)
+            species.append(jenis)
+        rows_k = kelas_data.setdefault(posisi, OrderedDict())
+        cell = rows_k.get(jenis)
+        if cell is None:
+            cell = rows_k[jenis] = {k: {"btg": 0, "vol": 0.0} for k in classes}
+        cell[kelas]["btg"] += btg
+        cell[kelas]["vol"] += vol
+
+    return view
+
+# ---------- template ----------
+class Rendered:
+    """header: baris yang diulang di tiap pesan; sections: list section, section = list blok (list baris)."""
+
+    def __init__(self, header, sections, per_section=False):
+        self.header = header
+        self.sections = sections
+        self.per_section = per_section   # True = tiap section memang pesan sendiri
+
+    def messages(self):
+        if self.per_section:
+            return ["\n".join(self.header + [line for b in s for line in b]) for s in self.sections]
+        return ["\n".join(self.header + [line for s in self.sections for b in s for line in b])]
+
+class TextTemplate:
+    """Format lebar HP (stock_to_message.py)."""
+
+    def __init__(self, title, sep_width=16, jenis_width_max=JENIS_WIDTH_MAX):
+        self.title = title
+        self.sep = "=" * sep_width
+        self.jenis_width_max = jenis_width_max
+        self.pos_total = "Total : {} btg | {}".format
+
+    def render(self, view):
+        data = view.posisi
+        if not data:
+            return Rendered([], [[[f"📦 UPDATE STOCK\n\nTidak ada data di {view.name}"]]])
+
+        # GLOBAL dari total posisi
+        global_btg, global_vol, global_last = 0, 0.0, None
+        width = 0
+        for p in data.values():
+            global_btg += p["btg"]
+            global_vol += p["vol"]
+            if p["last"] and (global_last is None or p["last"] > global_last):
+                global_last = p["last"]
+            for jenis in p["jenis"]:
+                width = max(width, len(jenis))
+        width = min(width, self.jenis_width_max)
+
+        # Biar BLOK muncul paling atas kalau ada
+        keys = list(data)
+        if "BLOK" in data:
+            keys.remove("BLOK")
+            keys.insert(0, "BLOK")
+
+        intro = [
+            "",
+            f"Update (mutasi terakhir): {fmt_date(global_last)}",
+            "",
+            self.title,
+            f"Batang : {global_btg} btg",
+            f"Volume : {fmt_vol(global_vol)}",
+        ]
+        sections = [[intro]]
+        line = f"  {{:<{width}}} : {{:>5}} btg | {{:>12}}".format
+        for pos in keys:
+            p = data[pos]
+            blocks = [[self.sep, pos, self.pos_total(p["btg"], fmt_vol(p["vol"]))]]
+            # urutkan jenis by volume desc (lebih enak dilihat)
+            items = sorted(p["jenis"].items(), key=lambda kv: kv[1][1], reverse=True)
+            for jenis, (btg, vol) in items:
+                blocks.append([line(jenis[:width], btg, fmt_vol(vol))])
+            sections.append(blocks)
+        return Rendered([], sections)
+
+class NtfyTemplate:
+    """Format ntfy (1 pesan per posisi + REKAP), sama dengan script lama di workflow stock."""
+
+    def __init__(self, title="📦 UPDATE STOCK KAYU BULAT", classes=CLASSES):
+        self.title = title
+        self.classes = list(classes)
+        k = self.classes
+        self.cls_line = {c: f"• {c}: {{}} btg | {{:.2f}} m³".format for c in k}
+        self.cls_empty = {c: f"• {c}: -" for c in k}
+        self.sum_line = "• Jumlah: {} btg | {:.2f} m³".format
+
+    def _zero(self):
+        return {k: {"btg": 0, "vol": 0.0} for k in self.classes}
+
+    def _sum_row(self, row):
+        return (sum(row[k]["btg"] for k in self.classes), sum(row[k]["vol"] for k in self.classes))
+
+    def _total_rows(self, rows):
+        total = self._zero()
+        for row in rows.values():
+            for k in self.classes:
+                total[k]["btg"] += row[k]["btg"]
+                total[k]["vol"] += row[k]["vol"]
+        return total
+
+    def _species_block(self, jenis, row):
+        out = [f"🌲 {jenis}"]
+        for k in self.classes:
+            btg = row[k]["btg"]
+            vol = row[k]["vol"]
+            if btg == 0 and abs(vol) < 0.00001:
+                out.append(self.cls_empty[k])
+            else:
+                out.append(self.cls_line[k](btg, vol))
+        out.append(self.sum_line(*self._sum_row(row)))
+        out.append("")
+        return out
+
+    def _total_block(self, label, total_row):
+        out = [label]
+        for k in self.classes:
+            out.append(self.cls_line[k](total_row[k]["btg"], total_row[k]["vol"]))
+        out.append(self.sum_line(*self._sum_row(total_row)))
+        return out
+
+    def render(self, view):
+        header = [self.title]
+        if view.latest_global:
+            header.append(f"Mutasi terakhir: {view.latest_global}")
+        header.append("")
+
+        sections = []
+        grand = OrderedDict((jenis, self._zero()) for jenis in view.species)
+        for posisi, rows in view.kelas.items():
+            blocks = [[f"📍 {posisi}", ""]]
+            for jenis in view.species:
+                if jenis in rows:
+                    blocks.append(self._species_block(jenis, rows[jenis]))
+            blocks.append(self._total_block(f"✅ TOTAL {posisi}", self._total_rows(rows)))
+            sections.append(blocks)
+
+            for jenis, row in rows.items():
+                g = grand.setdefault(jenis, self._zero())
+                for k in self.classes:
+                    g[k]["btg"] += row[k]["btg"]
+                    g[k]["vol"] += row[k]["vol"]
+
+        rekap = [["📊 REKAP SELURUH LOKASI", ""]]
+        for jenis, row in grand.items():
+            rekap.append(self._species_block(jenis, row))
+        rekap.append(self._total_block("✅ TOTAL SEMUA", self._total_rows(grand)))
+        sections.append(rekap)
+        return Rendered(header, sections, per_section=True)
+
+class CsvTemplate:
+    """Ringkasan CSV: satu baris per posisi x jenis + TOTAL per posisi + GLOBAL."""
+
+    header = "posisi,jenis,btg,volume_m3,mutasi_terakhir"
+
+    def render(self, view):
+        def q(s):
+            return '"' + s.replace('"', '""') + '"' if any(c in s for c in ',"\n') else s
+
+        sections = [[[self.header]]]
+        g_btg, g_vol, g_last = 0, 0.0, None
+        for pos, p in view.posisi.items():
+            blocks = []
+            for jenis, (btg, vol) in p["jenis"].items():
+                blocks.append([f"{q(pos)},{q(jenis)},{btg},{vol:.2f},"])
+            blocks.append([f"{q(pos)},TOTAL,{p['btg']},{p['vol']:.2f},{fmt_date(p['last'])}"])
+            sections.append(blocks)
+            g_btg += p["btg"]
+            g_vol += p["vol"]
+            if p["last"] and (g_last is None or p["last"] > g_last):
+                g_last = p["last"]
+        sections.append([[f"GLOBAL,TOTAL,{g_btg},{g_vol:.2f},{fmt_date(g_last)}"]])
+        return Rendered([], sections)
+
+@lru_cache(maxsize=None)
+def compile_template(fmt, title=None, classes=CLASSES):
+    if fmt == "text":
+        return TextTemplate(title or "STOCK KESELURUHAN")
+    if fmt == "ntfy":
+        return NtfyTemplate(title, classes) if title else NtfyTemplate(classes=classes)
+    if fmt == "csv":
+        return CsvTemplate()
+    raise SystemExit(f"Format tidak dikenal: {fmt}")
+
+# ---------- split ----------
+def split_chunks(rendered, max_bytes=None):
+    """
+    Return list pesan. Tanpa max_bytes hasilnya sama dengan Rendered.messages().
+    Dengan max_bytes: section yang kebesaran dipotong di batas blok (header
+    diulang di tiap potongan); blok yang sendirian sudah kebesaran dipotong per baris.
+    """
+    if not max_bytes:
+        return rendered.messages()
+
+    header = rendered.header
+    groups = rendered.sections if rendered.per_section else [[b for s in rendered.sections for b in s]]
+    out = []
+    for blocks in groups:
+        cur = []
+        for block in blocks:
+            pieces = [block]
+            if text_bytes(header + block) > max_bytes:
+                pieces = [[line] for line in block]
+            for piece in pieces:
+                if cur and text_bytes(header + cur + piece) > max_bytes:
+                    out.append("\n".join(header + cur))
+                    cur = []
+                cur = cur + piece
+        if cur:
+            out.append("\n".join(header + cur))
+    return out
+
+def _flat(blocks):
+    return [line for b in blocks for line in b]
+
+def _section_parts(header, section, max_bytes):
+    """Section kebesaran dipotong di batas blok, blok judul (blok pertama) diulang."""
+    if len(section) < 2 or text_bytes(header + _flat(section)) <= max_bytes:
+        return [section]
+    title = section[0]
+    parts, cur = [], [title]
+    for block in section[1:]:
+        if len(cur) > 1 and text_bytes(header + _flat(cur + [block])) > max_bytes:
+            parts.append(cur)
+            cur = [title]
+        cur = cur + [block]
+    parts.append(cur)
+    return parts
+
+def pack_messages(rendered, max_bytes=NTFY_MAX_BYTES, gap=("",)):
+    """
+    Gabung section (posisi) ke pesan sesedikit mungkin dengan total <= max_bytes
+    (first-fit decreasing). Blok jenis tidak pernah dipotong; section yang
+    sendirian sudah kebesaran dipecah dulu di batas blok. Urutan section di
+    dalam pesan dan urutan pesan tetap mengikuti urutan asli.
+    Antar section di satu pesan disisipkan baris `gap`.
+    """
+    header = rendered.header
+    items = []
+    for section in rendered.sections:
+        items.extend(_flat(p) for p in _section_parts(header, section, max_bytes))
+
+    def text(idxs):
+        lines = list(header)
+        for n, i in enumerate(sorted(idxs)):
+            if n:
+                lines.extend(gap)
+            lines.extend(items[i])
+        return lines
+
+    bins = []
+    for i in sorted(range(len(items)), key=lambda i: text_bytes(items[i]), reverse=True):
+        for b in bins:
+            if text_bytes(text(b + [i])) <= max_bytes:
+                b.append(i)
+                break
+        else:
+            bins.append([i])
+    bins.sort(key=min)
+    return ["\n".join(text(b)) for b in bins]
+
+def parse_classes(spec):
+    """'40-49,50-59,60-UP' atau nama skema di kelas_bins.SCHEMES -> tuple label."""
+    if "," not in spec and "-" not in spec:
+        from kelas_bins import SCHEMES
+        if spec not in SCHEMES:
+            raise SystemExit(f"Skema kelas tidak dikenal: {spec} (ada: {', '.join(sorted(SCHEMES))})")
+        spec = SCHEMES[spec]
+    return tuple(c.strip() for c in spec.split(",") if c.strip())
+
+def render(path, fmt="text", title=None, max_bytes=None, pack=False, classes=CLASSES):
+    classes = tuple(classes)
+    rendered = compile_template(fmt, title, classes).render(load_view(path, classes))
+    if pack:
+        return pack_messages(rendered, max_bytes or NTFY_MAX_BYTES, ("",) if fmt == "ntfy" else ())
+    return split_chunks(rendered, max_bytes)
+
+def render_message(path, title, max_bytes=None):
+    """Dipakai *_to_message.py: teks siap print (pesan dipisah NTFY_SPLIT kalau dipotong)."""
+    return f"\n\n{NTFY_SPLIT}\n\n".join(render(path, "text", title, max_bytes))
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render pesan dari stock.csv")
+    ap.add_argument("csv_path", nargs="?", default="stock.csv")
+    ap.add_argument("--format", choices=["text", "ntfy", "csv"], default="text")
+    ap.add_argument("--title", help="judul (text: baris KESELURUHAN, ntfy: baris pertama)")
+    ap.add_argument("--max-bytes", type=int, help="batas ukuran per pesan (byte UTF-8)")
+    ap.add_argument("--pack", action="store_true",
+                    help=f"gabung posisi ke pesan sesedikit mungkin (default --max-bytes {NTFY_MAX_BYTES})")
+    ap.add_argument("--classes", default=",".join(CLASSES),
+                    help='kelas di format ntfy: "20-39,40-49,50-59,60-UP" atau nama skema (main/ibs)')
+    args = ap.parse_args(argv)
+
+    path = Path(args.csv_path)
+    if not path.exists():
+        raise SystemExit(f"File tidak ditemukan: {path}")
+
+    chunks = render(path, args.format, args.title, args.max_bytes, args.pack,
+                    parse_classes(args.classes))
+    m = run_metrics.current()
+    m.lap("render")
+    m.set("messages", len(chunks))
+    m.set("bytes", sum(len(c.encode("utf-8")) for c in chunks))
+    for i, chunk in enumerate(chunks, start=1):
+        print(chunk)
+        if i != len(chunks):
+            print(f"\n{NTFY_SPLIT}\n")
+
+if __name__ == "__main__":
+    run_metrics.run(main)
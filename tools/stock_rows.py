@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agregasi stock (posisi x kelas_diameter x jenis) yang dipakai bersama.
+
+- export_stock_*.py  : baca workbook -> record -> aggregate() -> write_stock_csv()
+- export_range_to_csv.py : selain loglist1.csv juga menulis file antara
+  (loglist1_rows.csv) berisi per noBtg: posisi, kelas, jenis, volume, tanggal mutasi,
+  rata2. stock.csv bisa dihitung ulang dari file itu TANPA parse workbook lagi.
+
+Pemakaian:
+  # bangun stock.csv dari file antara
+  python tools/stock_rows.py build loglist1_rows.csv stock.csv
+
+  # cek total stock.csv vs loglist1.csv (+ per posisi dari file antara)
+  python tools/stock_rows.py check stock.csv loglist1.csv [--rows loglist1_rows.csv]
+
+  # IBS (aturan skip AFKIR / PROSES BANSAW)
+  python tools/stock_rows.py build --profile ibs loglist_ibs_rows.csv stock_ibs.csv
+"""
+
+import argparse
+import csv
+from collections import namedtuple
+from datetime import datetime, date
+
+ROWS_HEADER = ["noBtg", "posisi", "kelas", "jenis", "volume", "tgl", "rata2"]
+
+StockRow = namedtuple("StockRow", "noBtg posisi kelas jenis vol tgl rata2")
+
+STOCK_HEADER = [
+    "posisi", "kelas_diameter", "jenis",
+    "btg", "volume_m3",
+    "mutasi_terakhir_posisi",
+    "mutasi_terakhir_global",
+]
+
+# ---------- helpers (sama dengan export_stock_csv.py) ----------
+def norm_str(v):
+    """CATATAN: tidak mengubah '=' jadi kosong (sesuai permintaan)."""
+    if v is None:
+        return ""
+    return str(v).strip()
+
+def is_invalid_nobtg(v) -> bool:
+    """
+    Patokan baris kosong:
+    - noBtg kosong
+    - "0", "0.0"
+    - "-"
+    (TIDAK memasukkan "=")
+    """
+    if v is None:
+        return True
+    if isinstance(v, (int, float)):
+        return float(v) == 0.0
+    s = str(v).strip()
+    if s == "":
+        return True
+    if s == "-":
+        return True
+    # handle string angka
+    if s == "0" or s == "0.0":
+        return True
+    return False
+
+def safe_float(v):
+    try:
+        if v is None:
+            return 0.0
+        if isinstance(v, (int, float)):
+            return float(v)
+        s = norm_str(v).replace(",", ".")
+        return float(s) if s else 0.0
+    except:
+        return 0.0
+
+def parse_date(v):
+    # Openpyxl bisa return datetime/date kalau cell type date
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+
+    s = norm_str(v)
+    if not s:
+        return None
+
+    # coba beberapa format umum
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(s, fmt).date()
+        except:
+            pass
+    return None
+
+def fmt_d(d):
+    return d.strftime("%d-%m-%Y") if d else ""
+
+# ---------- agregasi ----------
+def add_record(agg, posisi, kelas, jenis, vol, tgl):
+    key = (posisi, kelas, jenis)
+    rec = agg.get(key)
+    if rec is None:
+        rec = {"btg": 0, "vol": 0.0, "last": None}
+        agg[key] = rec
+
+    rec["btg"] += 1
+    rec["vol"] += vol
+
+    if tgl:
+        if rec["last"] is None or tgl > rec["last"]:
+            rec["last"] = tgl
+
+def aggregate(records, skip_posisi=None):
+    """
+    records: iterable StockRow.
+    Return (agg, last_global); agg[(posisi, kelas, jenis)] = {"btg", "vol", "last"}.
+    """
+    agg = {}
+    last_global = None
+    for r in records:
+        if skip_posisi is not None and skip_posisi(r.posisi):
+            continue
+        add_record(agg, r.posisi, r.kelas, r.jenis, r.vol, r.tgl)
+        if r.tgl and (last_global is None or r.tgl > last_global):
+            last_global = r.tgl
+    return agg, last_global
+
+def posisi_totals(agg):
+    """Return (pos_tot, glob_btg, glob_vol)."""
+    pos_tot = {}
+    glob_btg = 0
+    glob_vol = 0.0
+
+    for (posisi, _kelas, _jenis), rec in agg.items():
+        pt = pos_tot.get(posisi)
+        if pt is None:
+            pt = {"btg": 0, "vol": 0.0, "last": None}
+            pos_tot[posisi] = pt
+
+        pt["btg"] += rec["btg"]
+        pt["vol"] += rec["vol"]
+        if rec["last"]:
+            if pt["last"] is None or rec["last"] > pt["last"]:
+                pt["last"] = rec["last"]
+
+        glob_btg += rec["btg"]
+        glob_vol += rec["vol"]
+
+    return pos_tot, glob_btg, glob_vol
+
+def write_stock_csv(w, agg, last_global):
+    """Tulis format stock.csv (detail, TOTAL per posisi, GLOBAL) ke csv.writer `w`."""
+    pos_tot, glob_btg, glob_vol = posisi_totals(agg)
+    last_g_str = fmt_d(last_global)
+
+    w.writerow(STOCK_HEADER)
+
+    # urutkan detail
+    items = sorted(agg.items(), key=lambda x: (x[0][0], x[0][1], x[0][2]))
+
+    current_pos = None
+    for (posisi, kelas, jenis), rec in items:
+        # kalau pindah posisi, tulis TOTAL posisi sebelumnya
+        if current_pos is not None and posisi != current_pos:
+            pt = pos_tot[current_pos]
+            w.writerow([current_pos, "TOTAL", "", pt["btg"], round(pt["vol"], 3), fmt_d(pt["last"]), last_g_str])
+            w.writerow([])  # pemisah
+
+        current_pos = posisi
+        w.writerow([posisi, kelas, jenis, rec["btg"], round(rec["vol"], 3), fmt_d(rec["last"]), last_g_str])
+
+    # TOTAL posisi terakhir
+    if current_pos is not None:
+        pt = pos_tot[current_pos]
+        w.writerow([current_pos, "TOTAL", "", pt["btg"], round(pt["vol"], 3), fmt_d(pt["last"]), last_g_str])
+        w.writerow([])
+
+    # TOTAL GLOBAL
+    w.writerow(["GLOBAL", "TOTAL", "", glob_btg, round(glob_vol, 3), last_g_str, last_g_str])
+
+# ---------- file antara ----------
+def num_or_none(v):
+    """Angka dari cell (int/float/string angka) -> float; selain itu None."""
+    if v is None or isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        return float(v)
+    s = norm_str(v).replace(",", ".")
+    try:
+        return float(s) if s else None
+    except ValueError:
+        return None
+
+def fmt_num(x):
+    # ringkas tapi tetap bisa dibaca balik persis (repr float)
+    if x is None:
+        return ""
+    return str(int(x)) if x.is_integer() else repr(x)
+
+def row_values(r):
+    """StockRow -> baris CSV file antara."""
+    return [
+        r.noBtg, r.posisi, r.kelas, r.jenis,
+        fmt_num(r.vol),
+        r.tgl.isoformat() if r.tgl else "",
+        fmt_num(r.rata2),
+    ]
+
+def read_rows(path):
+    """Baca file antara -> iterator StockRow."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header != ROWS_HEADER:
+            raise SystemExit(f"{path}: header file antara tidak dikenal: {header}")
+        fromiso = date.fromisoformat
+        for noBtg, posisi, kelas, jenis, vol, tgl, rata2 in reader:
+            yield StockRow(
+                noBtg, posisi, kelas, jenis,
+                float(vol) if vol else 0.0,
+                fromiso(tgl) if tgl else None,
+                float(rata2) if rata2 else None,
+            )
+
+def should_skip_posisi(posisi_raw) -> bool:
+    """Filter default stock.csv (DKDS / MILIR / posisi kosong)."""
+    s = norm_str(posisi_raw).upper()
+    if not s:
+        return True
+    if s == "DKDS":
+        return True
+    if "MILIR" in s:
+        return True
+    return False
+
+def should_skip_posisi_ibs(posisi_raw) -> bool:
+    """Filter stock_ibs.csv (AFKIR / PROSES BANSAW / posisi kosong)."""
+    s = norm_str(posisi_raw).upper()
+    if not s:
+        return True
+    if s == "AFKIR":
+        return True
+    if "PROSES BANSAW" in s:
+        return True
+    return False
+
+SKIP_RULES = {
+    "main": should_skip_posisi,
+    "ibs": should_skip_posisi_ibs,
+}
+
+# ---------- cek konsistensi ----------
+def read_stock_totals(path):
+    """Return (per_posisi {posisi: (btg, vol)}, global (btg, vol)|None) dari baris TOTAL stock.csv."""
+    per_pos = {}
+    glob = None
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) < 5 or row[1] != "TOTAL":
+                continue
+            tot = (int(float(row[3] or 0)), float(row[4] or 0))
+            if row[0] == "GLOBAL":
+                glob = tot
+            else:
+                per_pos[row[0]] = tot
+    return per_pos, glob
+
+def read_loglist_totals(path):
+    """Return (jumlah baris, total volume) loglist CSV."""
+    from csv_columns import read_columns
+
+    rows = read_columns(path, ["volume"])
+    return len(rows), sum(safe_float(v) for (v,) in rows)
+
+def check_consistency(stock_csv, loglist_csv, rows_csv=None, skip_posisi=should_skip_posisi, tol=0.01):
+    """Return list pesan selisih (kosong = konsisten)."""
+    problems = []
+    per_pos, glob = read_stock_totals(stock_csv)
+    if glob is None:
+        return [f"{stock_csv}: baris GLOBAL TOTAL tidak ada"]
+
+    n, vol = read_loglist_totals(loglist_csv)
+    if n != glob[0]:
+        problems.append(f"btg: {loglist_csv}={n} vs {stock_csv}={glob[0]}")
+    if abs(vol - glob[1]) > tol:
+        problems.append(f"volume: {loglist_csv}={vol:.3f} vs {stock_csv}={glob[1]:.3f}")
+
+    if rows_csv:
+        agg, _ = aggregate(read_rows(rows_csv), skip_posisi)
+        pos_tot, _, _ = posisi_totals(agg)
+        for posisi in sorted(set(pos_tot) | set(per_pos)):
+            a = pos_tot.get(posisi, {"btg": 0, "vol": 0.0})
+            b = per_pos.get(posisi, (0, 0.0))
+            if a["btg"] != b[0] or abs(a["vol"] - b[1]) > tol:
+                problems.append(
+                    f"{posisi}: {rows_csv}={a['btg']} btg/{a['vol']:.3f} m3"
+                    f" vs {stock_csv}={b[0]} btg/{b[1]:.3f} m3"
+                )
+    return problems
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stock dari file antara loglist")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="bangun stock.csv dari file antara")
+    b.add_argument("rows_csv")
+    b.add_argument("out_csv")
+    b.add_argument("--profile", choices=sorted(SKIP_RULES), default="main",
+                   help="aturan skip posisi (main: DKDS/MILIR, ibs: AFKIR/PROSES BANSAW)")
+
+    c = sub.add_parser("check", help="cek total stock.csv vs loglist CSV")
+    c.add_argument("stock_csv")
+    c.add_argument("loglist_csv")
+    c.add_argument("--rows", help="file antara, untuk cek per posisi")
+    c.add_argument("--profile", choices=sorted(SKIP_RULES), default="main")
+
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        from atomic_output import OutputTxn
+
+        agg, last_global = aggregate(read_rows(args.rows_csv), SKIP_RULES[args.profile])
+        with OutputTxn() as txn:
+            write_stock_csv(csv.writer(txn.open_text(args.out_csv)), agg, last_global)
+        print(f"Build done -> {args.out_csv} (groups: {len(agg)})")
+        return
+
+    problems = check_consistency(args.stock_csv, args.loglist_csv, args.rows, SKIP_RULES[args.profile])
+    if problems:
+        print("Tidak konsisten:")
+        for p in problems:
+            print("  " + p)
+        raise SystemExit(1)
+    print(f"OK: total {args.stock_csv} cocok dengan {args.loglist_csv}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+"""
+Pembaca xlsx streaming dengan memori terbatas (pengganti openpyxl read_only).
+
+openpyxl read_only memang baca sheet per baris, tapi shared strings
+(sharedStrings.xml) selalu dimuat penuh ke list. Untuk register besar
+(ratusan ribu noBtg unik) itu yang paling makan memori. Di sini:
+
+- shared strings dibaca expat; kalau lebih dari SPILL_STRINGS item,
+  semuanya dipindah ke file sementara (bytes utf-8 + offset array), dibaca
+  lewat mmap + cache LRU kecil (jenis/posisi yang berulang tetap cepat);
+- sheet diparse expat per potongan 64 KB (callback, tanpa pohon XML);
+  baris langsung di-yield, jadi memori tidak tumbuh dengan jumlah baris;
+- sel di luar min_col..max_col tidak dikonversi sama sekali.
+
+Nilai yang keluar sama dengan openpyxl (values_only=True, data_only=True):
+int/float/str/bool/None, tanggal (numFmt tanggal di styles.xml) -> datetime,
+baris yang bolong diisi tuple None, lebar baris = dimensi sheet.
+
+Di exporter cukup:
+    ws = open_sheet(XLSX, SHEET, stream=STREAM)
+    for row in ws.iter_rows(min_row=..., max_row=..., values_only=True): ...
+stream=False -> openpyxl seperti biasa.
+"""
+
+import mmap
+import posixpath
+import tempfile
+import threading
+import zipfile
+from array import array
+from functools import lru_cache
+from xml.etree.ElementTree import iterparse
+from xml.parsers import expat
+
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import from_excel, from_ISO8601, WINDOWS_EPOCH, MAC_EPOCH
+
+SPILL_STRINGS = 100_000   # shared strings lebih dari ini -> disimpan di disk
+STRING_CACHE = 8192       # cache LRU lookup shared string (saat di disk)
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# nama elemen dari expat (namespace_separator="}")
+X_ROW, X_C, X_V, X_T = NS[1:] + "row", NS[1:] + "c", NS[1:] + "v", NS[1:] + "t"
+X_IS, X_RPH, X_DIM = NS[1:] + "is", NS[1:] + "rPh", NS[1:] + "dimension"
+X_SI = NS[1:] + "si"
+
+READ_CHUNK = 1 << 16
+
+# ---------- helpers ----------
+_col_cache = {}
+
+def col_index(letters):
+    """'A' -> 1, 'AB' -> 28."""
+    n = _col_cache.get(letters)
+    if n is None:
+        n = 0
+        for ch in letters:
+            n = n * 26 + (ord(ch) - 64)
+        _col_cache[letters] = n
+    return n
+
+def split_ref(ref):
+    """'AB12' -> (12, 28)."""
+    letters = ref.rstrip("0123456789")
+    return int(ref[len(letters):]), col_index(letters)
+
+def cast_number(s):
+    # sama dengan openpyxl _cast_number
+    if "." in s or "E" in s or "e" in s:
+        return float(s)
+    return int(s)
+
+class SpilledStrings:
+    """Shared strings di file sementara; s[i] baca lewat mmap."""
+
+    def __init__(self, strings=()):
+        self._f = tempfile.TemporaryFile(prefix="xlsx_sst_")
+        self._offsets = array("q", [0])
+        self._mm = None
+        for s in strings:
+            self.append(s)
+
+    def append(self, s):
+        b = s.encode("utf-8")
+        self._f.write(b)
+        self._offsets.append(self._offsets[-1] + len(b))
+
+    def finish(self):
+        self._f.flush()
+        if self._offsets[-1]:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._get = lru_cache(maxsize=STRING_CACHE)(self._read)
+        return self
+
+    def _read(self, i):
+        off = self._offsets
+        if self._mm is None:
+            return ""
+        return self._mm[off[i]:off[i + 1]].decode("utf-8")
+
+    def __getitem__(self, i):
+        if i < 0 or i >= len(self._offsets) - 1:
+            raise IndexError(i)
+        return self._get(i)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+        self._f.close()
+
+def read_shared_strings(src, spill=SPILL_STRINGS):
+    """
+    Return list (kecil) atau SpilledStrings (besar). Pakai expat, bukan
+    iterparse: elemen <si> yang sudah di-clear tetap nempel di root dan untuk
+    sejuta string itu puluhan MB.
+    """
+    state = {"strings": [], "parts": None, "text": None, "rph": 0}
+
+    def start(name, attrs):
+        if name == X_SI:
+            state["parts"] = []
+        elif name == X_T and state["parts"] is not None and not state["rph"]:
+            state["text"] = state["parts"]
+        elif name == X_RPH:
+            state["rph"] += 1
+
+    def chars(data):
+        if state["text"] is not None:
+            state["text"].append(data)
+
+    def end(name):
+        if name == X_T:
+            state["text"] = None
+        elif name == X_SI:
+            strings = state["strings"]
+            strings.append("".join(state["parts"]).replace("x005F_", ""))
+            state["parts"] = None
+            if spill is not None and type(strings) is list and len(strings) > spill:
+                state["strings"] = SpilledStrings(strings)
+        elif name == X_RPH:
+            state["rph"] -= 1
+
+    p = expat.ParserCreate(namespace_separator="}")
+    p.buffer_text = True
+    p.StartElementHandler = start
+    p.EndElementHandler = end
+    p.CharacterDataHandler = chars
+    p.ParseFile(src)
+    strings = state["strings"]
+    if isinstance(strings, SpilledStrings):
+        strings.finish()
+    return strings
+
+def row_tuple(cells, min_col, max_col):
+    """[(kolom, nilai), ...] -> tuple selebar min_col..max_col (None untuk sel kosong)."""
+    if not cells and not max_col:
+        return ()
+    width = (max_col or cells[-1][0]) + 1 - min_col
+    out = [None] * width
+    for col, v in cells:
+        out[col - min_col] = v
+    return tuple(out)
+
+class SheetParser:
+    """
+    Parser sheet pakai expat langsung (callback, tanpa bikin elemen XML):
+    tiap </row> selesai -> (nomor baris, [(kolom, nilai), ...]) masuk self.rows.
+
+    skip_if {kolom: predikat}: filter noBtg di level XML. Sel kolom kunci
+    dikonversi duluan; sel lain ditahan sebagai teks mentah sampai ada kunci
+    yang valid. Kalau SEMUA predikat bilang tidak valid, baris dibuang ->
+    (nomor baris, None), sel sesudahnya tidak disimpan sama sekali.
+    """
+
+    def __init__(self, reader, min_col=1, max_col=None, columns=None, skip_if=None):
+        self.convert = reader.convert
+        self.min_col = min_col
+        self.max_col = max_col
+        self.want = frozenset(columns) if columns else None   # baca kolom ini saja
+        self.skip_if = skip_if or None
+        self.decided = True     # baris ini sudah pasti diterima / ditolak
+        self.rejected = False
+        self.pending = 0        # kolom kunci yang belum terlihat di baris ini
+        self.raw = None         # [(kolom, t, s, teks, inline)] sebelum diputuskan
+        self.rows = []
+        self.dim_row = self.dim_col = None
+        self.row_no = 0
+        self.cells = None
+        self.col = 0
+        self.keep = False
+        self.text = None      # list potongan teks <v>/<t> yang sedang dibaca
+        self.skip_text = 0    # di dalam <rPh> (phonetic), teks diabaikan
+        p = expat.ParserCreate(namespace_separator="}")
+        p.buffer_text = True
+        p.StartElementHandler = self.start
+        p.EndElementHandler = self.end
+        p.CharacterDataHandler = self.chars
+        self.parser = p
+
+    def feed(self, data, final=False):
+        self.parser.Parse(data, final)
+
+    def start(self, name, attrs):
+        if name == X_C:
+            ref = attrs.get("r")
+            self.col = col_index(ref.rstrip("0123456789")) if ref else self.col + 1
+            if self.rejected:
+                self.keep = False
+            elif self.want is not None:
+                self.keep = self.col in self.want
+            else:
+                hi = self.max_col
+                self.keep = self.col >= self.min_col and (hi is None or self.col <= hi)
+            if self.keep:
+                self.t = attrs.get("t", "n")
+                self.s = attrs.get("s")
+                self.parts = []
+                self.inline = False
+        elif name == X_V or name == X_T:
+            if self.keep and not self.skip_text:
+                self.text = self.parts
+        elif name == X_ROW:
+            r = attrs.get("r")
+            self.row_no = int(r) if r else self.row_no + 1
+            self.cells = []
+            self.col = 0
+            if self.skip_if is not None:
+                self.decided = self.rejected = False
+                self.pending = len(self.skip_if)
+                self.raw = []
+        elif name == X_IS:
+            self.inline = True
+        elif name == X_RPH:
+            self.skip_text += 1
+        elif name == X_DIM:
+            last = attrs.get("ref", "").split(":")[-1]
+            if last:
+                self.dim_row, self.dim_col = split_ref(last)
+
+    def chars(self, data):
+        if self.text is not None:
+            self.text.append(data)
+
+    def end(self, name):
+        if name == X_V or name == X_T:
+            self.text = None
+        elif name == X_C:
+            if self.keep:
+                v = "".join(self.parts)
+                if not self.decided and self.col not in self.skip_if:
+                    # belum tentu dipakai: simpan teks mentah, konversi di </row>
+                    self.raw.append((self.col, self.t, self.s, v, self.inline))
+                else:
+                    if self.t == "inlineStr":
+                        # <c t="inlineStr"/> tanpa <is> -> None, <is><t/></is> -> ""
+                        v = v if self.inline else None
+                    else:
+                        v = self.convert(self.t, self.s, v)
+                    self.cells.append((self.col, v))
+                    if not self.decided:
+                        self.pending -= 1
+                        if not self.skip_if[self.col](v):
+                            self.decided = True
+                        elif not self.pending:
+                            self.decided = self.rejected = True
+                self.keep = False
+        elif name == X_ROW:
+            if not self.decided:
+                # kolom kunci tanpa sel = None
+                seen = {c for c, _ in self.cells}
+                self.rejected = all(pred(None) for c, pred in self.skip_if.items() if c not in seen)
+            if self.rejected:
+                self.rows.append((self.row_no, None))
+            else:
+                for c, t, s, v, inline in self.raw or ():
+                    if t == "inlineStr":
+                        v = v if inline else None
+                    else:
+                        v = self.convert(t, s, v)
+                    self.cells.append((c, v))
+                self.rows.append((self.row_no, self.cells))
+            if self.skip_if is not None:
+                self.raw = None
+                self.decided, self.rejected = True, False
+        elif name == X_RPH:
+            self.skip_text -= 1
+
+# ---------- reader ----------
+class XlsxReader:
+    """
+    Satu workbook, zip dibuka sekali; iter_rows() per sheet. Boleh dipakai
+    beberapa thread sekaligus (sheet beda = member zip beda, shared strings
+    dimuat sekali di bawah lock), lihat export_sheets.py.
+    """
+
+    def __init__(self, path, spill_strings=SPILL_STRINGS):
+        self.path = path
+        self.spill_strings = spill_strings
+        self.zf = zipfile.ZipFile(path)
+        self._strings = None
+        self._strings_lock = threading.Lock()
+        self.epoch = WINDOWS_EPOCH
+        self.sheets = {}           # nama sheet -> path xml di zip
+        self._read_workbook()
+        self.date_styles, self.timedelta_styles = self._read_styles()
+
+    @property
+    def sheetnames(self):
+        return list(self.sheets)
+
+    def _read_workbook(self):
+        rels = {}
+        with self.zf.open("xl/_rels/workbook.xml.rels") as f:
+            for _, node in iterparse(f):
+                if node.tag == PKG_REL_NS + "Relationship":
+                    target = node.get("Target")
+                    if target.startswith("/"):
+                        target = target[1:]
+                    else:
+                        target = posixpath.normpath(posixpath.join("xl", target))
+                    rels[node.get("Id")] = target
+        with self.zf.open("xl/workbook.xml") as f:
+            for _, node in iterparse(f):
+                if node.tag == NS + "workbookPr":
+                    if node.get("date1904") in ("1", "true"):
+                        self.epoch = MAC_EPOCH
+                elif node.tag == NS + "sheet":
+                    self.sheets[node.get("name")] = rels[node.get(REL_NS + "id")]
+
+    def _read_styles(self):
+        """Index cellXfs yang numFmt-nya tanggal / durasi (seperti openpyxl)."""
+        dates, deltas = set(), set()
+        if "xl/styles.xml" not in self.zf.namelist():
+            return dates, deltas
+        custom = {}
+        xfs = []
+        in_xfs = False
+        with self.zf.open("xl/styles.xml") as f:
+            for ev, node in iterparse(f, events=("start", "end")):
+                if node.tag == NS + "cellXfs":
+                    in_xfs = ev == "start"
+                elif ev == "end" and node.tag == NS + "numFmt":
+                    custom[int(node.get("numFmtId"))] = node.get("formatCode")
+                elif ev == "end" and node.tag == NS + "xf" and in_xfs:
+                    xfs.append(int(node.get("numFmtId", 0)))
+        for idx, fmt_id in enumerate(xfs):
+            fmt = custom[fmt_id] if fmt_id in custom else builtin_format_code(fmt_id)
+            if fmt and is_date_format(fmt):
+                dates.add(idx)
+            if fmt and is_timedelta_format(fmt):
+                deltas.add(idx)
+        return dates, deltas
+
+    @property
+    def shared_strings(self):
+        if self._strings is None:
+            with self._strings_lock:
+                if self._strings is None:
+                    if "xl/sharedStrings.xml" in self.zf.namelist():
+                        with self.zf.open("xl/sharedStrings.xml") as f:
+                            self._strings = read_shared_strings(f, self.spill_strings)
+                    else:
+                        self._strings = []
+        return self._strings
+
+    def convert(self, t, s, v):
+        """Tipe sel (atribut t), style (s), teks <v> -> nilai python (seperti openpyxl data_only)."""
+        if not v:
+            return None
+        if t == "n":
+            v = cast_number(v)
+            if s and int(s) in self.date_styles:
+                try:
+                    return from_excel(v, self.epoch, timedelta=int(s) in self.timedelta_styles)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return v
+        if t == "s":
+            return self.shared_strings[int(v)]
+        if t == "b":
+            return bool(int(v))
+        if t == "d":
+            return from_ISO8601(v)
+        return v   # str, e, inlineStr (teks sudah digabung parser)
+
+    def iter_rows(self, sheet, min_row=1, max_row=None, min_col=1, max_col=None, columns=None,
+                  skip_if=None):
+        """
+        Tuple nilai per baris min_row..max_row (semantik openpyxl read_only).
+        columns: list nomor kolom -> tuple hanya kolom itu (urut sesuai list),
+        sel lain dilewati parser tanpa dikonversi.
+        skip_if: {kolom: predikat(nilai) -> True kalau tidak valid}; baris yang
+        semua kuncinya tidak valid keluar sebagai tuple None (lihat SheetParser).
+        """
+        if sheet not in self.sheets:
+            raise KeyError(sheet)
+        min_row = min_row or 1
+        min_col = min_col or 1
+        if skip_if:
+            inside = (lambda c: c in columns) if columns else (
+                lambda c: c >= min_col and (max_col is None or c <= max_col))
+            if not all(inside(c) for c in skip_if):
+                raise ValueError(f"kolom skip_if harus ikut dibaca: {sorted(skip_if)}")
+        parser = SheetParser(self, min_col, max_col, columns, skip_if)
+        empty_row = None
+        counter = min_row
+        idx = 0
+        with self.zf.open(self.sheets[sheet]) as src:
+            done = False
+            while not done:
+                chunk = src.read(READ_CHUNK)
+                done = not chunk
+                parser.feed(chunk, done)
+                rows, parser.rows = parser.rows, []
+                for idx, cells in rows:
+                    if empty_row is None:
+                        max_col = max_col or parser.dim_col
+                        max_row = max_row or parser.dim_row
+                        if columns:
+                            empty_row = (None,) * len(columns)
+                        else:
+                            empty_row = (None,) * (max_col + 1 - min_col) if max_col else ()
+                    if max_row is not None and idx > max_row:
+                        done = True
+                        break
+                    while counter < idx:
+                        counter += 1
+                        yield empty_row
+                    if counter <= idx:
+                        counter += 1
+                        if cells is None:
+                            yield empty_row   # ditolak skip_if
+                        elif columns:
+                            got = dict(cells)
+                            yield tuple([got.get(c) for c in columns])
+                        else:
+                            yield row_tuple(cells, min_col, max_col)
+
+        if max_row is not None and max_row < idx:
+            for _ in range(counter, max_row + 1):
+                yield empty_row
+
+    def close(self):
+        if isinstance(self._strings, SpilledStrings):
+            self._strings.close()
+        self._strings = None
+        self.zf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class StreamSheet:
+    """Adaptor: punya iter_rows(..., values_only=True) seperti worksheet openpyxl."""
+
+    def __init__(self, reader, name):
+        self.reader = reader
+        self.title = name
+
+    def iter_rows(self, min_row=None, max_row=None, min_col=None, max_col=None, values_only=True):
+        if not values_only:
+            raise ValueError("xlsx_stream hanya mendukung values_only=True")
+        return self.reader.iter_rows(self.title, min_row, max_row, min_col, max_col)
+
+def iter_columns(ws, columns, min_row=None, max_row=None, skip_if=None):
+    """
+    Tuple nilai kolom `columns` (nomor 1-based, urutan bebas) per baris.
+    StreamSheet: hanya sel itu yang diparse; openpyxl: semua kolom min..max tetap
+    diparse lalu dipilih (jadi baca sempit cuma terjadi di mode stream).
+
+    skip_if {kolom: predikat}, mis. {2: is_invalid_nobtg}: baris yang semua
+    kuncinya tidak valid diganti tuple None (jumlah baris tetap sama, jadi
+    hitungan baris kosong di exporter tidak berubah). Mode stream: diputuskan
+    di parser, sel lain baris itu tidak pernah jadi objek python.
+    """
+    columns = list(columns)
+    if isinstance(ws, StreamSheet):
+        return ws.reader.iter_rows(ws.title, min_row, max_row, columns=columns, skip_if=skip_if)
+    lo, hi = min(columns), max(columns)
+    pick = [c - lo for c in columns]
+    rows = (tuple([row[k] for k in pick]) for row in
+            ws.iter_rows(min_row=min_row, max_row=max_row, min_col=lo, max_col=hi, values_only=True))
+    if not skip_if:
+        return rows
+    keys = [(columns.index(c), pred) for c, pred in skip_if.items()]
+    blank = (None,) * len(columns)
+    return (blank if all(pred(row[k]) for k, pred in keys) else row for row in rows)
+
+def open_sheet(path, sheet, stream=False):
+    """Worksheet openpyxl read_only (stream=False) atau StreamSheet (stream=True)."""
+    if stream:
+        reader = XlsxReader(path)
+        names = reader.sheetnames
+    else:
+        from openpyxl import load_workbook  # import berat, baru saat perlu
+        reader = load_workbook(path, read_only=True, data_only=True)
+        names = reader.sheetnames
+    if sheet not in names:
+        raise SystemExit(f"Sheet '{sheet}' tidak ditemukan. Ada: {names}")
+    return StreamSheet(reader, sheet) if stream else reader[sheet]